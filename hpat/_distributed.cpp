@@ -22,6 +22,10 @@ PyMODINIT_FUNC PyInit_hdist(void)
     PyObject_SetAttrString(m, "hpat_dist_get_node_portion", PyLong_FromVoidPtr((void*)(&hpat_dist_get_node_portion)));
     PyObject_SetAttrString(m, "hpat_dist_get_item_pointer", PyLong_FromVoidPtr((void*)(&hpat_dist_get_item_pointer)));
     PyObject_SetAttrString(m, "hpat_get_dummy_ptr", PyLong_FromVoidPtr((void*)(&hpat_get_dummy_ptr)));
+    PyObject_SetAttrString(m, "hpat_get_shuffle_memory_budget",
+                           PyLong_FromVoidPtr((void*)(&hpat_get_shuffle_memory_budget)));
+    PyObject_SetAttrString(m, "hpat_set_shuffle_memory_budget",
+                           PyLong_FromVoidPtr((void*)(&hpat_set_shuffle_memory_budget)));
 
     return m;
 }
@@ -48,6 +48,22 @@ static void* hpat_get_dummy_ptr()
     return hpat_dummy_ptr;
 }
 
+// memory budget in bytes of shuffle buffers (0 means no limit), read at
+// runtime so that it can be changed without recompiling
+static int64_t hpat_shuffle_memory_budget __UNUSED__;
+
+static int64_t hpat_get_shuffle_memory_budget() __UNUSED__;
+static int64_t hpat_get_shuffle_memory_budget()
+{
+    return hpat_shuffle_memory_budget;
+}
+
+static void hpat_set_shuffle_memory_budget(int64_t budget) __UNUSED__;
+static void hpat_set_shuffle_memory_budget(int64_t budget)
+{
+    hpat_shuffle_memory_budget = budget;
+}
+
 static int64_t hpat_dist_get_start(int64_t total, int num_pes, int node_id)
 {
     int64_t div_chunk = (int64_t)ceil(total / ((double)num_pes));
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from distutils import util as distutils_util
 
 try:
@@ -47,3 +48,49 @@ config_transport_mpi_default = distutils_util.strtobool(os.getenv('HPAT_CONFIG_M
 # current value for transport controlled by decorator
 # need to initialize this here because decorator called later then modules have been initialized
 config_transport_mpi = config_transport_mpi_default
+
+# number of threads used for sorting inside each process, total number of
+# cores used by sort is number of MPI processes x sort threads
+config_sort_num_threads = int(os.getenv('HPAT_SORT_NUM_THREADS', '1'))
+
+# memory budget of sort in bytes for each process, sorted runs are spilled to
+# memory-mapped files in scratch directory if larger (0 means no limit).
+# Input data and received data of parallel sort stay in memory.
+config_sort_memory_budget = int(os.getenv('HPAT_SORT_MEMORY_BUDGET', '0'))
+config_sort_scratch_dir = os.getenv('HPAT_SORT_SCRATCH_DIR', tempfile.gettempdir())
+
+# maximum size in bytes of each message when data of a rank in collective
+# communication (alltoallv, gatherv) is too large for 32-bit MPI counts
+config_comm_chunk_bytes = int(os.getenv('HPAT_COMM_CHUNK_BYTES', str(1 << 30)))
+
+# memory budget in bytes of each process for buffers of join/groupby shuffle,
+# data is exchanged in multiple rounds if set (0 means single exchange).
+# Output arrays of shuffle are not included. Initial value of
+# hpat.distributed_api.get/set_shuffle_memory_budget(), which can change it at
+# runtime.
+config_shuffle_memory_budget = int(os.getenv('HPAT_SHUFFLE_MEMORY_BUDGET', '0'))
+
+# joins with a table smaller than this (number of rows in all processes) are
+# performed by broadcasting the small table instead of shuffling both tables
+config_broadcast_join_threshold = int(os.getenv('HPAT_BROADCAST_JOIN_THRESHOLD', '10000'))
+
+# remove rows that cannot match in distributed hash joins with a Bloom filter
+# of the other table's keys before shuffling
+config_join_bloom_filter = distutils_util.strtobool(os.getenv('HPAT_JOIN_BLOOM_FILTER', 'False'))
+
+# joins with method='auto' check if keys are sorted or heavily duplicated on
+# all processes to choose sort-merge join (costs a scan of keys and a
+# reduction), otherwise hash join is used
+config_join_auto_sort_merge = distutils_util.strtobool(os.getenv('HPAT_JOIN_AUTO_SORT_MERGE', 'False'))
+
+# HyperLogLog sketches of approximate distinct counts use 2^p registers, the
+# relative standard error is about 1.04/sqrt(2^p) (0.8% for p=14)
+config_hll_precision = int(os.getenv('HPAT_HLL_PRECISION', '14'))
+
+# rank error bound (fraction of number of values) of quantile sketches used
+# in approximate quantiles, describe() and groupby quantile (0 means exact)
+config_quantile_sketch_error = float(os.getenv('HPAT_QUANTILE_SKETCH_ERROR', '0.001'))
+
+# groupby on a categorical key or an integer key with range of values up to
+# this size uses keys as indices of dense reduction arrays instead of hashing
+config_dense_agg_max_keys = int(os.getenv('HPAT_DENSE_AGG_MAX_KEYS', '65536'))
@@ -744,6 +744,52 @@ class DistributedPass(object):
 
             return self._replace_func(f, rhs.args)
 
+        if fdef == (
+            'quantiles_approx', 'hpat.hiframes.api') and (
+            self._is_1D_arr(
+                rhs.args[0].name) or self._is_1D_Var_arr(
+                rhs.args[0].name)):
+
+            def f(arr, qs):
+                return hpat.hiframes.api.quantiles_approx_parallel(arr, qs)
+
+            return self._replace_func(f, rhs.args)
+
+        if fdef == (
+            'pivot_table_dynamic', 'hpat.hiframes.api') and (
+            self._is_1D_arr(
+                rhs.args[0].name) or self._is_1D_Var_arr(
+                rhs.args[0].name)):
+
+            def f(index_arr, columns_arr, values_arr, aggfunc):
+                return hpat.hiframes.api.pivot_table_dynamic_parallel(
+                    index_arr, columns_arr, values_arr, aggfunc)
+
+            return self._replace_func(f, rhs.args)
+
+        if fdef == (
+            'crosstab_dynamic', 'hpat.hiframes.api') and (
+            self._is_1D_arr(
+                rhs.args[0].name) or self._is_1D_Var_arr(
+                rhs.args[0].name)):
+
+            def f(index_arr, columns_arr):
+                return hpat.hiframes.api.crosstab_dynamic_parallel(
+                    index_arr, columns_arr)
+
+            return self._replace_func(f, rhs.args)
+
+        if fdef == (
+            'nunique_approx', 'hpat.hiframes.api') and (
+            self._is_1D_arr(
+                rhs.args[0].name) or self._is_1D_Var_arr(
+                rhs.args[0].name)):
+
+            def f(arr):
+                return hpat.hiframes.api.nunique_approx_parallel(arr)
+
+            return self._replace_func(f, rhs.args)
+
         if fdef == (
             'unique', 'hpat.hiframes.api') and (
             self._is_1D_arr(
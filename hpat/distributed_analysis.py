@@ -34,9 +34,17 @@ class Distribution(Enum):
 
 
 _dist_analysis_result = namedtuple(
-    'dist_analysis_result', 'array_dists,parfor_dists')
+    'dist_analysis_result', 'array_dists,parfor_dists,array_partitions')
+
+# partitioning of a distributed array: 'hash' means rows with equal values of
+# key arrays 'keys' (variable names) are on the same rank, with destination
+# rank computed by get_dest_ranks(), 'range' means ranks hold consecutive
+# ranges of keys sorted in parallel (equal keys can span rank boundaries)
+Partitioning = namedtuple('Partitioning', 'kind,keys')
 
 distributed_analysis_extensions = {}
+# partitioning analysis of IR nodes: f(inst, array_dists, array_partitions)
+partitioning_analysis_extensions = {}
 auto_rebalance = False
 
 
@@ -85,7 +93,11 @@ class DistributedAnalysis(object):
             if changed:
                 return self.run()
 
-        return _dist_analysis_result(array_dists=array_dists, parfor_dists=parfor_dists)
+        array_partitions = self._run_partitioning_analysis(
+            blocks, topo_order, array_dists)
+        return _dist_analysis_result(array_dists=array_dists,
+                                     parfor_dists=parfor_dists,
+                                     array_partitions=array_partitions)
 
     def _run_analysis(self, blocks, topo_order, array_dists, parfor_dists):
         save_array_dists = {}
@@ -97,6 +109,28 @@ class DistributedAnalysis(object):
             for label in topo_order:
                 self._analyze_block(blocks[label], array_dists, parfor_dists)
 
+    def _run_partitioning_analysis(self, blocks, topo_order, array_dists):
+        """find partitioning of distributed arrays created by shuffling nodes
+        (Join, Aggregate, Sort) and propagate it through copies and filters
+        """
+        array_partitions = {}
+        # partitioning is a property of a single definition
+        multi_defs = set(v for v, defs in self.func_ir._definitions.items()
+                         if len(defs) > 1)
+        for label in topo_order:
+            for inst in blocks[label].body:
+                if (isinstance(inst, ir.Assign)
+                        and isinstance(inst.value, ir.Var)
+                        and inst.value.name in array_partitions
+                        and inst.target.name not in multi_defs):
+                    array_partitions[inst.target.name] = array_partitions[inst.value.name]
+                elif type(inst) in partitioning_analysis_extensions:
+                    f = partitioning_analysis_extensions[type(inst)]
+                    f(inst, array_dists, array_partitions)
+                    for v in multi_defs:
+                        array_partitions.pop(v, None)
+        return array_partitions
+
     def _analyze_block(self, block, array_dists, parfor_dists):
         for inst in block.body:
             if isinstance(inst, ir.Assign):
@@ -310,14 +344,29 @@ class DistributedAnalysis(object):
                 array_dists[lhs] = Distribution.OneD
             return
 
-        if fdef == ('quantile', 'hpat.hiframes.api'):
+        if fdef in (('quantile', 'hpat.hiframes.api'),
+                    ('quantiles_approx', 'hpat.hiframes.api')):
             # quantile doesn't affect input's distribution
             return
 
-        if fdef == ('nunique', 'hpat.hiframes.api'):
+        if fdef in (('nunique', 'hpat.hiframes.api'),
+                    ('nunique_approx', 'hpat.hiframes.api')):
             # nunique doesn't affect input's distribution
             return
 
+        if fdef in (('pivot_table_dynamic', 'hpat.hiframes.api'),
+                    ('crosstab_dynamic', 'hpat.hiframes.api')):
+            # input columns should have the same distribution, output is
+            # a tuple of replicated matrix and labels
+            index_arr = args[0].name
+            columns_arr = args[1].name
+            dist = self._meet_array_dists(index_arr, columns_arr, array_dists)
+            if func_name == 'pivot_table_dynamic':
+                dist = self._meet_array_dists(
+                    index_arr, args[2].name, array_dists, dist)
+                self._meet_array_dists(index_arr, columns_arr, array_dists, dist)
+            return
+
         if fdef == ('unique', 'hpat.hiframes.api'):
             # doesn't affect distribution of input since input can stay 1D
             if lhs not in array_dists:
@@ -1,4 +1,5 @@
 import time
+import ctypes
 from enum import Enum
 import llvmlite.binding as ll
 import operator
@@ -16,6 +17,7 @@ from hpat.str_arr_ext import (string_array_type, num_total_chars, StringArray,
                               pre_alloc_string_array, get_offset_ptr,
                               get_data_ptr, convert_len_arr_to_offset)
 from hpat.utils import (debug_prints, empty_like_type, _numba_to_c_type_map, unliteral_all)
+from hpat import hdist
 
 if hpat.config.config_transport_mpi:
     from . import transport_mpi as transport
@@ -26,9 +28,14 @@ else:
 ll.add_symbol('c_alltoall', transport.c_alltoall)
 ll.add_symbol('c_gather_scalar', transport.c_gather_scalar)
 ll.add_symbol('c_gatherv', transport.c_gatherv)
+ll.add_symbol('c_gatherv_big', transport.c_gatherv_big)
+ll.add_symbol('c_alltoallv_big', transport.c_alltoallv_big)
+ll.add_symbol('c_ialltoallv', transport.c_ialltoallv)
 ll.add_symbol('c_bcast', transport.c_bcast)
 ll.add_symbol('c_recv', transport.hpat_dist_recv)
 ll.add_symbol('c_send', transport.hpat_dist_send)
+ll.add_symbol('hpat_get_shuffle_memory_budget', hdist.hpat_get_shuffle_memory_budget)
+ll.add_symbol('hpat_set_shuffle_memory_budget', hdist.hpat_set_shuffle_memory_budget)
 
 
 # get size dynamically from C code (mpich 3.2 is 4 bytes but openmpi 1.6 is 8)
@@ -62,6 +69,19 @@ def get_type_enum_overload(arr):
 
 
 INT_MAX = np.iinfo(np.int32).max
+# StringArray offsets are uint32
+MAX_STR_ARR_CHARS = np.iinfo(np.uint32).max
+
+
+@numba.njit
+def check_str_arr_chars(n_chars):  # pragma: no cover
+    """raise error on all ranks if a string array of 'n_chars' characters on
+    any rank can't be created since offsets are 32-bit
+    """
+    n_max = hpat.distributed_api.dist_reduce(
+        np.int64(n_chars), np.int32(Reduce_Type.Max.value))
+    if n_max > MAX_STR_ARR_CHARS:
+        raise ValueError("string array has too many characters for 32-bit offsets")
 
 _send = types.ExternalFunction("c_send", types.void(types.voidptr, types.int32, types.int32, types.int32, types.int32))
 
@@ -86,6 +106,29 @@ def recv(dtype, rank, tag):
     return recv_arr[0]
 
 
+# shuffle memory budget is a runtime value (not a compile time constant) so
+# that it can be changed without recompiling functions that shuffle
+_get_shuffle_memory_budget = types.ExternalFunction(
+    "hpat_get_shuffle_memory_budget", types.int64())
+_set_shuffle_memory_budget = types.ExternalFunction(
+    "hpat_set_shuffle_memory_budget", types.void(types.int64))
+
+
+@numba.njit
+def get_shuffle_memory_budget():
+    return _get_shuffle_memory_budget()
+
+
+@numba.njit
+def set_shuffle_memory_budget(budget):
+    _set_shuffle_memory_budget(budget)
+
+
+# initial value from HPAT_SHUFFLE_MEMORY_BUDGET, set without compiling
+ctypes.CFUNCTYPE(None, ctypes.c_int64)(hdist.hpat_set_shuffle_memory_budget)(
+    config.config_shuffle_memory_budget)
+
+
 _alltoall = types.ExternalFunction("c_alltoall", types.void(types.voidptr, types.voidptr, types.int32, types.int32))
 
 
@@ -152,20 +195,20 @@ def gatherv_overload(data):
         def gatherv_impl(data):
             rank = hpat.distributed_api.get_rank()
             n_loc = len(data)
-            recv_counts = gather_scalar(np.int32(n_loc))
+            recv_counts = gather_scalar(np.int64(n_loc))
             n_total = recv_counts.sum()
             all_data = empty_like_type(n_total, data)
             # displacements
-            displs = np.empty(1, np.int32)
+            displs = np.empty(1, np.int64)
             if rank == MPI_ROOT:
                 displs = hpat.hiframes.join.calc_disp(recv_counts)
             #  print(rank, n_loc, n_total, recv_counts, displs)
-            c_gatherv(
+            gatherv_buff(
                 data.ctypes,
-                np.int32(n_loc),
+                n_loc,
                 all_data.ctypes,
-                recv_counts.ctypes,
-                displs.ctypes,
+                recv_counts,
+                displs,
                 np.int32(typ_val))
             return all_data
 
@@ -188,16 +231,17 @@ def gatherv_overload(data):
                 _str = data[i]
                 send_arr_lens[i] = len(_str)
 
-            recv_counts = gather_scalar(np.int32(n_loc))
-            recv_counts_char = gather_scalar(np.int32(n_all_chars))
+            recv_counts = gather_scalar(np.int64(n_loc))
+            recv_counts_char = gather_scalar(np.int64(n_all_chars))
             n_total = recv_counts.sum()
             n_total_char = recv_counts_char.sum()
 
             # displacements
             all_data = StringArray([''])  # dummy arrays on non-root PEs
-            displs = np.empty(1, np.int32)
-            displs_char = np.empty(1, np.int32)
+            displs = np.empty(1, np.int64)
+            displs_char = np.empty(1, np.int64)
 
+            check_str_arr_chars(n_total_char if rank == MPI_ROOT else 0)
             if rank == MPI_ROOT:
                 all_data = pre_alloc_string_array(n_total, n_total_char)
                 displs = hpat.hiframes.join.calc_disp(recv_counts)
@@ -206,19 +250,19 @@ def gatherv_overload(data):
             #  print(rank, n_loc, n_total, recv_counts, displs)
             offset_ptr = get_offset_ptr(all_data)
             data_ptr = get_data_ptr(all_data)
-            c_gatherv(
+            gatherv_buff(
                 send_arr_lens.ctypes,
-                np.int32(n_loc),
+                n_loc,
                 offset_ptr,
-                recv_counts.ctypes,
-                displs.ctypes,
+                recv_counts,
+                displs,
                 int32_typ_enum)
-            c_gatherv(
+            gatherv_buff(
                 send_data_ptr,
-                np.int32(n_all_chars),
+                n_all_chars,
                 data_ptr,
-                recv_counts_char.ctypes,
-                displs_char.ctypes,
+                recv_counts_char,
+                displs_char,
                 char_typ_enum)
             convert_len_arr_to_offset(offset_ptr, n_total)
             return all_data
@@ -226,6 +270,41 @@ def gatherv_overload(data):
         return gatherv_str_arr_impl
 
 
+# 64-bit version of c_gatherv, sends messages in chunks
+c_gatherv_big = types.ExternalFunction(
+    "c_gatherv_big",
+    types.void(
+        types.voidptr,
+        types.int64,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.int32,
+        types.int64))
+
+
+@numba.njit
+def gatherv_buff(send_ptr, send_count, recv_ptr, recv_counts, displs, typ_enum,
+                 max_count=INT_MAX):  # pragma: no cover
+    """gatherv on buffer pointers, uses 64-bit counts and chunked messages
+    if total size is larger than max_count (int32 by default, recv_counts and
+    displs are only valid on root)
+    """
+    n_total = hpat.distributed_api.dist_reduce(
+        np.int64(send_count), np.int32(Reduce_Type.Sum.value))
+    if n_total > max_count:
+        recv_counts_64 = recv_counts.astype(np.int64)
+        displs_64 = displs.astype(np.int64)
+        c_gatherv_big(send_ptr, np.int64(send_count), recv_ptr,
+                      recv_counts_64.ctypes, displs_64.ctypes, typ_enum,
+                      np.int64(hpat.config.config_comm_chunk_bytes))
+    else:
+        recv_counts_32 = recv_counts.astype(np.int32)
+        displs_32 = displs.astype(np.int32)
+        c_gatherv(send_ptr, np.int32(send_count), recv_ptr,
+                  recv_counts_32.ctypes, displs_32.ctypes, typ_enum)
+
+
 # TODO: test
 # TODO: large BCast
 
@@ -323,6 +402,54 @@ def prealloc_str_for_bcast_overload(arr):
     return lambda arr: arr
 
 
+def allgatherv(data):  # pragma: no cover
+    return data
+
+
+@overload(allgatherv)
+def allgatherv_overload(data):
+    """gather distributed data on all ranks (gatherv to root then bcast)"""
+    if isinstance(data, types.Array):
+        def allgatherv_impl(data):
+            rank = hpat.distributed_api.get_rank()
+            all_data = gatherv(data)
+            n_total = bcast_scalar(len(all_data))
+            if rank != MPI_ROOT:
+                all_data = empty_like_type(n_total, data)
+            bcast(all_data)
+            return all_data
+
+        return allgatherv_impl
+
+    if data == string_array_type:
+        def allgatherv_str_impl(data):
+            all_data = gatherv(data)
+            all_data = prealloc_str_for_bcast(all_data)
+            bcast(all_data)
+            return all_data
+
+        return allgatherv_str_impl
+
+
+def allgatherv_tup(data):  # pragma: no cover
+    return data
+
+
+@overload(allgatherv_tup)
+def allgatherv_tup_overload(data):
+    count = data.count
+
+    func_text = "def f(data):\n"
+    func_text += "  return ({}{})\n".format(
+        ", ".join("allgatherv(data[{}])".format(i) for i in range(count)),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'allgatherv': allgatherv}, loc_vars)
+    allgatherv_impl = loc_vars['f']
+    return allgatherv_impl
+
+
 # assuming start and step are None
 def const_slice_getitem(arr, slice_index, start, count):
     return arr[slice_index]
@@ -398,15 +525,90 @@ c_alltoallv = types.ExternalFunction(
         types.voidptr,
         types.int32))
 
+# 64-bit version of c_alltoallv, sends messages in chunks
+c_alltoallv_big = types.ExternalFunction(
+    "c_alltoallv_big",
+    types.void(
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.int32,
+        types.int64))
+
+
 # TODO: test
-# TODO: big alltoallv
 @numba.njit
 def alltoallv(send_data, out_data, send_counts, recv_counts, send_disp, recv_disp):  # pragma: no cover
     typ_enum = get_type_enum(send_data)
     typ_enum_o = get_type_enum(out_data)
     assert typ_enum == typ_enum_o
 
-    c_alltoallv(
+    alltoallv_buff(
+        send_data.ctypes,
+        out_data.ctypes,
+        send_counts,
+        recv_counts,
+        send_disp,
+        recv_disp,
+        typ_enum)
+    return
+
+
+@numba.njit
+def alltoallv_buff(send_ptr, recv_ptr, send_counts, recv_counts, send_disp, recv_disp, typ_enum,
+                   max_count=INT_MAX):  # pragma: no cover
+    """alltoallv on buffer pointers, uses 64-bit counts and chunked messages
+    if counts or displacements of any rank are larger than max_count (int32 by
+    default)
+    """
+    is_big = np.int32(0)
+    for i in range(len(send_counts)):
+        if (np.int64(send_disp[i]) + np.int64(send_counts[i]) > max_count
+                or np.int64(recv_disp[i]) + np.int64(recv_counts[i]) > max_count):
+            is_big = np.int32(1)
+    is_big = hpat.distributed_api.dist_reduce(
+        is_big, np.int32(Reduce_Type.Max.value))
+    if is_big != 0:
+        send_counts_64 = send_counts.astype(np.int64)
+        recv_counts_64 = recv_counts.astype(np.int64)
+        send_disp_64 = send_disp.astype(np.int64)
+        recv_disp_64 = recv_disp.astype(np.int64)
+        c_alltoallv_big(send_ptr, recv_ptr, send_counts_64.ctypes,
+                        recv_counts_64.ctypes, send_disp_64.ctypes,
+                        recv_disp_64.ctypes, typ_enum,
+                        np.int64(hpat.config.config_comm_chunk_bytes))
+    else:
+        send_counts_32 = send_counts.astype(np.int32)
+        recv_counts_32 = recv_counts.astype(np.int32)
+        send_disp_32 = send_disp.astype(np.int32)
+        recv_disp_32 = recv_disp.astype(np.int32)
+        c_alltoallv(send_ptr, recv_ptr, send_counts_32.ctypes,
+                    recv_counts_32.ctypes, send_disp_32.ctypes,
+                    recv_disp_32.ctypes, typ_enum)
+
+
+c_ialltoallv = types.ExternalFunction(
+    "c_ialltoallv",
+    mpi_req_numba_type(
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.voidptr,
+        types.int32))
+
+
+@numba.njit
+def ialltoallv(send_data, out_data, send_counts, recv_counts, send_disp, recv_disp):  # pragma: no cover
+    """non-blocking alltoallv with int32 counts, data and count arrays have to
+    stay alive until wait() is called on the returned request
+    """
+    typ_enum = get_type_enum(send_data)
+    return c_ialltoallv(
         send_data.ctypes,
         out_data.ctypes,
         send_counts.ctypes,
@@ -414,7 +616,6 @@ def alltoallv(send_data, out_data, send_counts, recv_counts, send_disp, recv_dis
         send_disp.ctypes,
         recv_disp.ctypes,
         typ_enum)
-    return
 
 
 def alltoallv_tup(send_data, out_data, send_counts, recv_counts, send_disp, recv_disp):  # pragma: no cover
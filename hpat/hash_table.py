@@ -0,0 +1,205 @@
+import numpy as np
+import numba
+from numba.extending import overload
+
+from hpat.str_arr_ext import (string_array_type, getitem_str_offset,
+                              getitem_str_data)
+from hpat.shuffle_utils import hash_key_arrs
+
+
+# open-addressing hash table over the distinct keys of a table (tuple of key
+# arrays). Slots store ids of distinct keys (groups) with linear probing, and
+# row ids of each group are stored contiguously in CSR format:
+# rows[offsets[g]:offsets[g+1]] are the rows with key of group g.
+# The table is a tuple (slots, hashes, group_first, offsets, rows, n_bits)
+# where hashes are hash values of rows and group_first is the first row of
+# each group (used for key comparison). get_group_ids() only assigns dense
+# group ids to rows (e.g. for indexing reduction arrays in groupby).
+
+# multiplier for Fibonacci hashing, high bits of product select the slot
+# (low bits of hashes are correlated with shuffle destination ranks)
+_FIB_MULT = np.uint64(11400714819323198485)
+_MIN_TABLE_BITS = 4
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _table_bits(n):  # pragma: no cover
+    # table is at most half full
+    n_bits = _MIN_TABLE_BITS
+    while (1 << n_bits) < 2 * n:
+        n_bits += 1
+    return n_bits
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _get_slot(h, n_bits):  # pragma: no cover
+    return np.int64((h * _FIB_MULT) >> np.uint64(64 - n_bits))
+
+
+@numba.njit(no_cpython_wrapper=True)
+def build_key_table(key_arrs):  # pragma: no cover
+    """build hash table of distinct keys of key arrays, returns the table
+    and group id of every row
+    """
+    n = len(key_arrs[0])
+    hashes = hash_key_arrs(key_arrs)
+    n_bits = _table_bits(n)
+    slots, row_group, group_first = _fill_key_slots(key_arrs, hashes, n_bits)
+    n_groups = len(group_first)
+
+    # rows of every group in CSR format
+    offsets = np.zeros(n_groups + 1, np.int64)
+    for i in range(n):
+        offsets[row_group[i] + 1] += 1
+    for g in range(n_groups):
+        offsets[g + 1] += offsets[g]
+    rows = np.empty(n, np.int64)
+    pos = offsets[:-1].copy()
+    for i in range(n):
+        g = row_group[i]
+        rows[pos[g]] = i
+        pos[g] += 1
+
+    table = (slots, hashes, group_first, offsets, rows, n_bits)
+    return table, row_group
+
+
+@numba.njit(no_cpython_wrapper=True)
+def get_group_ids(key_arrs, hashes):  # pragma: no cover
+    """assign dense group ids to rows of key arrays (with hash values
+    'hashes') in order of first appearance, returns group id of every row and
+    first row of every group
+    """
+    n_bits = _table_bits(len(hashes))
+    _, row_group, group_first = _fill_key_slots(key_arrs, hashes, n_bits)
+    return row_group, group_first
+
+
+@numba.njit(no_cpython_wrapper=True)
+def _fill_key_slots(key_arrs, hashes, n_bits):  # pragma: no cover
+    n = len(hashes)
+    mask = (1 << n_bits) - 1
+    slots = np.full(1 << n_bits, -1, np.int64)
+    group_first = np.empty(n, np.int64)
+    row_group = np.empty(n, np.int64)
+    n_groups = 0
+    for i in range(n):
+        h = hashes[i]
+        s = _get_slot(h, n_bits)
+        while True:
+            g = slots[s]
+            if g == -1:
+                g = n_groups
+                n_groups += 1
+                slots[s] = g
+                group_first[g] = i
+                break
+            j = group_first[g]
+            if hashes[j] == h and keys_equal_tup(key_arrs, j, key_arrs, i):
+                break
+            s = (s + 1) & mask
+        row_group[i] = g
+    return slots, row_group, group_first[:n_groups]
+
+
+@numba.njit(no_cpython_wrapper=True)
+def probe_key_table(table, table_keys, key_arrs, i, h):  # pragma: no cover
+    """return group id of row 'i' of key_arrs with hash value 'h' in table
+    built from table_keys, -1 if not found
+    """
+    slots, hashes, group_first, offsets, rows, n_bits = table
+    mask = (1 << n_bits) - 1
+    s = _get_slot(h, n_bits)
+    while True:
+        g = slots[s]
+        if g == -1:
+            return -1
+        j = group_first[g]
+        if hashes[j] == h and keys_equal_tup(table_keys, j, key_arrs, i):
+            return g
+        s = (s + 1) & mask
+
+
+def keys_equal_tup(arrs1, i, arrs2, j):  # pragma: no cover
+    return all(a1[i] == a2[j] for a1, a2 in zip(arrs1, arrs2))
+
+
+@overload(keys_equal_tup)
+def keys_equal_tup_overload(arrs1, i, arrs2, j):
+    count = arrs1.count
+    func_text = "def f(arrs1, i, arrs2, j):\n"
+    for k in range(count):
+        func_text += "  if not keys_equal(arrs1[{0}], i, arrs2[{0}], j):\n".format(k)
+        func_text += "    return False\n"
+    func_text += "  return True\n"
+
+    loc_vars = {}
+    exec(func_text, {'keys_equal': keys_equal}, loc_vars)
+    eq_impl = loc_vars['f']
+    return eq_impl
+
+
+def keys_equal(arr1, i, arr2, j):  # pragma: no cover
+    return arr1[i] == arr2[j]
+
+
+@overload(keys_equal)
+def keys_equal_overload(arr1, i, arr2, j):
+    if arr1 == string_array_type:
+        # compare string bytes without creating string objects
+        def str_eq_impl(arr1, i, arr2, j):
+            start1 = np.int64(getitem_str_offset(arr1, i))
+            start2 = np.int64(getitem_str_offset(arr2, j))
+            n = np.int64(getitem_str_offset(arr1, i + 1)) - start1
+            if n != np.int64(getitem_str_offset(arr2, j + 1)) - start2:
+                return False
+            for k in range(n):
+                if getitem_str_data(arr1, start1 + k) != getitem_str_data(arr2, start2 + k):
+                    return False
+            return True
+        return str_eq_impl
+
+    return lambda arr1, i, arr2, j: arr1[i] == arr2[j]
+
+
+# Bloom filter over hash values of keys stored in an array of uint64 words
+# with 2^log_bits bits. Bit positions are derived from the key hash with
+# double hashing.
+_BLOOM_N_HASHES = 3
+_BLOOM_MULT = np.uint64(14029467366897019727)
+# bits per key, gives about 1.7% false positive rate with 3 hashes
+_BLOOM_BITS_PER_KEY = 10
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def bloom_filter_alloc(n_keys, max_log_bits):  # pragma: no cover
+    """allocate filter for n_keys keys with at most 2^max_log_bits bits,
+    returns bit array and log2 of number of bits
+    """
+    log_bits = 6
+    while (1 << log_bits) < _BLOOM_BITS_PER_KEY * n_keys and log_bits < max_log_bits:
+        log_bits += 1
+    return np.zeros(1 << (log_bits - 6), np.uint64), log_bits
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _bloom_bit(h, j, log_bits):  # pragma: no cover
+    h1 = h * _FIB_MULT
+    h2 = (h * _BLOOM_MULT) | np.uint64(1)
+    return np.int64((h1 + np.uint64(j) * h2) >> np.uint64(64 - log_bits))
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def bloom_filter_add(bits, log_bits, h):  # pragma: no cover
+    for j in range(_BLOOM_N_HASHES):
+        b = _bloom_bit(h, j, log_bits)
+        bits[b >> 6] |= np.uint64(1) << np.uint64(b & 63)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def bloom_filter_contains(bits, log_bits, h):  # pragma: no cover
+    for j in range(_BLOOM_N_HASHES):
+        b = _bloom_bit(h, j, log_bits)
+        if bits[b >> 6] & (np.uint64(1) << np.uint64(b & 63)) == np.uint64(0):
+            return False
+    return True
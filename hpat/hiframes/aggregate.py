@@ -25,17 +25,30 @@ from hpat.utils import (is_call_assign, is_var_assign, is_assign, debug_prints,
 from hpat import distributed, distributed_analysis
 from hpat.distributed_analysis import Distribution
 from hpat.utils import _numba_to_c_type_map, unliteral_all
-from hpat.str_ext import string_type
-from hpat.set_ext import num_total_chars_set_string, build_set
 from hpat.str_arr_ext import (string_array_type, pre_alloc_string_array,
                               get_offset_ptr, get_data_ptr)
 
 from hpat.hiframes.join import write_send_buff
-from hpat.timsort import getitem_arr_tup
 from hpat.shuffle_utils import (getitem_arr_tup_single, val_to_tup, alltoallv,
                                 alltoallv_tup, finalize_shuffle_meta, update_shuffle_meta,
-                                alloc_pre_shuffle_metadata, _get_keys_tup, _get_data_tup)
-
+                                alloc_pre_shuffle_metadata, _get_keys_tup, _get_data_tup,
+                                get_dest_ranks, shuffle_with_dest, hash_key_arrs,
+                                get_dest_ranks_from_hashes, hash_arr_item)
+from hpat.hash_table import _get_slot, get_group_ids, keys_equal_tup
+from hpat.hiframes.pd_categorical_ext import (CategoricalArray, cat_array_to_int,
+                                              set_cat_dtype)
+import hpat.sketches
+
+
+# local pre-aggregation before shuffle is skipped (raw rows are shuffled)
+# if estimated number of distinct keys per rank is more than this fraction
+# of the number of rows
+PREAGG_BYPASS_RATIO = 0.5
+# about this many rows per rank are sampled (by key hash) for estimating
+# number of distinct keys
+PREAGG_SAMPLE_SIZE = 4096
+# print the path chosen in parallel groupby on rank 0
+REPORT_AGG_PATH = False
 
 AggFuncStruct = namedtuple('AggFuncStruct',
                            ['var_typs', 'init_func', 'update_all_func', 'combine_all_func',
@@ -45,8 +58,31 @@ supported_agg_funcs = ['sum', 'count', 'mean',
                        'min', 'max', 'prod', 'var', 'std', 'agg', 'aggregate']
 
 
+@numba.njit
+def _mean_from_sum_count(s, count):  # pragma: no cover
+    return hpat.hiframes.series_kernels._mean_handle_nan(s, count)
+
+
+@numba.njit
+def _std_from_var(v):  # pragma: no cover
+    return v**0.5
+
+
+# reductions of functions that can share reductions with other functions in
+# multiple aggregation (groupby agg with dict), and the function that
+# computes output from results of reductions
+multi_agg_parts = {
+    'mean': (('sum', 'count'), _mean_from_sum_count),
+    'std': (('var',), _std_from_var),
+}
+
+
 def get_agg_func(func_ir, func_name, rhs):
     from hpat.hiframes.series_kernels import series_replace_funcs
+    if func_name == 'nunique':
+        return _column_nunique_approx_impl
+    if func_name == 'quantile':
+        return _column_quantile_approx_impl
     if func_name == 'var':
         return _column_var_impl_linear
     if func_name == 'std':
@@ -116,6 +152,18 @@ def lower_special_combine(context, builder, sig, args):
     return context.get_dummy_value()
 
 
+# only used for typing, groupby nunique is computed with HyperLogLog sketches
+# in agg_nunique_approx_seq/agg_nunique_approx_parallel
+def _column_nunique_approx_impl(A):  # pragma: no cover
+    return hpat.hiframes.api.nunique_approx(A)
+
+
+# only used for typing, groupby quantile is computed with quantile summaries
+# in agg_quantile_seq/agg_quantile_parallel
+def _column_quantile_approx_impl(A):  # pragma: no cover
+    return hpat.hiframes.api.quantile(A, 0.5)
+
+
 # https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance
 def _column_var_impl_linear(A):  # pragma: no cover
     nobs = 0
@@ -164,7 +212,7 @@ class Aggregate(ir.Stmt):
     def __init__(self, df_out, df_in, key_names, out_key_vars, df_out_vars,
                  df_in_vars, key_arrs, agg_func, tp_vars, loc,
                  pivot_arr=None, pivot_values=None,
-                 is_crosstab=False):
+                 is_crosstab=False, agg_params=()):
         # name of output dataframe (just for printing purposes)
         self.df_out = df_out
         # name of input dataframe (just for printing purposes)
@@ -177,6 +225,9 @@ class Aggregate(ir.Stmt):
         self.df_in_vars = df_in_vars
         self.key_arrs = key_arrs
 
+        # function applied to all input columns, or dict of output column
+        # names to (input column name, function name) pairs in multiple
+        # aggregation (e.g. groupby agg with dict)
         self.agg_func = agg_func
         # XXX update tp_vars in copy propagate etc.?
         self.out_typer_vars = tp_vars
@@ -186,6 +237,8 @@ class Aggregate(ir.Stmt):
         self.pivot_arr = pivot_arr
         self.pivot_values = pivot_values
         self.is_crosstab = is_crosstab
+        # constant parameters of agg_func (e.g. q of quantile)
+        self.agg_params = agg_params
 
     def __repr__(self):  # pragma: no cover
         out_cols = ""
@@ -271,13 +324,22 @@ def remove_dead_aggregate(aggregate_node, lives, arg_aliases, alias_map, func_ir
 
     for cname in dead_cols:
         aggregate_node.df_out_vars.pop(cname)
-        if aggregate_node.pivot_arr is None:
+        if isinstance(aggregate_node.agg_func, dict):
+            aggregate_node.agg_func.pop(cname)
+        elif aggregate_node.pivot_arr is None:
             aggregate_node.df_in_vars.pop(cname)
             if aggregate_node.out_typer_vars is not None:
                 aggregate_node.out_typer_vars.pop(cname)
         else:
             aggregate_node.pivot_values.remove(cname)
 
+    # input columns of multiple aggregation that no output uses
+    if isinstance(aggregate_node.agg_func, dict):
+        used_cols = {c for c, _ in aggregate_node.agg_func.values()}
+        for cname in list(aggregate_node.df_in_vars.keys()):
+            if cname not in used_cols:
+                aggregate_node.df_in_vars.pop(cname)
+
     out_key_vars = aggregate_node.out_key_vars
     if out_key_vars is not None and all(v.name not in lives for v in out_key_vars):
         aggregate_node.out_key_vars = None
@@ -486,6 +548,36 @@ def aggregate_distributed_analysis(aggregate_node, array_dists):
 distributed_analysis.distributed_analysis_extensions[Aggregate] = aggregate_distributed_analysis
 
 
+def aggregate_partitioning_analysis(aggregate_node, array_dists, array_partitions):
+    out_vars = list(aggregate_node.df_out_vars.values())
+    if aggregate_node.out_key_vars is None or any(
+            array_dists[v.name] not in (Distribution.OneD, Distribution.OneD_Var)
+            for v in out_vars + aggregate_node.out_key_vars):
+        return
+    key_to_out = {v.name: w.name for v, w in zip(
+        aggregate_node.key_arrs, aggregate_node.out_key_vars)}
+    n_keys = len(aggregate_node.key_arrs)
+    # output is hash partitioned on the same keys as input if shuffle is
+    # skipped, and range partitioned on group keys if input is sorted on
+    # them. Otherwise, partitioning is decided at runtime (hash shuffle,
+    # sorted keys or dense key blocks) and is unknown.
+    in_part = _get_key_partitioning(aggregate_node, array_partitions)
+    if in_part is not None:
+        part = distributed_analysis.Partitioning(
+            'hash', tuple(key_to_out[k] for k in in_part.keys))
+    elif _is_key_sorted(aggregate_node, array_partitions):
+        in_part = array_partitions[aggregate_node.key_arrs[0].name]
+        part = distributed_analysis.Partitioning(
+            'range', tuple(key_to_out[k] for k in in_part.keys[:n_keys]))
+    else:
+        return
+    for v in out_vars + aggregate_node.out_key_vars:
+        array_partitions[v.name] = part
+
+
+distributed_analysis.partitioning_analysis_extensions[Aggregate] = aggregate_partitioning_analysis
+
+
 def build_agg_definitions(agg_node, definitions=None):
     if definitions is None:
         definitions = defaultdict(list)
@@ -555,6 +647,22 @@ def agg_distributed_run(agg_node, array_dists, typemap, calltypes, typingctx, ta
 
     # TODO: rebalance if output distributions are 1D instead of 1D_Var
 
+    # groups are local and no shuffle is necessary if input is hash
+    # partitioned on (a subset of) group keys already
+    if parallel and _get_key_partitioning(
+            agg_node, dist_pass._dist_analysis.array_partitions) is not None:
+        parallel = False
+
+    # rows of every group are contiguous if input is output of sort on group
+    # keys, so groups can be aggregated in a single pass without hashing
+    presorted = parallel and _is_key_sorted(
+        agg_node, dist_pass._dist_analysis.array_partitions)
+
+    # categorical codes or small range integer keys index reduction arrays
+    # directly, the key range is checked at runtime for integers
+    dense_key = (not presorted and len(agg_node.key_arrs) == 1
+                 and _is_dense_key_type(typemap[agg_node.key_arrs[0].name]))
+
     # TODO: handle key column being part of output
 
     key_typs = tuple(typemap[v.name] for v in agg_node.key_arrs)
@@ -567,27 +675,51 @@ def agg_distributed_run(agg_node, array_dists, typemap, calltypes, typingctx, ta
     pivot_typ = types.none if agg_node.pivot_arr is None else typemap[agg_node.pivot_arr.name]
     arg_typs = tuple(key_typs + in_col_typs + (pivot_typ,))
 
-    agg_func_struct = get_agg_func_struct(
-        agg_node.agg_func, in_col_typs, out_col_typs, typingctx, targetctx,
-        pivot_typ, agg_node.pivot_values, agg_node.is_crosstab)
-
     return_key = agg_node.out_key_vars is not None
-    out_typs = [t.dtype for t in out_col_typs]
-
-    top_level_func = gen_top_level_agg_func(
-        agg_node.key_names, return_key, agg_func_struct.var_typs, out_typs,
-        agg_node.df_in_vars.keys(), agg_node.df_out_vars.keys(), parallel)
-
-    f_block = compile_to_numba_ir(top_level_func,
-                                  {'hpat': hpat, 'np': np,
-                                   'agg_seq_iter': agg_seq_iter,
-                                   'parallel_agg': parallel_agg,
-                                   '__update_redvars': agg_func_struct.update_all_func,
-                                   '__init_func': agg_func_struct.init_func,
-                                   '__combine_redvars': agg_func_struct.combine_all_func,
-                                   '__eval_res': agg_func_struct.eval_all_func,
-                                   'dt64_dtype': np.dtype('datetime64[ns]'),
-                                   },
+
+    if agg_node.agg_func is _column_nunique_approx_impl:
+        # distinct counts are computed with sketches instead of reduction
+        # variables
+        agg_call = "agg_nunique_approx_parallel" if parallel else "agg_nunique_approx_seq"
+        top_level_func = gen_top_level_sketch_func(
+            agg_node.key_names, return_key, agg_node.df_in_vars.keys(),
+            agg_node.df_out_vars.keys(), agg_call, agg_node.agg_params)
+        glbs = {'agg_nunique_approx_seq': agg_nunique_approx_seq,
+                'agg_nunique_approx_parallel': agg_nunique_approx_parallel}
+    elif agg_node.agg_func is _column_quantile_approx_impl:
+        agg_call = "agg_quantile_parallel" if parallel else "agg_quantile_seq"
+        top_level_func = gen_top_level_sketch_func(
+            agg_node.key_names, return_key, agg_node.df_in_vars.keys(),
+            agg_node.df_out_vars.keys(), agg_call, agg_node.agg_params)
+        glbs = {'agg_quantile_seq': agg_quantile_seq,
+                'agg_quantile_parallel': agg_quantile_parallel}
+    else:
+        agg_func_struct = get_agg_func_struct(
+            agg_node.agg_func, list(agg_node.df_in_vars.keys()), in_col_typs,
+            out_col_typs, typingctx, targetctx, pivot_typ,
+            agg_node.pivot_values, agg_node.is_crosstab)
+
+        out_typs = [t.dtype for t in out_col_typs]
+
+        top_level_func = gen_top_level_agg_func(
+            agg_node.key_names, return_key, agg_func_struct.var_typs, out_typs,
+            agg_node.df_in_vars.keys(), agg_node.df_out_vars.keys(), parallel,
+            presorted, dense_key)
+        glbs = {'hpat': hpat, 'np': np,
+                'agg_seq_iter': agg_seq_iter,
+                'parallel_agg': parallel_agg,
+                'agg_dense_seq_iter': agg_dense_seq_iter,
+                'parallel_dense_agg': parallel_dense_agg,
+                'agg_sorted_seq_iter': agg_sorted_seq_iter,
+                'parallel_sorted_agg': parallel_sorted_agg,
+                '__update_redvars': agg_func_struct.update_all_func,
+                '__init_func': agg_func_struct.init_func,
+                '__combine_redvars': agg_func_struct.combine_all_func,
+                '__eval_res': agg_func_struct.eval_all_func,
+                'dt64_dtype': np.dtype('datetime64[ns]'),
+                }
+
+    f_block = compile_to_numba_ir(top_level_func, glbs,
                                   typingctx, arg_typs,
                                   typemap, calltypes).blocks.popitem()[1]
 
@@ -623,26 +755,78 @@ def agg_distributed_run(agg_node, array_dists, typemap, calltypes, typingctx, ta
 distributed.distributed_run_extensions[Aggregate] = agg_distributed_run
 
 
+def _get_key_partitioning(agg_node, array_partitions):
+    """return hash partitioning of input key arrays if rows of every group are
+    on the same rank, otherwise None
+    """
+    key_names = set(v.name for v in agg_node.key_arrs)
+    part = array_partitions.get(agg_node.key_arrs[0].name)
+    if (part is None or part.kind != 'hash'
+            or any(k not in key_names for k in part.keys)
+            or any(array_partitions.get(v.name) != part for v in agg_node.key_arrs)):
+        return None
+    return part
+
+
+def _is_dense_key_type(t):
+    return isinstance(t, CategoricalArray) or (
+        isinstance(t, types.Array) and isinstance(t.dtype, types.Integer))
+
+
+def _is_key_sorted(agg_node, array_partitions):
+    """return True if input key arrays are range partitioned (sorted) with
+    group keys as leading sort keys
+    """
+    key_names = set(v.name for v in agg_node.key_arrs)
+    part = array_partitions.get(agg_node.key_arrs[0].name)
+    return (part is not None and part.kind == 'range'
+            and set(part.keys[:len(key_names)]) == key_names
+            and all(array_partitions.get(v.name) == part for v in agg_node.key_arrs))
+
+
 @numba.njit
 def parallel_agg(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
                  __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
-    # alloc shuffle meta
+    # no shuffle is necessary if keys are sorted already (e.g. sorted
+    # parquet files)
+    if _is_sorted_dist(key_arrs):
+        return parallel_sorted_agg(
+            key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+            __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr)
+
     n_pes = hpat.distributed_api.get_size()
+    # keys are hashed once and destination ranks are reused below
+    hashes = hash_key_arrs(key_arrs)
+
+    # pre-aggregation doesn't reduce data if keys are mostly unique
+    if _bypass_pre_agg(hashes):
+        dest = get_dest_ranks_from_hashes(hashes, n_pes)
+        key_arrs, data_in, pivot_arr = shuffle_agg_input(key_arrs, data_in, pivot_arr, dest, n_pes)
+        return agg_seq_iter(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+                            __update_redvars, __eval_res, return_key, pivot_arr)
+
+    # shuffle in rounds if memory budget is set
+    if hpat.distributed_api.get_shuffle_memory_budget() > 0:
+        return parallel_agg_rounds(
+            key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+            __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr)
+
+    # alloc shuffle meta
     pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, data_redvar_dummy, n_pes, False)
+    dest = get_dest_ranks_from_hashes(hashes, n_pes)
+    row_group, group_first = get_group_ids(key_arrs, hashes)
 
-    # calc send/recv counts
-    key_set = get_key_set(key_arrs)
-    for i in range(len(key_arrs[0])):
+    # calc send/recv counts, one row per local group
+    for g in range(len(group_first)):
+        i = group_first[g]
         val = getitem_arr_tup_single(key_arrs, i)
-        if val not in key_set:
-            key_set.add(val)
-            node_id = hash(val) % n_pes
-            # data isn't computed here yet so pass empty tuple
-            update_shuffle_meta(pre_shuffle_meta, node_id, i, val_to_tup(val), (), False)
+        # data isn't computed here yet so pass empty tuple
+        update_shuffle_meta(pre_shuffle_meta, dest[i], i, val_to_tup(val), (), False)
 
     shuffle_meta = finalize_shuffle_meta(key_arrs, data_redvar_dummy, pre_shuffle_meta, n_pes, False, init_vals)
 
-    agg_parallel_local_iter(key_arrs, data_in, shuffle_meta, data_redvar_dummy, __update_redvars, pivot_arr)
+    agg_parallel_local_iter(key_arrs, data_in, shuffle_meta, data_redvar_dummy, __update_redvars, pivot_arr,
+                            dest, row_group, group_first)
 
     recvs = alltoallv_tup(key_arrs + data_redvar_dummy, shuffle_meta)
     # print(data_shuffle_meta[0].out_arr)
@@ -659,284 +843,734 @@ def parallel_agg(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
 
 
 @numba.njit
-def agg_parallel_local_iter(key_arrs, data_in, shuffle_meta, data_redvar_dummy,
-                            __update_redvars, pivot_arr):  # pragma: no cover
-    # _init_val_0 = np.int64(0)
-    # redvar_0_arr = np.full(n_uniq_keys, _init_val_0, np.int64)
-    # _init_val_1 = np.int64(0)
-    # redvar_1_arr = np.full(n_uniq_keys, _init_val_1, np.int64)
-    # out_key = np.empty(n_uniq_keys, np.float64)
+def _bypass_pre_agg(hashes):  # pragma: no cover
+    """decide on all ranks if local pre-aggregation should be skipped, using
+    number of distinct keys per rank estimated from keys sampled by hash value
+    """
+    n = len(hashes)
+    # keys with hash in 1/2^sample_bits of hash space are sampled
+    sample_bits = 0
+    while (n >> sample_bits) > PREAGG_SAMPLE_SIZE:
+        sample_bits += 1
+    n_sampled = 0
+    for i in range(n):
+        if sample_bits == 0 or _get_slot(hashes[i], sample_bits) == 0:
+            n_sampled += 1
+    sampled = np.empty(n_sampled, np.uint64)
+    j = 0
+    for i in range(n):
+        if sample_bits == 0 or _get_slot(hashes[i], sample_bits) == 0:
+            sampled[j] = hashes[i]
+            j += 1
+    n_distinct = len(np.unique(sampled)) << sample_bits
+
+    sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+    n_total = hpat.distributed_api.dist_reduce(n, sum_op)
+    n_distinct_total = hpat.distributed_api.dist_reduce(n_distinct, sum_op)
+    ratio = n_distinct_total / max(n_total, 1)
+    bypass = ratio > PREAGG_BYPASS_RATIO
+    if REPORT_AGG_PATH and hpat.distributed_api.get_rank() == 0:
+        if bypass:
+            print("groupby: pre-aggregation bypassed, estimated distinct ratio", ratio)
+        else:
+            print("groupby: pre-aggregation used, estimated distinct ratio", ratio)
+    return bypass
+
+
+def shuffle_agg_input(key_arrs, data_in, pivot_arr, dest, n_pes):  # pragma: no cover
+    return key_arrs, data_in, pivot_arr
+
+
+@overload(shuffle_agg_input)
+def shuffle_agg_input_overload(key_arrs, data_in, pivot_arr, dest, n_pes):
+    """shuffle raw input rows of groupby to destination ranks"""
+    if pivot_arr == types.none:
+        def shuffle_impl(key_arrs, data_in, pivot_arr, dest, n_pes):
+            key_arrs, data_in = shuffle_with_dest(key_arrs, data_in, dest, n_pes)
+            return key_arrs, data_in, None
+        return shuffle_impl
+
+    def shuffle_pivot_impl(key_arrs, data_in, pivot_arr, dest, n_pes):
+        key_arrs, data = shuffle_with_dest(key_arrs, data_in + (pivot_arr,), dest, n_pes)
+        return key_arrs, data[:-1], data[-1]
+
+    return shuffle_pivot_impl
+
+
+@numba.njit
+def parallel_sorted_agg(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+                        __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
+    """aggregate globally sorted keys in a single pass without shuffle. Only
+    groups spanning rank boundaries are fixed up using the first and last
+    groups of all ranks: a group is output by the first rank that has it.
+    """
+    redvar_arrs, group_first = agg_sorted_local_iter(
+        key_arrs, data_redvar_dummy, data_in, init_vals, __update_redvars, pivot_arr)
+    n_groups = len(group_first)
+    n_pes = hpat.distributed_api.get_size()
+    my_rank = hpat.distributed_api.get_rank()
+
+    # exchange keys and reduction variables of boundary groups
+    bnd_groups = _get_boundary_inds(n_groups)
+    all_keys = hpat.distributed_api.allgatherv_tup(
+        hpat.hiframes.sort.gather_arr_tup(key_arrs, group_first[bnd_groups]))
+    all_redvars = hpat.distributed_api.allgatherv_tup(
+        hpat.hiframes.sort.gather_arr_tup(redvar_arrs, bnd_groups))
+    counts = hpat.distributed_api.allgatherv(np.full(1, len(bnd_groups), np.int64))
+    start = counts[:my_rank].sum()
+
+    # first group is output by a previous rank if it continues there
+    drop = 0
+    if n_groups > 0 and start > 0 and keys_equal_tup(all_keys, start - 1, all_keys, start):
+        drop = 1
+
+    # combine continuation of last group on next ranks
+    if n_groups > drop:
+        last = start + counts[my_rank] - 1
+        k = last + 1
+        for r in range(my_rank + 1, n_pes):
+            if counts[r] == 0:
+                continue
+            if not keys_equal_tup(all_keys, last, all_keys, k):
+                break
+            __combine_redvars(redvar_arrs, all_redvars, n_groups - 1, k, pivot_arr)
+            # group may continue further only if it is the only one on rank r
+            if counts[r] > 1:
+                break
+            k += 1
+
+    n_out = n_groups - drop
+    if drop == 1:
+        redvar_arrs = hpat.hiframes.sort.gather_arr_tup(redvar_arrs, np.arange(1, n_groups))
+    out_arrs = alloc_agg_output(n_out, out_dummy_tup, key_arrs,
+                                group_first[drop:], data_in, return_key)
+    for j in range(n_out):
+        __eval_res(redvar_arrs, out_arrs, j)
+
+    return out_arrs
+
+
+@numba.njit
+def _is_sorted_dist(key_arrs):  # pragma: no cover
+    """check if key arrays are sorted (ascending or descending) across ranks,
+    which makes rows of every group contiguous
+    """
+    asc, desc = _get_key_order(key_arrs)
+    min_op = np.int32(hpat.distributed_api.Reduce_Type.Min.value)
+    all_asc = hpat.distributed_api.dist_reduce(np.int32(1 if asc else 0), min_op)
+    all_desc = hpat.distributed_api.dist_reduce(np.int32(1 if desc else 0), min_op)
+    if all_asc == 0 and all_desc == 0:
+        return False
+
+    # first and last keys of ranks should be sorted in rank order as well
+    n = len(key_arrs[0])
+    bnd_keys = hpat.distributed_api.allgatherv_tup(
+        hpat.hiframes.sort.gather_arr_tup(key_arrs, _get_boundary_inds(n)))
+    bnd_asc, bnd_desc = _get_key_order(bnd_keys)
+    is_sorted = (all_asc == 1 and bnd_asc) or (all_desc == 1 and bnd_desc)
+    if REPORT_AGG_PATH and is_sorted and hpat.distributed_api.get_rank() == 0:
+        print("groupby: keys are sorted, shuffle skipped")
+    return is_sorted
+
+
+@numba.njit
+def _get_key_order(key_arrs):  # pragma: no cover
+    """return whether key arrays are sorted in ascending and descending order
+    """
+    asc = True
+    desc = True
+    for i in range(1, len(key_arrs[0])):
+        c = hpat.hiframes.sort.cmp_row_tup(key_arrs, i - 1, i, True)
+        if c > 0:
+            asc = False
+        elif c < 0:
+            desc = False
+        if not asc and not desc:
+            break
+    return asc, desc
+
+
+@numba.njit
+def _get_boundary_inds(n):  # pragma: no cover
+    # indices of first and last element (if any)
+    inds = np.empty(min(n, 2), np.int64)
+    if n > 0:
+        inds[0] = 0
+        inds[-1] = n - 1
+    return inds
+
+
+@numba.njit
+def parallel_agg_rounds(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+                        __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
+    # aggregate locally into arrays of unique keys and reduction variables,
+    # then shuffle them with the memory-bounded shuffle
     n_pes = hpat.distributed_api.get_size()
-    # hpat.dict_ext.init_dict_float64_int64()
-    # key_write_map = get_key_dict(key_arrs[0])
-    key_write_map, byte_v = get_key_dict(key_arrs)
+    # group_first is the first row of every key in input
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    n_uniq_keys = len(group_first)
+
+    redvar_arrs = alloc_arr_tup(n_uniq_keys, data_redvar_dummy, init_vals)
+    for i in range(len(key_arrs[0])):
+        __update_redvars(redvar_arrs, data_in, row_group[i], i, pivot_arr)
+
+    local_keys = hpat.hiframes.sort.gather_arr_tup(key_arrs, group_first)
+    dest = get_dest_ranks(local_keys, n_pes)
+    recv_keys, reduce_recvs = shuffle_with_dest(local_keys, redvar_arrs, dest, n_pes)
+    out_arrs = agg_parallel_combine_iter(recv_keys, reduce_recvs, out_dummy_tup,
+                                         init_vals, __combine_redvars, __eval_res, return_key, data_in, pivot_arr)
+    return out_arrs
 
+
+@numba.njit
+def agg_parallel_local_iter(key_arrs, data_in, shuffle_meta, data_redvar_dummy,
+                            __update_redvars, pivot_arr, dest, row_group, group_first):  # pragma: no cover
     redvar_arrs = get_shuffle_data_send_buffs(shuffle_meta, key_arrs, data_redvar_dummy)
 
+    # write keys to send buffers and find position of every group's
+    # reduction variables in send buffers
+    n_groups = len(group_first)
+    group_w_ind = np.empty(n_groups, np.int64)
+    for g in range(n_groups):
+        i = group_first[g]
+        val = getitem_arr_tup_single(key_arrs, i)
+        node_id = dest[i]
+        group_w_ind[g] = write_send_buff(shuffle_meta, node_id, i, val_to_tup(val), ())
+        shuffle_meta.tmp_offset[node_id] += 1
+
     for i in range(len(key_arrs[0])):
-        # k = key_arrs[0][i]
-        k = _getitem_keys(key_arrs, i, byte_v)
-        if k not in key_write_map:
-            # k is byte_vec but we need tuple value for hashing
-            val = getitem_arr_tup_single(key_arrs, i)
-            node_id = hash(val) % n_pes
-            w_ind = write_send_buff(shuffle_meta, node_id, i, val_to_tup(val), ())
-            shuffle_meta.tmp_offset[node_id] += 1
-            key_write_map[k] = w_ind
-        else:
-            w_ind = key_write_map[k]
-        __update_redvars(redvar_arrs, data_in, w_ind, i, pivot_arr)
-        #redvar_arrs[0][w_ind], redvar_arrs[1][w_ind] = __update_redvars(redvar_arrs[0][w_ind], redvar_arrs[1][w_ind], data_in[0][i])
-    hpat.dict_ext.byte_vec_free(byte_v)
+        __update_redvars(redvar_arrs, data_in, group_w_ind[row_group[i]], i, pivot_arr)
     return
 
 
 @numba.njit
 def agg_parallel_combine_iter(key_arrs, reduce_recvs, out_dummy_tup, init_vals,
                               __combine_redvars, __eval_res, return_key, data_in, pivot_arr):  # pragma: no cover
-    key_set = _build_set_tup(key_arrs)
-    n_uniq_keys = len(key_set)
-    out_arrs = alloc_agg_output(n_uniq_keys, out_dummy_tup, key_set, data_in,
-                                return_key)
-    # out_arrs = alloc_arr_tup(n_uniq_keys, out_dummy_tup)
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    n_uniq_keys = len(group_first)
+    out_arrs = alloc_agg_output(n_uniq_keys, out_dummy_tup, key_arrs,
+                                group_first, data_in, return_key)
     local_redvars = alloc_arr_tup(n_uniq_keys, reduce_recvs, init_vals)
 
-    # key_write_map = get_key_dict(key_arrs[0])
-    key_write_map, byte_v = get_key_dict(key_arrs)
-    curr_write_ind = 0
     for i in range(len(key_arrs[0])):
-        # k = key_arrs[0][i]
-        k = _getitem_keys(key_arrs, i, byte_v)
-        if k not in key_write_map:
-            w_ind = curr_write_ind
-            curr_write_ind += 1
-            key_write_map[k] = w_ind
-            if return_key:
-                _set_out_keys(out_arrs, w_ind, key_arrs, i, k)
-                # setitem_array_with_str(out_arrs[-1], w_ind, k)
-                # out_arrs[-1][w_ind] = k
-        else:
-            w_ind = key_write_map[k]
-        __combine_redvars(local_redvars, reduce_recvs, w_ind, i, pivot_arr)
+        __combine_redvars(local_redvars, reduce_recvs, row_group[i], i, pivot_arr)
+    for j in range(n_uniq_keys):
+        __eval_res(local_redvars, out_arrs, j)
+
+    return out_arrs
+
+
+@numba.njit
+def agg_sorted_local_iter(key_arrs, redvar_dummy_tup, data_in, init_vals,
+                          __update_redvars, pivot_arr):  # pragma: no cover
+    """aggregate contiguous runs of equal keys, returns reduction variables
+    and first row of every run
+    """
+    n = len(key_arrs[0])
+    group_first = np.empty(n, np.int64)
+    n_groups = 0
+    for i in range(n):
+        if i == 0 or not keys_equal_tup(key_arrs, i - 1, key_arrs, i):
+            group_first[n_groups] = i
+            n_groups += 1
+    group_first = group_first[:n_groups]
+
+    redvar_arrs = alloc_arr_tup(n_groups, redvar_dummy_tup, init_vals)
+    for g in range(n_groups):
+        end = group_first[g + 1] if g + 1 < n_groups else n
+        for i in range(group_first[g], end):
+            __update_redvars(redvar_arrs, data_in, g, i, pivot_arr)
+    return redvar_arrs, group_first
+
+
+@numba.njit
+def agg_sorted_seq_iter(key_arrs, redvar_dummy_tup, out_dummy_tup, data_in, init_vals,
+                        __update_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
+    local_redvars, group_first = agg_sorted_local_iter(
+        key_arrs, redvar_dummy_tup, data_in, init_vals, __update_redvars, pivot_arr)
+    n_uniq_keys = len(group_first)
+    out_arrs = alloc_agg_output(n_uniq_keys, out_dummy_tup, key_arrs,
+                                group_first, data_in, return_key)
     for j in range(n_uniq_keys):
         __eval_res(local_redvars, out_arrs, j)
 
-    hpat.dict_ext.byte_vec_free(byte_v)
     return out_arrs
 
 
 @numba.njit
 def agg_seq_iter(key_arrs, redvar_dummy_tup, out_dummy_tup, data_in, init_vals,
                  __update_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
-    key_set = _build_set_tup(key_arrs)
-    n_uniq_keys = len(key_set)
-    out_arrs = alloc_agg_output(n_uniq_keys, out_dummy_tup, key_set, data_in,
-                                return_key)
-    # out_arrs = alloc_arr_tup(n_uniq_keys, out_dummy_tup)
+    # sorted keys are aggregated in runs without hashing
+    asc, desc = _get_key_order(key_arrs)
+    if asc or desc:
+        return agg_sorted_seq_iter(key_arrs, redvar_dummy_tup, out_dummy_tup, data_in,
+                                   init_vals, __update_redvars, __eval_res, return_key, pivot_arr)
+
+    # dense group ids index reduction variable arrays
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    n_uniq_keys = len(group_first)
+    out_arrs = alloc_agg_output(n_uniq_keys, out_dummy_tup, key_arrs,
+                                group_first, data_in, return_key)
     local_redvars = alloc_arr_tup(n_uniq_keys, redvar_dummy_tup, init_vals)
 
-    key_write_map, byte_v = get_key_dict(key_arrs)
-    curr_write_ind = 0
     for i in range(len(key_arrs[0])):
-        #k = key_arrs[0][i]
-        k = _getitem_keys(key_arrs, i, byte_v)
-        if k not in key_write_map:
-            w_ind = curr_write_ind
-            curr_write_ind += 1
-            key_write_map[k] = w_ind
-            if return_key:
-                _set_out_keys(out_arrs, w_ind, key_arrs, i, k)
-                # setitem_array_with_str(out_arrs[-1], w_ind, k)
-                # out_arrs[-1][w_ind] = k
-        else:
-            w_ind = key_write_map[k]
-        __update_redvars(local_redvars, data_in, w_ind, i, pivot_arr)
+        __update_redvars(local_redvars, data_in, row_group[i], i, pivot_arr)
     for j in range(n_uniq_keys):
         __eval_res(local_redvars, out_arrs, j)
 
-    hpat.dict_ext.byte_vec_free(byte_v)
     return out_arrs
 
 
-def get_shuffle_data_send_buffs(sh, karrs, data):  # pragma: no cover
-    return ()
+@numba.njit
+def agg_dense_seq_iter(key_arrs, redvar_dummy_tup, out_dummy_tup, data_in, init_vals,
+                       __update_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
+    min_key, n_keys = _get_dense_key_range(key_arrs[0], False)
+    if n_keys > hpat.config.config_dense_agg_max_keys:
+        return agg_seq_iter(key_arrs, redvar_dummy_tup, out_dummy_tup, data_in, init_vals,
+                            __update_redvars, __eval_res, return_key, pivot_arr)
 
+    redvar_arrs, counts = agg_dense_local_iter(
+        key_arrs[0], min_key, n_keys, redvar_dummy_tup, data_in, init_vals,
+        __update_redvars, pivot_arr)
+    groups = np.arange(n_keys)[counts > 0]
+    return _dense_agg_output(redvar_arrs, groups, groups + min_key, out_dummy_tup,
+                             key_arrs[0], __eval_res, return_key)
 
-@overload(get_shuffle_data_send_buffs)
-def get_shuffle_data_send_buffs_overload(meta, key_arrs, data):
-    n_keys = len(key_arrs.types)
-    count = len(data.types)
 
-    func_text = "def send_buff_impl(meta, key_arrs, data):\n"
-    func_text += "  return ({}{})\n".format(','.join(["meta.send_buff_tup[{}]".format(
-        i) for i in range(n_keys, count + n_keys)]),
-        "," if count == 1 else "")  # single value needs comma to become tuple
+@numba.njit
+def parallel_dense_agg(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+                       __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr):  # pragma: no cover
+    """aggregate with keys as indices of dense reduction arrays, ranks own
+    contiguous blocks of the key range and only reduction variables of
+    existing groups are sent to owners (no hashing). Output is not hash
+    partitioned (see aggregate_partitioning_analysis).
+    """
+    min_key, n_keys = _get_dense_key_range(key_arrs[0], True)
+    if n_keys > hpat.config.config_dense_agg_max_keys:
+        return parallel_agg(key_arrs, data_redvar_dummy, out_dummy_tup, data_in, init_vals,
+                            __update_redvars, __combine_redvars, __eval_res, return_key, pivot_arr)
+    if REPORT_AGG_PATH and hpat.distributed_api.get_rank() == 0:
+        print("groupby: dense keys, range", n_keys)
+
+    redvar_arrs, counts = agg_dense_local_iter(
+        key_arrs[0], min_key, n_keys, data_redvar_dummy, data_in, init_vals,
+        __update_redvars, pivot_arr)
+    groups = np.arange(n_keys)[counts > 0]
 
-    # print(func_text)
+    n_pes = hpat.distributed_api.get_size()
+    block = max((n_keys + n_pes - 1) // n_pes, 1)
+    start = min(hpat.distributed_api.get_rank() * block, n_keys)
+    n_local = min(block, n_keys - start)
+    dest = (groups // block).astype(np.int32)
+    recv_groups, reduce_recvs = shuffle_with_dest(
+        (groups,), hpat.hiframes.sort.gather_arr_tup(redvar_arrs, groups), dest, n_pes)
+    recv_groups = recv_groups[0]
+
+    local_redvars = alloc_arr_tup(n_local, data_redvar_dummy, init_vals)
+    exists = np.zeros(n_local, np.bool_)
+    for i in range(len(recv_groups)):
+        w_ind = recv_groups[i] - start
+        exists[w_ind] = True
+        __combine_redvars(local_redvars, reduce_recvs, w_ind, i, pivot_arr)
+    groups = np.arange(n_local)[exists]
+    return _dense_agg_output(local_redvars, groups, groups + (start + min_key),
+                             out_dummy_tup, key_arrs[0], __eval_res, return_key)
 
-    loc_vars = {}
-    exec(func_text, {}, loc_vars)
-    send_buff_impl = loc_vars['send_buff_impl']
-    return send_buff_impl
+
+@numba.njit
+def agg_dense_local_iter(key_arr, min_key, n_keys, redvar_dummy_tup, data_in, init_vals,
+                         __update_redvars, pivot_arr):  # pragma: no cover
+    """aggregate into reduction arrays indexed by key - min_key, returns
+    reduction arrays and number of rows of every key
+    """
+    codes = cat_array_to_int(key_arr)
+    redvar_arrs = alloc_arr_tup(n_keys, redvar_dummy_tup, init_vals)
+    counts = np.zeros(n_keys, np.int64)
+    for i in range(len(codes)):
+        w_ind = np.int64(codes[i]) - min_key
+        # NA categorical values have code -1
+        if w_ind < 0:
+            continue
+        counts[w_ind] += 1
+        __update_redvars(redvar_arrs, data_in, w_ind, i, pivot_arr)
+    return redvar_arrs, counts
+
+
+@numba.njit
+def _dense_agg_output(redvar_arrs, groups, key_vals, out_dummy_tup, key_arr,
+                      __eval_res, return_key):  # pragma: no cover
+    # reduction variables of existing groups are made contiguous for eval
+    n_uniq_keys = len(groups)
+    local_redvars = hpat.hiframes.sort.gather_arr_tup(redvar_arrs, groups)
+    out_key = _get_dense_out_key(key_vals, key_arr)
+    out_arrs = _alloc_dense_agg_output(n_uniq_keys, out_dummy_tup, out_key, return_key)
+    for j in range(n_uniq_keys):
+        __eval_res(local_redvars, out_arrs, j)
+    return out_arrs
 
 
-def get_key_dict(arr):  # pragma: no cover
-    return dict()
+def _get_dense_key_range(key_arr, parallel):  # pragma: no cover
+    return 0, 0
 
 
-@overload(get_key_dict)
-def get_key_dict_overload(arr):
-    """returns dictionary and possibly a byte_vec for multi-key case
+@overload(_get_dense_key_range)
+def _get_dense_key_range_overload(key_arr, parallel):
+    """minimum key and size of range of keys (number of categories for
+    categorical keys)
     """
-    # get byte_vec dict for multi-key case
-    if isinstance(arr, types.BaseTuple) and len(arr.types) != 1:
-        n_bytes = 0
-        context = numba.targets.registry.cpu_target.target_context
-        for t in arr.types:
-            n_bytes += context.get_abi_sizeof(context.get_data_type(t.dtype))
-
-        def _impl(arr):
-            b_v = hpat.dict_ext.byte_vec_init(n_bytes, 0)
-            b_dict = hpat.dict_ext.dict_byte_vec_int64_init()
-            return b_dict, b_v
-        return _impl
-
-    # regular scalar keys
-    dtype = arr.types[0].dtype
-    func_text = "def k_dict_impl(arr):\n"
-    func_text += "  b_v = hpat.dict_ext.byte_vec_init(1, 0)\n"
-    func_text += "  return hpat.dict_ext.dict_{}_int64_init(), b_v\n".format(dtype)
+    if isinstance(key_arr, CategoricalArray):
+        n_cats = len(key_arr.dtype.categories)
+        return lambda key_arr, parallel: (0, n_cats)
+
+    # ranges larger than dense aggregation limit are reported as limit + 1
+    # since the actual size may not fit in int64
+    max_keys = hpat.config.config_dense_agg_max_keys
+    int64_max = np.iinfo(np.int64).max
+    # uint64 keys larger than int64 max can't be converted to int64
+    check_uint64 = key_arr.dtype == types.uint64
+
+    def range_impl(key_arr, parallel):
+        min_key = int64_max
+        max_key = np.iinfo(np.int64).min
+        too_wide = 0
+        for i in range(len(key_arr)):
+            if check_uint64 and key_arr[i] > np.uint64(int64_max):
+                too_wide = 1
+                continue
+            min_key = min(min_key, np.int64(key_arr[i]))
+            max_key = max(max_key, np.int64(key_arr[i]))
+        if parallel:
+            min_key = hpat.distributed_api.dist_reduce(
+                min_key, np.int32(hpat.distributed_api.Reduce_Type.Min.value))
+            max_key = hpat.distributed_api.dist_reduce(
+                max_key, np.int32(hpat.distributed_api.Reduce_Type.Max.value))
+            too_wide = hpat.distributed_api.dist_reduce(
+                too_wide, np.int32(hpat.distributed_api.Reduce_Type.Max.value))
+        if too_wide != 0:
+            return min_key, max_keys + 1
+        if max_key < min_key:
+            return 0, 0
+        # unsigned difference doesn't overflow
+        diff = np.uint64(max_key) - np.uint64(min_key)
+        if diff >= np.uint64(max_keys):
+            return min_key, max_keys + 1
+        return min_key, np.int64(diff) + 1
+    return range_impl
+
+
+def _get_dense_out_key(key_vals, key_arr):  # pragma: no cover
+    return key_arr
+
+
+@overload(_get_dense_out_key)
+def _get_dense_out_key_overload(key_vals, key_arr):
+    # output key array of the same type as input key from key values
+    if isinstance(key_arr, CategoricalArray):
+        return lambda key_vals, key_arr: set_cat_dtype(
+            key_vals.astype(cat_array_to_int(key_arr).dtype), key_arr)
+    return lambda key_vals, key_arr: key_vals.astype(key_arr.dtype)
+
+
+def _alloc_dense_agg_output(n_uniq_keys, out_dummy_tup, out_key, return_key):  # pragma: no cover
+    return out_dummy_tup
+
+
+@overload(_alloc_dense_agg_output)
+def _alloc_dense_agg_output_overload(n_uniq_keys, out_dummy_tup, out_key, return_key):
+    # return key is either True or None
+    n_out = out_dummy_tup.count
+    if return_key == types.boolean:
+        n_out -= 1
+
+    func_text = "def f(n_uniq_keys, out_dummy_tup, out_key, return_key):\n"
+    for i in range(n_out):
+        func_text += "  c_{} = empty_like_type(n_uniq_keys, out_dummy_tup[{}])\n".format(i, i)
+    outs = ["c_{}".format(i) for i in range(n_out)]
+    if return_key == types.boolean:
+        outs.append("out_key")
+    func_text += "  return ({}{})\n".format(", ".join(outs), "," if len(outs) == 1 else "")
+
     loc_vars = {}
-    exec(func_text, {'hpat': hpat}, loc_vars)
-    k_dict_impl = loc_vars['k_dict_impl']
-    return k_dict_impl
+    exec(func_text, {'empty_like_type': empty_like_type}, loc_vars)
+    alloc_impl = loc_vars['f']
+    return alloc_impl
 
 
-def _getitem_keys(key_arrs, i, b_v):
-    return key_arrs[i]
+@numba.njit
+def agg_nunique_approx_seq(key_arrs, data_in, return_key):  # pragma: no cover
+    p = hpat.config.config_hll_precision
+    n_cols = len(data_in)
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    codes, vals = _nunique_hll_codes(data_in, row_group, len(group_first), p)
+    codes, vals = hpat.sketches.hll_sparse_merge(codes, vals)
+    counts = hpat.sketches.hll_sparse_estimate(codes, vals, len(group_first) * n_cols, p)
+    return _agg_sets_output(counts, data_in, key_arrs, group_first, return_key)
 
 
-@overload(_getitem_keys)
-def _getitem_keys_overload(arrs, ind, b_v):
-    if isinstance(arrs, types.BaseTuple) and len(arrs.types) != 1:
-        func_text = "def getitem_impl(arrs, ind, b_v):\n"
-        offset = 0
-        context = numba.targets.registry.cpu_target.target_context
-        for i, t in enumerate(arrs.types):
-            n_bytes = context.get_abi_sizeof(context.get_data_type(t.dtype))
-            func_text += "  arr_ptr = arrs[{}].ctypes.data + ind * {}\n".format(i, n_bytes)
-            func_text += "  hpat.dict_ext.byte_vec_set(b_v, {}, arr_ptr, {})\n".format(offset, n_bytes)
-            offset += n_bytes
+@numba.njit
+def agg_nunique_approx_parallel(key_arrs, data_in, return_key):  # pragma: no cover
+    """approximate distinct counts of groups using sparse HyperLogLog
+    sketches, only nonzero registers are shuffled instead of all values
+    """
+    p = hpat.config.config_hll_precision
+    n_pes = hpat.distributed_api.get_size()
+    n_cols = len(data_in)
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    codes, vals = _nunique_hll_codes(data_in, row_group, len(group_first), p)
+    codes, vals = hpat.sketches.hll_sparse_merge(codes, vals)
+
+    # send registers to ranks of their groups, register codes are sent
+    # without local group ids
+    groups = (codes >> p) // n_cols
+    col_codes = codes - ((groups * n_cols) << p)
+    recv_keys, recv_group, recv_data = _shuffle_group_rows(
+        key_arrs, group_first, groups, (col_codes, vals), n_pes)
+
+    row_group, group_first = get_group_ids(recv_keys, hash_key_arrs(recv_keys))
+    row_group = row_group[recv_group]
+    codes = ((row_group * n_cols) << p) + recv_data[0]
+    codes, vals = hpat.sketches.hll_sparse_merge(codes, recv_data[1])
+    counts = hpat.sketches.hll_sparse_estimate(codes, vals, len(group_first) * n_cols, p)
+    return _agg_sets_output(counts, data_in, recv_keys, group_first, return_key)
+
+
+@numba.njit
+def _shuffle_group_rows(key_arrs, group_first, groups, data, n_pes):  # pragma: no cover
+    """shuffle rows of 'data' to the ranks of their local groups 'groups'.
+    Keys are sent once per group with its number of rows, and rows are sent
+    in group order after them, so every received row is labeled with the
+    index of its key in the received keys.
+    """
+    n_groups = len(group_first)
+    n = len(groups)
+    counts = np.zeros(n_groups, np.int64)
+    for i in range(n):
+        counts[groups[i]] += 1
+    # stable counting sort of rows by group
+    perm = np.empty(n, np.int64)
+    tmp_offset = np.empty(n_groups, np.int64)
+    curr = 0
+    for g in range(n_groups):
+        tmp_offset[g] = curr
+        curr += counts[g]
+    for i in range(n):
+        g = groups[i]
+        perm[tmp_offset[g]] = i
+        tmp_offset[g] += 1
+
+    group_keys = hpat.hiframes.sort.gather_arr_tup(key_arrs, group_first)
+    group_dest = get_dest_ranks(group_keys, n_pes)
+    recv_keys, recv_counts_tup = shuffle_with_dest(group_keys, (counts,), group_dest, n_pes)
+    # rows and keys of every rank are received in the same group order
+    recv_data, _ = shuffle_with_dest(
+        hpat.hiframes.sort.gather_arr_tup(data, perm), (), group_dest[groups[perm]], n_pes)
+    recv_counts = recv_counts_tup[0]
+    recv_group = np.empty(recv_counts.sum(), np.int64)
+    w = 0
+    for g in range(len(recv_counts)):
+        for _ in range(recv_counts[g]):
+            recv_group[w] = g
+            w += 1
+    return recv_keys, recv_group, recv_data
+
+
+def _nunique_hll_codes(data_in, row_group, n_groups, p):  # pragma: no cover
+    return np.empty(0, np.int64), np.empty(0, np.uint8)
+
+
+@overload(_nunique_hll_codes)
+def _nunique_hll_codes_overload(data_in, row_group, n_groups, p):
+    """sparse registers of values of every group and column (set id is
+    group * n_cols + column). An empty register is added for every group to
+    keep groups with only NA values.
+    """
+    n_cols = data_in.count
+    func_text = "def f(data_in, row_group, n_groups, p):\n"
+    func_text += "  n = len(row_group)\n"
+    func_text += "  codes = np.empty(n * {} + n_groups, np.int64)\n".format(n_cols)
+    func_text += "  vals = np.zeros(n * {} + n_groups, np.uint8)\n".format(n_cols)
+    func_text += "  for g in range(n_groups):\n"
+    func_text += "    codes[g] = (g * {}) << p\n".format(n_cols)
+    func_text += "  w = n_groups\n"
+    for k in range(n_cols):
+        func_text += "  arr = data_in[{}]\n".format(k)
+        func_text += "  for i in range(n):\n"
+        func_text += "    if not isna(arr, i):\n"
+        func_text += "      j, r = hll_register(hash_arr_item(arr, i), p)\n"
+        func_text += "      codes[w] = ((row_group[i] * {} + {}) << p) | j\n".format(n_cols, k)
+        func_text += "      vals[w] = r\n"
+        func_text += "      w += 1\n"
+    func_text += "  return codes[:w], vals[:w]\n"
+
+    loc_vars = {}
+    exec(func_text, {'np': np, 'isna': hpat.hiframes.api.isna,
+                     'hll_register': hpat.sketches.hll_register,
+                     'hash_arr_item': hash_arr_item}, loc_vars)
+    codes_impl = loc_vars['f']
+    return codes_impl
 
-        func_text += "  return b_v\n"
-        loc_vars = {}
-        exec(func_text, {'hpat': hpat}, loc_vars)
-        getitem_impl = loc_vars['getitem_impl']
-        return getitem_impl
 
-    return lambda arrs, ind, b_v: arrs[0][ind]
+@numba.njit
+def agg_quantile_seq(key_arrs, data_in, q, return_key):  # pragma: no cover
+    n_cols = len(data_in)
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    set_ids, vals = _quantile_set_vals(data_in, row_group)
+    offsets, vals, weights = hpat.sketches.sort_sets(
+        set_ids, vals, np.ones(len(vals), np.float64), len(group_first) * n_cols)
+    res = hpat.sketches.sets_quantile(offsets, vals, weights, q)
+    return _agg_sets_output(res, data_in, key_arrs, group_first, return_key)
 
 
-def _set_out_keys(out_arrs, w_ind, key_arrs, i, k):
-    setitem_array_with_str(out_arrs[-1], w_ind, k)
+@numba.njit
+def agg_quantile_parallel(key_arrs, data_in, q, return_key):  # pragma: no cover
+    """approximate quantiles of groups, only summaries of values of every
+    group (hpat.sketches.quantile_summary) are shuffled instead of all values
+    """
+    k = hpat.sketches.quantile_summary_size()
+    n_pes = hpat.distributed_api.get_size()
+    n_cols = len(data_in)
+    row_group, group_first = get_group_ids(key_arrs, hash_key_arrs(key_arrs))
+    n_groups = len(group_first)
+    set_ids, vals = _quantile_set_vals(data_in, row_group)
+    offsets, vals, weights = hpat.sketches.sort_sets(
+        set_ids, vals, np.ones(len(vals), np.float64), n_groups * n_cols)
+    set_ids, vals, weights = hpat.sketches.summarize_sets(offsets, vals, k)
+    # a zero weight point is added for every group to keep groups with only
+    # NA values
+    set_ids = np.concatenate((np.arange(n_groups) * n_cols, set_ids))
+    vals = np.concatenate((np.zeros(n_groups, np.float64), vals))
+    weights = np.concatenate((np.zeros(n_groups, np.float64), weights))
+
+    # send summaries to ranks of their groups
+    groups = set_ids // n_cols
+    recv_keys, recv_group, recv_data = _shuffle_group_rows(
+        key_arrs, group_first, groups, (set_ids - groups * n_cols, vals, weights), n_pes)
+
+    row_group, group_first = get_group_ids(recv_keys, hash_key_arrs(recv_keys))
+    row_group = row_group[recv_group]
+    set_ids = row_group * n_cols + recv_data[0]
+    valid = recv_data[2] > 0.0
+    offsets, vals, weights = hpat.sketches.sort_sets(
+        set_ids[valid], recv_data[1][valid], recv_data[2][valid],
+        len(group_first) * n_cols)
+    res = hpat.sketches.sets_quantile(offsets, vals, weights, q)
+    return _agg_sets_output(res, data_in, recv_keys, group_first, return_key)
+
+
+def _quantile_set_vals(data_in, row_group):  # pragma: no cover
+    return np.empty(0, np.int64), np.empty(0, np.float64)
+
+
+@overload(_quantile_set_vals)
+def _quantile_set_vals_overload(data_in, row_group):
+    """non-NA values of every group and column as float64 with their set ids
+    (group * n_cols + column)
+    """
+    n_cols = data_in.count
+    func_text = "def f(data_in, row_group):\n"
+    func_text += "  n = len(row_group)\n"
+    func_text += "  set_ids = np.empty(n * {}, np.int64)\n".format(n_cols)
+    func_text += "  vals = np.empty(n * {}, np.float64)\n".format(n_cols)
+    func_text += "  w = 0\n"
+    for k in range(n_cols):
+        func_text += "  arr = data_in[{}]\n".format(k)
+        func_text += "  for i in range(n):\n"
+        func_text += "    if not isna(arr, i):\n"
+        func_text += "      set_ids[w] = row_group[i] * {} + {}\n".format(n_cols, k)
+        func_text += "      vals[w] = arr[i]\n"
+        func_text += "      w += 1\n"
+    func_text += "  return set_ids[:w], vals[:w]\n"
 
+    loc_vars = {}
+    exec(func_text, {'np': np, 'isna': hpat.hiframes.api.isna}, loc_vars)
+    vals_impl = loc_vars['f']
+    return vals_impl
 
-@overload(_set_out_keys)
-def _set_out_keys_overload(out_arrs, w_ind, key_arrs, i, k):
-    if isinstance(key_arrs, types.BaseTuple):
-        n_keys = len(key_arrs.types)
-        n_outs = len(out_arrs.types)
-        key_start = n_outs - n_keys
 
-        func_text = "def set_keys_impl(out_arrs, w_ind, key_arrs, i, k):\n"
-        for i in range(n_keys):
-            func_text += "  setitem_array_with_str(out_arrs[{}], w_ind, key_arrs[{}][i])\n".format(
-                key_start + i, i)
+def _agg_sets_output(res, data_in, key_arrs, group_first, return_key):  # pragma: no cover
+    return (res,)
 
-        # print(func_text)
-        loc_vars = {}
-        exec(func_text, {'setitem_array_with_str': setitem_array_with_str}, loc_vars)
-        set_keys_impl = loc_vars['set_keys_impl']
-        return set_keys_impl
 
-    return _set_out_keys
+@overload(_agg_sets_output)
+def _agg_sets_output_overload(res, data_in, key_arrs, group_first, return_key):
+    """split results of sets (group * n_cols + column) into output columns
+    and add output keys if necessary
+    """
+    n_cols = data_in.count
+    func_text = "def f(res, data_in, key_arrs, group_first, return_key):\n"
+    for k in range(n_cols):
+        func_text += "  c_{} = res[{}::{}].copy()\n".format(k, k, n_cols)
+    out_tup = "({}{})".format(", ".join("c_{}".format(k) for k in range(n_cols)),
+                              "," if n_cols == 1 else "")
+    # return key is either True or None
+    if return_key == types.boolean:
+        func_text += "  return {} + gather_arr_tup(key_arrs, group_first)\n".format(out_tup)
+    else:
+        func_text += "  return {}\n".format(out_tup)
+
+    loc_vars = {}
+    exec(func_text, {'gather_arr_tup': hpat.hiframes.sort.gather_arr_tup}, loc_vars)
+    out_impl = loc_vars['f']
+    return out_impl
 
 
-def get_key_set(arr):  # pragma: no cover
-    return set()
+def get_shuffle_data_send_buffs(sh, karrs, data):  # pragma: no cover
+    return ()
 
 
-@overload(get_key_set)
-def get_key_set_overload(arr):
-    if arr == string_array_type or (isinstance(arr, types.BaseTuple)
-                                    and len(arr.types) == 1 and arr.types[0] == string_array_type):
-        return lambda arr: hpat.set_ext.init_set_string()
+@overload(get_shuffle_data_send_buffs)
+def get_shuffle_data_send_buffs_overload(meta, key_arrs, data):
+    n_keys = len(key_arrs.types)
+    count = len(data.types)
 
-    if isinstance(arr, types.BaseTuple):
-        def get_set_tup(arr):
-            s = set()
-            v = getitem_arr_tup_single(arr, 0)
-            s.add(v)
-            s.remove(v)
-            return s
-        return get_set_tup
+    func_text = "def send_buff_impl(meta, key_arrs, data):\n"
+    func_text += "  return ({}{})\n".format(','.join(["meta.send_buff_tup[{}]".format(
+        i) for i in range(n_keys, count + n_keys)]),
+        "," if count == 1 else "")  # single value needs comma to become tuple
 
-    # hack to return set with specified type
-    def get_set(arr):
-        s = set()
-        s.add(arr[0])
-        s.remove(arr[0])
-        return s
+    # print(func_text)
 
-    return get_set
+    loc_vars = {}
+    exec(func_text, {}, loc_vars)
+    send_buff_impl = loc_vars['send_buff_impl']
+    return send_buff_impl
 
 
-def alloc_agg_output(n_uniq_keys, out_dummy_tup, key_set, data_in, return_key):  # pragma: no cover
+def alloc_agg_output(n_uniq_keys, out_dummy_tup, key_arrs, group_first, data_in, return_key):  # pragma: no cover
     return out_dummy_tup
 
 
 @overload(alloc_agg_output)
-def alloc_agg_output_overload(n_uniq_keys, out_dummy_tup, key_set,
+def alloc_agg_output_overload(n_uniq_keys, out_dummy_tup, key_arrs, group_first,
                               data_in, return_key):
 
     # return key is either True or None
     if return_key == types.boolean:
         # TODO: handle pivot_table/crosstab with return key
-        dtype = key_set.dtype
-        key_types = list(dtype.types) if isinstance(dtype, types.BaseTuple) else [dtype]
-        n_keys = len(key_types)
-        assert out_dummy_tup.count == data_in.count + n_keys
+        n_keys = key_arrs.count
+        # number of outputs can be different than inputs in multiple
+        # aggregation
+        n_out = out_dummy_tup.count - n_keys
 
-        func_text = "def out_alloc_f(n_uniq_keys, out_dummy_tup, key_set, data_in, return_key):\n"
-        for i in range(data_in.count):
+        func_text = "def out_alloc_f(n_uniq_keys, out_dummy_tup, key_arrs, group_first, data_in, return_key):\n"
+        for i in range(n_out):
             func_text += "  c_{} = empty_like_type(n_uniq_keys, out_dummy_tup[{}])\n".format(i, i)
 
-        # string special case
-        # TODO: handle strings in multi-key case
-        if key_types == [string_type]:
-            # TODO: handle unicode length
-            func_text += "  num_total_chars = num_total_chars_set_string(key_set)\n"
-            func_text += "  out_key_0 = pre_alloc_string_array(n_uniq_keys, num_total_chars)\n"
-        else:
-            for i, key_typ in enumerate(key_types):
-                func_text += "  out_key_{} = np.empty(n_uniq_keys, np.{})\n".format(i, key_typ)
-
-        func_text += "  return ({}{}{},)\n".format(
-            ", ".join(["c_{}".format(i) for i in range(data_in.count)]),
-            "," if data_in.count != 0 else "",
-            ", ".join(["out_key_{}".format(i) for i in range(n_keys)]))
+        # output keys are keys of first rows of groups
+        func_text += "  return ({}{}) + gather_arr_tup(key_arrs, group_first)\n".format(
+            ", ".join(["c_{}".format(i) for i in range(n_out)]),
+            "," if n_out != 0 else "")
 
         loc_vars = {}
         # print(func_text)
-        exec(func_text, {'empty_like_type': empty_like_type, 'np': np,
-                         'pre_alloc_string_array': pre_alloc_string_array,
-                         'num_total_chars_set_string': num_total_chars_set_string}, loc_vars)
+        exec(func_text, {'empty_like_type': empty_like_type,
+                         'gather_arr_tup': hpat.hiframes.sort.gather_arr_tup}, loc_vars)
         alloc_impl = loc_vars['out_alloc_f']
         return alloc_impl
 
     assert return_key == types.none
 
-    def no_key_out_alloc(n_uniq_keys, out_dummy_tup, key_set, data_in, return_key):
+    def no_key_out_alloc(n_uniq_keys, out_dummy_tup, key_arrs, group_first, data_in, return_key):
         return alloc_arr_tup(n_uniq_keys, out_dummy_tup)
 
     return no_key_out_alloc
@@ -964,28 +1598,6 @@ def lower_column_mean_impl(context, builder, sig, args):
     return res  # impl_ret_untracked(context, builder, sig.return_type, res)
 
 
-def setitem_array_with_str(arr, i, v):  # pragma: no cover
-    return
-
-
-@overload(setitem_array_with_str)
-def setitem_array_with_str_overload(arr, i, val):
-    if arr == string_array_type:
-        def setitem_str_arr(arr, i, val):
-            arr[i] = val
-        return setitem_str_arr
-
-    # return_key == False case where val could be string resulting in typing
-    # issue, no need to set
-    if val == string_type:
-        return lambda arr, i, val: None
-
-    def setitem_impl(arr, i, val):
-        arr[i] = val
-
-    return setitem_impl
-
-
 def _get_np_dtype(t):
     if t == types.NPDatetime('ns'):
         return "dt64_dtype"
@@ -993,7 +1605,8 @@ def _get_np_dtype(t):
 
 
 def gen_top_level_agg_func(key_names, return_key, red_var_typs, out_typs,
-                           in_col_names, out_col_names, parallel):
+                           in_col_names, out_col_names, parallel, presorted=False,
+                           dense_key=False):
     """create the top level aggregation function by generating text
     """
 
@@ -1028,13 +1641,21 @@ def gen_top_level_agg_func(key_names, return_key, red_var_typs, out_typs,
     out_tup = ", ".join(out_names + out_keys if return_key else out_names)
 
     if parallel:
-        func_text += ("    ({},) = parallel_agg(({},), data_redvar_dummy, "
+        agg_call = "parallel_sorted_agg" if presorted else "parallel_agg"
+        if dense_key:
+            agg_call = "parallel_dense_agg"
+        func_text += ("    ({},) = {}(({},), data_redvar_dummy, "
                       "out_dummy_tup, data_in, init_vals, __update_redvars, "
-                      "__combine_redvars, __eval_res, {}, pivot_arr)\n").format(out_tup, key_args, return_key_p)
+                      "__combine_redvars, __eval_res, {}, pivot_arr)\n").format(
+                          out_tup, agg_call, key_args, return_key_p)
     else:
-        func_text += ("    ({},) = agg_seq_iter(({},), data_redvar_dummy, "
+        agg_call = "agg_sorted_seq_iter" if presorted else "agg_seq_iter"
+        if dense_key:
+            agg_call = "agg_dense_seq_iter"
+        func_text += ("    ({},) = {}(({},), data_redvar_dummy, "
                       "out_dummy_tup, data_in, init_vals, __update_redvars, "
-                      "__eval_res, {}, pivot_arr)\n").format(out_tup, key_args, return_key_p)
+                      "__eval_res, {}, pivot_arr)\n").format(
+                          out_tup, agg_call, key_args, return_key_p)
 
     func_text += "    return ({},)\n".format(out_tup)
 
@@ -1046,6 +1667,36 @@ def gen_top_level_agg_func(key_names, return_key, red_var_typs, out_typs,
     return agg_top
 
 
+def gen_top_level_sketch_func(key_names, return_key, in_col_names,
+                              out_col_names, agg_call, agg_params):
+    """create the top level function of aggregations computed with sketches
+    (groupby nunique and quantile), agg_call is called with key arrays, input
+    data, agg_params and return_key
+    """
+    in_names = tuple("in_{}".format(c) for c in in_col_names)
+    out_names = tuple("out_{}".format(c) for c in out_col_names)
+    key_args = ", ".join("key_{}".format(
+        _sanitize_varname(c)) for c in key_names)
+    return_key_p = "True" if return_key else "None"
+
+    func_text = "def agg_top({}, {}, pivot_arr):\n".format(key_args, ", ".join(in_names))
+    func_text += "    data_in = ({}{})\n".format(",".join(in_names),
+                                                 "," if len(in_names) == 1 else "")
+
+    out_keys = tuple("out_key_{}".format(
+        _sanitize_varname(c)) for c in key_names)
+    out_tup = ", ".join(out_names + out_keys if return_key else out_names)
+    params = "".join("{}, ".format(repr(p)) for p in agg_params)
+    func_text += "    ({},) = {}(({},), data_in, {}{})\n".format(
+        out_tup, agg_call, key_args, params, return_key_p)
+    func_text += "    return ({},)\n".format(out_tup)
+
+    loc_vars = {}
+    exec(func_text, {}, loc_vars)
+    agg_top = loc_vars['agg_top']
+    return agg_top
+
+
 def compile_to_optimized_ir(func, arg_typs, typingctx):
     # XXX are outside function's globals needed?
     code = func.code if hasattr(func, 'code') else func.__code__
@@ -1094,8 +1745,37 @@ def compile_to_optimized_ir(func, arg_typs, typingctx):
     return f_ir, pm
 
 
-def get_agg_func_struct(agg_func, in_col_types, out_col_typs, typingctx,
-                        targetctx, pivot_typ, pivot_values, is_crosstab):
+def get_agg_parts(agg_func, in_col_names):
+    """find reductions of aggregation as (input column index, function) pairs
+    and the way every output is computed from them as (reduction indices,
+    function) pairs (function is None if output is the result of one
+    reduction). In multiple aggregation, reductions are shared between
+    outputs, e.g. mean reuses sum and count of the same column.
+    """
+    if not isinstance(agg_func, dict):
+        agg_parts = [(i, agg_func) for i in range(len(in_col_names))]
+        out_parts = [((i,), None) for i in range(len(in_col_names))]
+        return agg_parts, out_parts
+
+    agg_parts = []
+    out_parts = []
+    for in_col, func_name in agg_func.values():
+        col_ind = in_col_names.index(in_col)
+        part_names, out_func = multi_agg_parts.get(
+            func_name, ((func_name,), None))
+        part_inds = []
+        for part_name in part_names:
+            part = (col_ind, get_agg_func(None, part_name, None))
+            if part not in agg_parts:
+                agg_parts.append(part)
+            part_inds.append(agg_parts.index(part))
+        out_parts.append((tuple(part_inds), out_func))
+    return agg_parts, out_parts
+
+
+def get_agg_func_struct(agg_func, in_col_names, in_col_types, out_col_typs,
+                        typingctx, targetctx, pivot_typ, pivot_values,
+                        is_crosstab):
     """find initialization, update, combine and final evaluation code of the
     aggregation function. Currently assuming that the function is single block
     and has one parfor.
@@ -1115,10 +1795,14 @@ def get_agg_func_struct(agg_func, in_col_types, out_col_typs, typingctx,
     if is_crosstab and len(in_col_types) == 0:
         # use dummy int input type for crosstab since doesn't have input
         in_col_types = [types.Array(types.intp, 1, 'C')]
+        in_col_names = [None]
+
+    agg_parts, out_parts = get_agg_parts(agg_func, in_col_names)
 
-    for in_col_typ in in_col_types:
+    for col_ind, part_func in agg_parts:
+        in_col_typ = in_col_types[col_ind]
         f_ir, pm = compile_to_optimized_ir(
-            agg_func, tuple([in_col_typ]), typingctx)
+            part_func, tuple([in_col_typ]), typingctx)
 
         f_ir._definitions = build_definitions(f_ir.blocks)
         # TODO: support multiple top-level blocks
@@ -1187,11 +1871,12 @@ def get_agg_func_struct(agg_func, in_col_types, out_col_typs, typingctx,
                               typingctx, targetctx)
     update_all_func = gen_all_update_func(all_update_funcs, all_vartypes,
                                           in_col_types, redvar_offsets, typingctx, targetctx, pivot_typ,
-                                          pivot_values, is_crosstab)
+                                          pivot_values, is_crosstab, [c for c, _ in agg_parts])
     combine_all_func = gen_all_combine_func(all_combine_funcs, all_vartypes,
                                             redvar_offsets, typingctx, targetctx, pivot_typ, pivot_values)
     eval_all_func = gen_all_eval_func(all_eval_funcs, all_vartypes,
-                                      redvar_offsets, out_col_typs, typingctx, targetctx, pivot_values)
+                                      redvar_offsets, out_col_typs, typingctx, targetctx, pivot_values,
+                                      out_parts)
 
     return AggFuncStruct(all_vartypes, init_func,
                          update_all_func, combine_all_func, eval_all_func)
@@ -1303,9 +1988,10 @@ def gen_init_func(init_nodes, reduce_vars, var_types, typingctx, targetctx):
 
 def gen_all_update_func(update_funcs, reduce_var_types, in_col_types,
                         redvar_offsets, typingctx, targetctx, pivot_typ, pivot_values,
-                        is_crosstab):
+                        is_crosstab, part_cols):
 
-    num_cols = len(in_col_types)
+    # input column of every reduction
+    num_cols = len(part_cols)
     if pivot_values is not None:
         assert num_cols == 1
 
@@ -1335,7 +2021,8 @@ def gen_all_update_func(update_funcs, reduce_var_types, in_col_types,
         for j in range(num_cols):
             redvar_access = ", ".join(["redvar_arrs[{}][w_ind]".format(i)
                                        for i in range(redvar_offsets[j], redvar_offsets[j + 1])])
-            func_text += "  {} = update_vars_{}({},  data_in[{}][i])\n".format(redvar_access, j, redvar_access, j)
+            func_text += "  {} = update_vars_{}({},  data_in[{}][i])\n".format(
+                redvar_access, j, redvar_access, part_cols[j])
     func_text += "  return\n"
     # print(func_text)
 
@@ -1412,7 +2099,7 @@ def gen_all_combine_func(combine_funcs, reduce_var_types, redvar_offsets,
 
 
 def gen_all_eval_func(eval_funcs, reduce_var_types, redvar_offsets,
-                      out_col_typs, typingctx, targetctx, pivot_values):
+                      out_col_typs, typingctx, targetctx, pivot_values, out_parts):
 
     reduce_arrs_tup_typ = types.Tuple([types.Array(t, 1, 'C') for t in reduce_var_types])
     out_col_typs = types.Tuple(out_col_typs)
@@ -1422,6 +2109,8 @@ def gen_all_eval_func(eval_funcs, reduce_var_types, redvar_offsets,
 
     #       out_c0[j] = __eval_res_0(redvar_0_arr[j], redvar_1_arr[j])
     #       out_c1[j] = __eval_res_1(redvar_2_arr[j], redvar_3_arr[j])
+    # multiple aggregation outputs combine results of reductions, e.g.
+    #       out_c2[j] = out_func_2(__eval_res_0(...), __eval_res_1(...))
 
     num_redvars = redvar_offsets[num_cols]
 
@@ -1435,15 +2124,25 @@ def gen_all_eval_func(eval_funcs, reduce_var_types, redvar_offsets,
                 init_offset + redvar_offsets[0], init_offset + redvar_offsets[1])])
             func_text += "  out_arrs[{}][j] = eval_vars_0({})\n".format(j, redvar_access)
     else:
-        for j in range(num_cols):
-            redvar_access = ", ".join(["redvar_arrs[{}][j]".format(i)
-                                       for i in range(redvar_offsets[j], redvar_offsets[j + 1])])
-            func_text += "  out_arrs[{}][j] = eval_vars_{}({})\n".format(j, j, redvar_access)
+        for k, (part_inds, out_func) in enumerate(out_parts):
+            part_res = []
+            for p in part_inds:
+                redvar_access = ", ".join(["redvar_arrs[{}][j]".format(i)
+                                           for i in range(redvar_offsets[p], redvar_offsets[p + 1])])
+                part_res.append("eval_vars_{}({})".format(p, redvar_access))
+            if out_func is None:
+                func_text += "  out_arrs[{}][j] = {}\n".format(k, part_res[0])
+            else:
+                func_text += "  out_arrs[{}][j] = out_func_{}({})\n".format(
+                    k, k, ", ".join(part_res))
     func_text += "  return\n"
     # print(func_text)
     glbs = {}
     for i, f in enumerate(eval_funcs):
         glbs['eval_vars_{}'.format(i)] = f
+    for k, (_, out_func) in enumerate(out_parts):
+        if out_func is not None:
+            glbs['out_func_{}'.format(k)] = out_func
     loc_vars = {}
     exec(func_text, glbs, loc_vars)
     eval_all_f = loc_vars['eval_all_f']
@@ -1796,23 +2495,5 @@ def get_parfor_reductions(parfor, parfor_params, calltypes,
     return reduce_varnames, var_to_param
 
 
-def _build_set_tup(arr_tup):
-    return build_set(arr_tup[0])
-
-
-@overload(_build_set_tup)
-def _build_set_tup_overload(arr_tup):
-    # TODO: support string in tuple set
-    if isinstance(arr_tup, types.BaseTuple) and len(arr_tup.types) != 1:
-        def _impl(arr_tup):
-            n = len(arr_tup[0])
-            s = set()
-            for i in range(n):
-                s.add(getitem_arr_tup(arr_tup, i))
-            return s
-        return _impl
-    return _build_set_tup
-
-
 def _sanitize_varname(varname):
     return varname.replace('$', '_').replace('.', '_')
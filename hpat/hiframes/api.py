@@ -44,8 +44,12 @@ from hpat.hiframes.sort import (
     alltoallv_tup,
     finalize_shuffle_meta,
     update_shuffle_meta,
-    alloc_pre_shuffle_metadata)
+    alloc_pre_shuffle_metadata,
+    local_sort)
 from hpat.hiframes.join import write_send_buff
+from hpat.hash_table import build_key_table, probe_key_table
+from hpat.shuffle_utils import get_dest_ranks, shuffle_with_dest, hash_arr_item
+import hpat.sketches
 from hpat.hiframes.split_impl import string_array_split_view_type
 
 # XXX: used in agg func output to avoid mutating filter, agg, join, etc.
@@ -299,6 +303,270 @@ def nunique_overload_parallel(arr_typ):
     return nunique_par
 
 
+def nunique_approx(A):  # pragma: no cover
+    return len(set(A))
+
+
+def nunique_approx_parallel(A):  # pragma: no cover
+    return len(set(A))
+
+
+@overload(nunique_approx)
+def nunique_approx_overload(A):
+    def nunique_approx_seq(A):
+        return hpat.sketches.hll_estimate(_hll_sketch(A))
+    return nunique_approx_seq
+
+
+@overload(nunique_approx_parallel)
+def nunique_approx_parallel_overload(A):
+    max_op = hpat.distributed_api.Reduce_Type.Max.value
+
+    def nunique_approx_par(A):
+        # sketches of ranks are merged with elementwise max
+        regs = _hll_sketch(A)
+        hpat.distributed_api.dist_reduce(regs, np.int32(max_op))
+        return hpat.sketches.hll_estimate(regs)
+    return nunique_approx_par
+
+
+@numba.njit
+def _hll_sketch(A):  # pragma: no cover
+    """HyperLogLog sketch of non-NA values of A"""
+    p = hpat.config.config_hll_precision
+    regs = np.zeros(1 << p, np.uint8)
+    for i in range(len(A)):
+        if not isna(A, i):
+            hpat.sketches.hll_add(regs, p, hash_arr_item(A, i))
+    return regs
+
+
+def quantiles_approx(A, qs):  # pragma: no cover
+    return qs
+
+
+def quantiles_approx_parallel(A, qs):  # pragma: no cover
+    return qs
+
+
+@overload(quantiles_approx)
+def quantiles_approx_overload(A, qs):
+    # local data is summarized exactly
+    def quantiles_approx_seq(A, qs):
+        vals, weights = _quantile_summary(A, 0)
+        return _summary_quantiles(vals, weights, qs)
+    return quantiles_approx_seq
+
+
+@overload(quantiles_approx_parallel)
+def quantiles_approx_parallel_overload(A, qs):
+    def quantiles_approx_par(A, qs):
+        # summaries of ranks are merged with one allgather
+        k = hpat.sketches.quantile_summary_size()
+        vals, weights = _quantile_summary(A, k)
+        vals = hpat.distributed_api.allgatherv(vals)
+        weights = hpat.distributed_api.allgatherv(weights)
+        perm = np.argsort(vals)
+        return _summary_quantiles(vals[perm], weights[perm], qs)
+    return quantiles_approx_par
+
+
+@numba.njit
+def _quantile_summary(A, k):  # pragma: no cover
+    """quantile summary of non-NA values of A"""
+    n = 0
+    for i in range(len(A)):
+        if not isna(A, i):
+            n += 1
+    B = np.empty(n, np.float64)
+    j = 0
+    for i in range(len(A)):
+        if not isna(A, i):
+            B[j] = A[i]
+            j += 1
+    B.sort()
+    return hpat.sketches.quantile_summary(B, k)
+
+
+def _summary_quantiles(vals, weights, qs):  # pragma: no cover
+    return qs
+
+
+@overload(_summary_quantiles)
+def _summary_quantiles_overload(vals, weights, qs):
+    n_qs = qs.count
+    func_text = "def f(vals, weights, qs):\n"
+    func_text += "  return ({}{})\n".format(
+        ", ".join("summary_quantile(vals, weights, qs[{}])".format(i) for i in range(n_qs)),
+        "," if n_qs == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'summary_quantile': hpat.sketches.summary_quantile}, loc_vars)
+    quantiles_impl = loc_vars['f']
+    return quantiles_impl
+
+
+# pivot_table() and crosstab() without pivot values annotation:
+# row and column labels are discovered at runtime (distinct values are
+# gathered on all ranks) and values are aggregated into a dense
+# (rows x columns) matrix, which is merged across ranks with elementwise
+# reductions. Output is a tuple of the matrix, row labels and column labels.
+
+def pivot_table_dynamic(index_arr, columns_arr, values_arr, aggfunc):  # pragma: no cover
+    return index_arr
+
+
+def pivot_table_dynamic_parallel(index_arr, columns_arr, values_arr, aggfunc):  # pragma: no cover
+    return index_arr
+
+
+def crosstab_dynamic(index_arr, columns_arr):  # pragma: no cover
+    return index_arr
+
+
+def crosstab_dynamic_parallel(index_arr, columns_arr):  # pragma: no cover
+    return index_arr
+
+
+@overload(pivot_table_dynamic)
+def pivot_table_dynamic_overload(index_arr, columns_arr, values_arr, aggfunc):
+    return _gen_pivot_table_dynamic(aggfunc.literal_value, False)
+
+
+@overload(pivot_table_dynamic_parallel)
+def pivot_table_dynamic_parallel_overload(index_arr, columns_arr, values_arr, aggfunc):
+    return _gen_pivot_table_dynamic(aggfunc.literal_value, True)
+
+
+def _gen_pivot_table_dynamic(aggfunc, parallel):
+    if aggfunc not in ('sum', 'count', 'mean', 'min', 'max'):
+        raise ValueError("pivot_table() without pivot values annotation does "
+                         "not support aggfunc '{}'".format(aggfunc))
+
+    Reduce_Type = hpat.distributed_api.Reduce_Type
+    sum_op = Reduce_Type.Sum.value
+    red_op = {'min': Reduce_Type.Min, 'max': Reduce_Type.Max}.get(
+        aggfunc, Reduce_Type.Sum).value
+    init_val = {'min': 'np.inf', 'max': '-np.inf'}.get(aggfunc, '0.0')
+    labels_func = '_pivot_labels_parallel' if parallel else '_pivot_labels'
+
+    func_text = "def f(index_arr, columns_arr, values_arr, aggfunc):\n"
+    func_text += "  row_labels = {}(index_arr)\n".format(labels_func)
+    func_text += "  col_labels = {}(columns_arr)\n".format(labels_func)
+    func_text += "  row_ids = _pivot_label_ids(row_labels, index_arr)\n"
+    func_text += "  col_ids = _pivot_label_ids(col_labels, columns_arr)\n"
+    func_text += "  shape = (len(row_labels), len(col_labels))\n"
+    func_text += "  res = np.full(shape, {}, np.float64)\n".format(init_val)
+    func_text += "  counts = np.zeros(shape, np.int64)\n"
+    func_text += "  for i in range(len(values_arr)):\n"
+    func_text += "    r = row_ids[i]\n"
+    func_text += "    c = col_ids[i]\n"
+    func_text += "    if r == -1 or c == -1 or isna(values_arr, i):\n"
+    func_text += "      continue\n"
+    func_text += "    counts[r, c] += 1\n"
+    if aggfunc in ('sum', 'mean'):
+        func_text += "    res[r, c] += values_arr[i]\n"
+    elif aggfunc in ('min', 'max'):
+        func_text += "    res[r, c] = {}(res[r, c], np.float64(values_arr[i]))\n".format(aggfunc)
+    if parallel:
+        func_text += "  dist_reduce(counts, np.int32({}))\n".format(sum_op)
+        if aggfunc != 'count':
+            func_text += "  dist_reduce(res, np.int32({}))\n".format(red_op)
+    # combinations without values are NA similar to Pandas
+    func_text += "  for r in range(shape[0]):\n"
+    func_text += "    for c in range(shape[1]):\n"
+    func_text += "      if counts[r, c] == 0:\n"
+    func_text += "        res[r, c] = np.nan\n"
+    if aggfunc == 'count':
+        func_text += "      else:\n"
+        func_text += "        res[r, c] = counts[r, c]\n"
+    if aggfunc == 'mean':
+        func_text += "      else:\n"
+        func_text += "        res[r, c] /= counts[r, c]\n"
+    func_text += "  return res, row_labels, col_labels\n"
+
+    loc_vars = {}
+    exec(func_text, {'np': np, 'isna': isna,
+                     'dist_reduce': hpat.distributed_api.dist_reduce,
+                     '_pivot_labels': _pivot_labels,
+                     '_pivot_labels_parallel': _pivot_labels_parallel,
+                     '_pivot_label_ids': _pivot_label_ids}, loc_vars)
+    pivot_impl = loc_vars['f']
+    return pivot_impl
+
+
+@overload(crosstab_dynamic)
+def crosstab_dynamic_overload(index_arr, columns_arr):
+    def crosstab_seq(index_arr, columns_arr):
+        row_labels = _pivot_labels(index_arr)
+        col_labels = _pivot_labels(columns_arr)
+        counts = _crosstab_counts(row_labels, col_labels, index_arr, columns_arr)
+        return counts, row_labels, col_labels
+    return crosstab_seq
+
+
+@overload(crosstab_dynamic_parallel)
+def crosstab_dynamic_parallel_overload(index_arr, columns_arr):
+    sum_op = hpat.distributed_api.Reduce_Type.Sum.value
+
+    def crosstab_par(index_arr, columns_arr):
+        row_labels = _pivot_labels_parallel(index_arr)
+        col_labels = _pivot_labels_parallel(columns_arr)
+        counts = _crosstab_counts(row_labels, col_labels, index_arr, columns_arr)
+        hpat.distributed_api.dist_reduce(counts, np.int32(sum_op))
+        return counts, row_labels, col_labels
+    return crosstab_par
+
+
+@numba.njit
+def _crosstab_counts(row_labels, col_labels, index_arr, columns_arr):  # pragma: no cover
+    row_ids = _pivot_label_ids(row_labels, index_arr)
+    col_ids = _pivot_label_ids(col_labels, columns_arr)
+    counts = np.zeros((len(row_labels), len(col_labels)), np.int64)
+    for i in range(len(index_arr)):
+        r = row_ids[i]
+        c = col_ids[i]
+        if r != -1 and c != -1:
+            counts[r, c] += 1
+    return counts
+
+
+@numba.njit
+def _pivot_labels(A):  # pragma: no cover
+    """sorted distinct non-NA values of A"""
+    labels = unique(A)
+    local_sort((labels,), ())
+    return _drop_na_labels(labels)
+
+
+@numba.njit
+def _pivot_labels_parallel(A):  # pragma: no cover
+    """sorted distinct non-NA values of distributed A on all ranks"""
+    labels = hpat.distributed_api.allgatherv(unique_parallel(A))
+    local_sort((labels,), ())
+    return _drop_na_labels(labels)
+
+
+@numba.njit
+def _drop_na_labels(labels):  # pragma: no cover
+    # NA values are sorted last
+    n = len(labels)
+    while n > 0 and isna(labels, n - 1):
+        n -= 1
+    return labels[:n]
+
+
+@numba.njit
+def _pivot_label_ids(labels, A):  # pragma: no cover
+    """position of every value of A in labels, -1 if not found (e.g. NA)"""
+    # labels are distinct so group ids of the table are label positions
+    table, _ = build_key_table((labels,))
+    ids = np.empty(len(A), np.int64)
+    for i in range(len(A)):
+        ids[i] = probe_key_table(table, (labels,), (A,), i, hash_arr_item(A, i))
+    return ids
+
+
 def unique(A):  # pragma: no cover
     return np.array([a for a in set(A)]).astype(A.dtype)
 
@@ -349,26 +617,9 @@ def unique_overload_parallel(arr_typ):
         key_arrs = (uniq_A,)
 
         n_pes = hpat.distributed_api.get_size()
-        pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, (), n_pes, False)
-
-        # calc send/recv counts
-        for i in range(len(uniq_A)):
-            val = uniq_A[i]
-            node_id = hash(val) % n_pes
-            update_shuffle_meta(pre_shuffle_meta, node_id, i, (val,), (), False)
-
-        shuffle_meta = finalize_shuffle_meta(key_arrs, (), pre_shuffle_meta, n_pes, False)
-
-        # write send buffers
-        for i in range(len(uniq_A)):
-            val = uniq_A[i]
-            node_id = hash(val) % n_pes
-            write_send_buff(shuffle_meta, node_id, i, (val,), ())
-            # update last since it is reused in data
-            shuffle_meta.tmp_offset[node_id] += 1
-
-        # shuffle
-        out_arr, = alltoallv_tup(key_arrs, shuffle_meta)
+        dest = get_dest_ranks(key_arrs, n_pes)
+        out_keys, _ = shuffle_with_dest(key_arrs, (), dest, n_pes)
+        out_arr = out_keys[0]
 
         return hpat.utils.to_array(build_set(out_arr))
 
@@ -1451,7 +1702,7 @@ def chain_overload():
 # a dummy join function that will be replace in dataframe_pass
 
 
-def join_dummy(left_df, right_df, left_on, right_on, how):
+def join_dummy(left_df, right_df, left_on, right_on, how, method, *asof_args):
     return left_df
 
 
@@ -1460,7 +1711,9 @@ class JoinTyper(AbstractTemplate):
     def generic(self, args, kws):
         from hpat.hiframes.pd_dataframe_ext import DataFrameType
         assert not kws
-        left_df, right_df, left_on, right_on, how = args
+        # merge_asof passes left_by, right_by, tolerance, allow_exact_matches
+        # and direction as well
+        left_df, right_df, left_on, right_on, how, method = args[:6]
 
         columns = list(left_df.columns)
         data = list(left_df.data)
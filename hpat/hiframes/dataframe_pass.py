@@ -11,7 +11,7 @@ from numba.ir_utils import (replace_arg_nodes, compile_to_numba_ir,
                             find_callname, mk_alloc, find_const, is_setitem,
                             is_getitem, mk_unique_var, dprint_func_ir,
                             build_definitions, find_build_sequence,
-                            GuardException, compute_cfg_from_blocks)
+                            GuardException, compute_cfg_from_blocks, require)
 from numba.inline_closurecall import inline_closure_call
 from numba.typing.templates import Signature, bound_function, signature
 from numba.typing.arraydecl import ArrayAttribute
@@ -20,7 +20,8 @@ from numba.typing.templates import infer_global, AbstractTemplate, signature
 import hpat
 from hpat import hiframes
 from hpat.utils import (debug_prints, inline_new_blocks, ReplaceFunc,
-                        is_whole_slice, is_array, is_assign, sanitize_varname)
+                        is_whole_slice, is_array, is_assign, is_call_assign,
+                        sanitize_varname)
 from hpat.str_ext import string_type
 from hpat.str_arr_ext import (string_array_type, StringArrayType,
                               is_str_arr_typ, pre_alloc_string_array)
@@ -572,6 +573,9 @@ class DataFramePass(object):
         if fdef == ('sort_values_dummy', 'hpat.hiframes.pd_dataframe_ext'):
             return self._run_call_df_sort_values(assign, lhs, rhs)
 
+        if fdef == ('nlargest_dummy', 'hpat.hiframes.pd_dataframe_ext'):
+            return self._run_call_df_nlargest(assign, lhs, rhs)
+
         if fdef == ('itertuples_dummy', 'hpat.hiframes.pd_dataframe_ext'):
             return self._run_call_df_itertuples(assign, lhs, rhs)
 
@@ -640,7 +644,8 @@ class DataFramePass(object):
             impl = hpat.hiframes.pd_dataframe_ext.merge_overload(
                 *arg_typs, **kw_typs)
             return self._replace_func(impl, rhs.args,
-                                      pysig=numba.utils.pysignature(pd.merge),
+                                      pysig=numba.utils.pysignature(
+                                          hpat.hiframes.pd_dataframe_ext.merge_overload),
                                       kws=dict(rhs.kws))
 
         if func_name == 'pivot_table':
@@ -692,6 +697,29 @@ class DataFramePass(object):
                                       pysig=numba.utils.pysignature(stub),
                                       kws=dict(rhs.kws))
 
+        # df.nlargest(), df.nsmallest()
+        if func_name in ('nlargest', 'nsmallest'):
+            kws = dict(rhs.kws)
+            keep = 'first'
+            if len(rhs.args) > 2:
+                keep = guard(find_const, self.func_ir, rhs.args[2])
+            elif 'keep' in kws:
+                keep = guard(find_const, self.func_ir, kws['keep'])
+            if keep != 'first':
+                raise ValueError("{}: only keep='first' is supported".format(
+                    func_name))
+            rhs.args.insert(0, df_var)
+            arg_typs = tuple(self.typemap[v.name] for v in rhs.args)
+            kw_typs = {name: self.typemap[v.name]
+                       for name, v in dict(rhs.kws).items()}
+            overload_func = getattr(hpat.hiframes.pd_dataframe_ext,
+                                    func_name + '_overload')
+            impl = overload_func(*arg_typs, **kw_typs)
+            stub = (lambda df, n, columns, keep='first': None)
+            return self._replace_func(impl, rhs.args,
+                                      pysig=numba.utils.pysignature(stub),
+                                      kws=dict(rhs.kws))
+
         if func_name == 'itertuples':
             rhs.args.insert(0, df_var)
             arg_typs = tuple(self.typemap[v.name] for v in rhs.args)
@@ -1021,15 +1049,15 @@ class DataFramePass(object):
         func_text = "def f({}):\n".format(', '.join(col_name_args))
         # compute stat values
         for c in col_name_args:
+            # all quantiles are computed from one sketch
+            func_text += ("  {0}_q25, {0}_q50, {0}_q75 = "
+                          "hpat.hiframes.api.quantiles_approx({0}, (.25, .5, .75))\n").format(c)
             func_text += "  {} = hpat.hiframes.api.init_series({})\n".format(c, c)
             func_text += "  {}_count = np.float64({}.count())\n".format(c, c)
             func_text += "  {}_min = {}.min()\n".format(c, c)
             func_text += "  {}_max = {}.max()\n".format(c, c)
             func_text += "  {}_mean = {}.mean()\n".format(c, c)
             func_text += "  {}_std = {}.var()**0.5\n".format(c, c)
-            func_text += "  {}_q25 = {}.quantile(.25)\n".format(c, c)
-            func_text += "  {}_q50 = {}.quantile(.5)\n".format(c, c)
-            func_text += "  {}_q75 = {}.quantile(.75)\n".format(c, c)
 
         col_header = "      ".join([c for c in df_typ.columns])
         func_text += "  return '        {}\\n' + \\\n".format(col_header)
@@ -1060,13 +1088,106 @@ class DataFramePass(object):
 
     def _run_call_df_sort_values(self, assign, lhs, rhs):
         df_var, by_var, ascending_var, inplace_var = rhs.args
-        df_typ = self.typemap[df_var.name]
         ascending = guard(find_const, self.func_ir, ascending_var)
         inplace = guard(find_const, self.func_ir, inplace_var)
 
         # find key array for sort ('by' arg)
         key_names = self._get_const_or_list(by_var)
 
+        # sort_values().head(n) only needs the first n rows
+        limit = None
+        if not inplace:
+            limit = guard(self._get_sort_head_n, lhs)
+
+        return self._gen_df_sort(
+            lhs, df_var, key_names, ascending, inplace, limit)
+
+    def _run_call_df_nlargest(self, assign, lhs, rhs):
+        df_var, n_var, columns_var, ascending_var = rhs.args
+        n = guard(find_const, self.func_ir, n_var)
+        if not isinstance(n, int):
+            raise ValueError("nlargest/nsmallest: constant 'n' expected")
+        ascending = guard(find_const, self.func_ir, ascending_var)
+        key_names = self._get_const_or_list(columns_var)
+        df_typ = self.typemap[df_var.name]
+        if any(k not in df_typ.columns for k in key_names):
+            raise ValueError("invalid sort keys {}".format(key_names))
+
+        # keys that can't be NA are sorted directly
+        na_keys = [k for k in key_names if isinstance(
+            df_typ.data[df_typ.columns.index(k)].dtype,
+            (types.Float, types.NPDatetime, types.NPTimedelta))]
+        if not na_keys:
+            return self._gen_df_sort(
+                lhs, df_var, key_names, ascending, False, n)
+
+        # like Pandas, drop rows with NA keys first and then sort with
+        # sort_values().head(n) which only keeps the first n rows
+        nodes = []
+        key_arrs = [self._get_dataframe_data(df_var, k, nodes)
+                    for k in na_keys]
+        key_args = ', '.join('k' + str(i) for i in range(len(na_keys)))
+        isna_calls = ' or '.join(
+            'hpat.hiframes.api.isna(k{}, i)'.format(i)
+            for i in range(len(na_keys)))
+
+        func_text = "def _nlargest_impl(df, {}):\n".format(key_args)
+        func_text += "  numba.parfor.init_prange()\n"
+        func_text += "  n = len(k0)\n"
+        func_text += "  mask = np.empty(n, np.bool_)\n"
+        func_text += "  for i in numba.parfor.internal_prange(n):\n"
+        func_text += "    mask[i] = not ({})\n".format(isna_calls)
+        func_text += "  df2 = df[mask]\n"
+        func_text += "  df3 = hpat.hiframes.pd_dataframe_ext.sort_values_dummy(df2, {}, {}, False)\n".format(
+            list(key_names), ascending)
+        func_text += "  return df3.head({})\n".format(n)
+        loc_vars = {}
+        exec(func_text, {}, loc_vars)
+        _nlargest_impl = loc_vars['_nlargest_impl']
+        return self._replace_func(
+            _nlargest_impl, [df_var] + key_arrs, pre_nodes=nodes)
+
+    def _get_sort_head_n(self, df_var):
+        """return n if the only use of df_var is df_var.head(n) with constant
+        n, raise GuardException otherwise.
+        """
+        uses = self._get_var_uses(df_var)
+        require(len(uses) == 1)
+        head_attr = uses[0]
+        require(is_assign(head_attr) and isinstance(head_attr.value, ir.Expr)
+                and head_attr.value.op == 'getattr'
+                and head_attr.value.attr == 'head')
+        uses = self._get_var_uses(head_attr.target)
+        require(len(uses) == 1)
+        head_call = uses[0]
+        require(is_call_assign(head_call)
+                and head_call.value.func.name == head_attr.target.name)
+        kws = dict(head_call.value.kws)
+        if len(head_call.value.args) == 1:
+            n = find_const(self.func_ir, head_call.value.args[0])
+        elif 'n' in kws:
+            n = find_const(self.func_ir, kws['n'])
+        else:
+            require(not head_call.value.args and not kws)
+            n = 5
+        require(isinstance(n, int))
+        return n
+
+    def _get_var_uses(self, var):
+        uses = []
+        for block in self.func_ir.blocks.values():
+            for stmt in block.body:
+                if isinstance(stmt, ir.Del):
+                    continue
+                if is_assign(stmt) and stmt.target.name == var.name:
+                    continue
+                if var.name in {v.name for v in stmt.list_vars()}:
+                    uses.append(stmt)
+        return uses
+
+    def _gen_df_sort(self, lhs, df_var, key_names, ascending, inplace,
+                     limit=None):
+        df_typ = self.typemap[df_var.name]
         if any(k not in df_typ.columns for k in key_names):
             raise ValueError("invalid sort keys {}".format(key_names))
 
@@ -1091,7 +1212,8 @@ class DataFramePass(object):
                 out_key_vars.append(out_vars.pop(k))
 
         nodes.append(hiframes.sort.Sort(df_var.name, lhs.name, in_key_arrs, out_key_vars,
-                                        in_vars, out_vars, inplace, lhs.loc, ascending))
+                                        in_vars, out_vars, inplace, lhs.loc, ascending,
+                                        limit))
 
         _init_df = _gen_init_df(df_typ.columns)
 
@@ -1479,13 +1601,23 @@ class DataFramePass(object):
         return self._replace_func(f, [arr], pre_nodes=nodes)
 
     def _run_call_join(self, assign, lhs, rhs):
-        left_df, right_df, left_on_var, right_on_var, how_var = rhs.args
+        left_df, right_df, left_on_var, right_on_var, how_var, method_var = rhs.args[:6]
 
         left_on = self._get_const_or_list(left_on_var)
         right_on = self._get_const_or_list(right_on_var)
         how = guard(find_const, self.func_ir, how_var)
+        method = guard(find_const, self.func_ir, method_var)
+        if method not in ('auto', 'hash', 'sort', 'broadcast'):
+            raise ValueError("invalid join method {}".format(method))
         out_typ = self.typemap[lhs.name]
 
+        asof_params = None
+        if how == 'asof':
+            left_by, right_by, asof_params = self._get_asof_params(*rhs.args[6:])
+            # 'by' keys are matched exactly before the 'on' key
+            left_on = tuple(left_by) + tuple(left_on)
+            right_on = tuple(right_by) + tuple(right_on)
+
         # convert right join to left join
         if how == 'right':
             how = 'left'
@@ -1507,22 +1639,98 @@ class DataFramePass(object):
         nodes.append(hiframes.join.Join(lhs.name, left_df.name,
                                         right_df.name,
                                         left_on, right_on, out_data_vars, left_arrs,
-                                        right_arrs, how, lhs.loc))
+                                        right_arrs, how, lhs.loc, method,
+                                        asof_params))
 
         _init_df = _gen_init_df(out_typ.columns)
 
         return self._replace_func(_init_df, list(out_data_vars.values()),
                                   pre_nodes=nodes)
 
+    def _get_asof_params(self, left_by_var, right_by_var, tolerance_var,
+                         allow_exact_matches_var, direction_var):
+        """get 'by' keys and AsofParams of merge_asof, which should be
+        constants
+        """
+        left_by = self._get_const_or_list(left_by_var, default=())
+        right_by = self._get_const_or_list(right_by_var, default=())
+        if len(left_by) != len(right_by):
+            raise ValueError("merge_asof: left_by and right_by should have the same length")
+
+        tolerance = None
+        if not isinstance(self.typemap[tolerance_var.name], types.NoneType):
+            tolerance = guard(find_const, self.func_ir, tolerance_var)
+            if isinstance(self.typemap[tolerance_var.name], types.NPTimedelta):
+                # np.timedelta64(value, unit), converted to nanoseconds
+                tolerance = guard(self._get_const_timedelta, tolerance_var)
+            if tolerance is None:
+                raise ValueError("merge_asof: tolerance should be a constant")
+
+        allow_exact_matches = guard(find_const, self.func_ir, allow_exact_matches_var)
+        direction = guard(find_const, self.func_ir, direction_var)
+        if direction not in hiframes.join._ASOF_DIRECTIONS:
+            raise ValueError("merge_asof: invalid direction {}".format(direction))
+        if not isinstance(allow_exact_matches, bool):
+            raise ValueError("merge_asof: allow_exact_matches should be a constant")
+
+        asof_params = hiframes.join.AsofParams(
+            len(left_by), tolerance, allow_exact_matches, direction)
+        return left_by, right_by, asof_params
+
+    def _get_const_timedelta(self, var):
+        var_def = get_definition(self.func_ir, var)
+        require(isinstance(var_def, ir.Expr) and var_def.op == 'call')
+        require(find_callname(self.func_ir, var_def) == ('timedelta64', 'numpy'))
+        args = [find_const(self.func_ir, v) for v in var_def.args]
+        return int(np.timedelta64(*args) / np.timedelta64(1, 'ns'))
+
     def _run_call_groupby(self, assign, lhs, rhs, grp_var, func_name):
         grp_typ = self.typemap[grp_var.name]
+        if func_name == 'nunique':
+            kws = dict(rhs.kws)
+            approx = False
+            if 'approx' in kws:
+                approx = guard(find_const, self.func_ir, kws['approx'])
+            if approx is not True:
+                raise ValueError(
+                    "groupby nunique() is only supported with approx=True")
+
+        agg_params = ()
+        if func_name == 'quantile':
+            kws = dict(rhs.kws)
+            q = 0.5
+            q_var = rhs.args[0] if len(rhs.args) > 0 else kws.get('q', None)
+            if q_var is not None:
+                q = guard(find_const, self.func_ir, q_var)
+                if not isinstance(q, (int, float)):
+                    raise ValueError(
+                        "groupby quantile() requires a constant scalar q")
+            agg_params = (float(q),)
+
+        in_cols = grp_typ.selection
+        out_cols = grp_typ.selection
+        agg_func = None
+        if (func_name in ('agg', 'aggregate')
+                and hasattr(self.typemap[rhs.args[0].name], 'consts')):
+            # multiple aggregation, constant list of (output column, input
+            # column, function) triples (see _handle_agg_dict() in
+            # hiframes_untyped)
+            consts = self.typemap[rhs.args[0].name].consts
+            agg_func = {consts[i]: (consts[i + 1], consts[i + 2])
+                        for i in range(0, len(consts), 3)}
+            in_cols = []
+            for c, _ in agg_func.values():
+                if c not in in_cols:
+                    in_cols.append(c)
+            out_cols = list(agg_func.keys())
+
         df_var = self._get_df_obj_select(grp_var, 'groupby')
         df_type = self.typemap[df_var.name]
         out_typ = self.typemap[lhs.name]
 
         nodes = []
         in_vars = {c: self._get_dataframe_data(df_var, c, nodes)
-                   for c in grp_typ.selection}
+                   for c in in_cols}
 
         in_key_arrs = [self._get_dataframe_data(df_var, c, nodes)
                        for c in grp_typ.keys]
@@ -1537,19 +1745,20 @@ class DataFramePass(object):
                 out_key_vars.append(out_key_var)
 
         df_col_map = {}
-        for c in grp_typ.selection:
+        for c in out_cols:
             var = ir.Var(lhs.scope, mk_unique_var(c), lhs.loc)
             self.typemap[var.name] = (out_typ.data
                                       if isinstance(out_typ, SeriesType)
                                       else out_typ.data[out_typ.columns.index(c)])
             df_col_map[c] = var
 
-        agg_func = get_agg_func(self.func_ir, func_name, rhs)
+        if agg_func is None:
+            agg_func = get_agg_func(self.func_ir, func_name, rhs)
 
         agg_node = hiframes.aggregate.Aggregate(
             lhs.name, df_var.name, grp_typ.keys, out_key_vars, df_col_map,
             in_vars, in_key_arrs,
-            agg_func, None, lhs.loc)
+            agg_func, None, lhs.loc, agg_params=agg_params)
 
         nodes.append(agg_node)
 
@@ -1583,6 +1792,21 @@ class DataFramePass(object):
         values = self.typemap[values.name].literal_value
         index = self.typemap[index.name].literal_value
         columns = self.typemap[columns.name].literal_value
+
+        # pivot values not annotated, discover them at runtime
+        if self.typemap[_pivot_values.name] == types.none:
+            nodes = []
+            index_arr = self._get_dataframe_data(df_var, index, nodes)
+            columns_arr = self._get_dataframe_data(df_var, columns, nodes)
+            values_arr = self._get_dataframe_data(df_var, values, nodes)
+
+            def _pivot_impl(index_arr, columns_arr, values_arr, aggfunc):  # pragma: no cover
+                return hpat.hiframes.api.pivot_table_dynamic(
+                    index_arr, columns_arr, values_arr, aggfunc)
+            return self._replace_func(
+                _pivot_impl, [index_arr, columns_arr, values_arr, aggfunc],
+                pre_nodes=nodes)
+
         pivot_values = self.typemap[_pivot_values.name].meta
         df_type = self.typemap[df_var.name]
         out_typ = self.typemap[lhs.name]
@@ -1617,6 +1841,15 @@ class DataFramePass(object):
 
     def _run_call_crosstab(self, assign, lhs, rhs):
         index, columns, _pivot_values = rhs.args
+
+        # pivot values not annotated, discover them at runtime
+        if self.typemap[_pivot_values.name] == types.none:
+            def _crosstab_impl(index, columns):  # pragma: no cover
+                index_arr = hpat.hiframes.api.to_arr_from_series(index)
+                columns_arr = hpat.hiframes.api.to_arr_from_series(columns)
+                return hpat.hiframes.api.crosstab_dynamic(index_arr, columns_arr)
+            return self._replace_func(_crosstab_impl, [index, columns])
+
         pivot_values = self.typemap[_pivot_values.name].meta
         out_typ = self.typemap[lhs.name]
 
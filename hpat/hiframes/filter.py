@@ -127,6 +127,24 @@ def filter_distributed_analysis(filter_node, array_dists):
 distributed_analysis.distributed_analysis_extensions[Filter] = filter_distributed_analysis
 
 
+def filter_partitioning_analysis(filter_node, array_dists, array_partitions):
+    # filtering keeps rows on their ranks so output has input partitioning
+    # if key arrays of partitioning are filtered as well
+    in_to_out = {v.name: filter_node.df_out_vars[c].name
+                 for (c, v) in filter_node.df_in_vars.items()}
+    for (c, col_var) in filter_node.df_in_vars.items():
+        part = array_partitions.get(col_var.name)
+        out_var = filter_node.df_out_vars[c]
+        if (part is None or array_dists[out_var.name] == Distribution.REP
+                or any(k not in in_to_out for k in part.keys)):
+            continue
+        array_partitions[out_var.name] = distributed_analysis.Partitioning(
+            part.kind, tuple(in_to_out[k] for k in part.keys))
+
+
+distributed_analysis.partitioning_analysis_extensions[Filter] = filter_partitioning_analysis
+
+
 def build_filter_definitions(filter_node, definitions=None):
     if definitions is None:
         definitions = defaultdict(list)
@@ -858,6 +858,9 @@ class HiFramesTyped(object):
             data = self._get_series_data(series_var, nodes)
             return self._replace_func(func, [data], pre_nodes=nodes)
 
+        if func_name == 'nunique' and (rhs.args or rhs.kws):
+            return self._run_call_series_nunique(assign, lhs, rhs, series_var)
+
         if func_name in ('std', 'nunique', 'describe', 'abs', 'isna',
                          'isnull', 'median', 'idxmin', 'idxmax', 'unique'):
             if rhs.args or rhs.kws:
@@ -875,6 +878,19 @@ class HiFramesTyped(object):
         if func_name == 'quantile':
             nodes = []
             data = self._get_series_data(series_var, nodes)
+            kws = dict(rhs.kws)
+            approx = False
+            if 'approx' in kws:
+                approx = guard(find_const, self.func_ir, kws['approx'])
+                if approx is None:  # pragma: no cover
+                    raise ValueError("approx arg to quantile should be constant")
+            if approx:
+                # quantile sketches are merged with one collective
+                return self._replace_func(
+                    lambda A, q: hpat.hiframes.api.quantiles_approx(A, (q,))[0],
+                    [data, rhs.args[0]],
+                    pre_nodes=nodes
+                )
             return self._replace_func(
                 lambda A, q: hpat.hiframes.api.quantile(A, q),
                 [data, rhs.args[0]],
@@ -1119,6 +1135,22 @@ class HiFramesTyped(object):
             args,
             pre_nodes=nodes)
 
+    def _run_call_series_nunique(self, assign, lhs, rhs, series_var):
+        kws = dict(rhs.kws)
+        if rhs.args or set(kws.keys()) - {'approx'}:
+            raise ValueError("unsupported Series.nunique() arguments")
+        approx = guard(find_const, self.func_ir, kws['approx'])
+        if approx is None:  # pragma: no cover
+            raise ValueError("approx arg to nunique should be constant")
+
+        # approximate count with HyperLogLog sketch
+        func = series_replace_funcs['nunique']
+        if approx:
+            func = series_replace_funcs['nunique_approx']
+        nodes = []
+        data = self._get_series_data(series_var, nodes)
+        return self._replace_func(func, [data], pre_nodes=nodes)
+
     def _run_call_series_fillna(self, assign, lhs, rhs, series_var):
         dtype = self.typemap[series_var.name].dtype
         val = rhs.args[0]
@@ -60,9 +60,10 @@ def remove_hiframes(rhs, lives, call_list):
         return True
     if (len(call_list) == 4 and call_list[1:] == ['api', 'hiframes', hpat] and
             call_list[0] in ['fix_df_array', 'fix_rolling_array',
-                             'concat', 'count', 'mean', 'quantile', 'var',
+                             'concat', 'count', 'mean', 'quantile', 'quantiles_approx', 'var',
                              'str_contains_regex', 'str_contains_noregex', 'column_sum',
-                             'nunique', 'init_series', 'init_datetime_index',
+                             'nunique', 'nunique_approx', 'pivot_table_dynamic', 'crosstab_dynamic',
+                             'init_series', 'init_datetime_index',
                              'convert_tup_to_rec', 'convert_rec_to_tup']):
         return True
     if (len(call_list) == 4 and call_list[1:] == ['series_kernels', 'hiframes', hpat] and
@@ -405,6 +406,15 @@ class HiFrames(object):
         if isinstance(func_mod, ir.Var) and self._is_df_obj_call(func_mod, 'groupby'):
             return self._handle_aggregate(lhs, rhs, func_mod, func_name, label)
 
+        # multiple aggregation with dict
+        # e.g. df.groupby('A').agg({'B': ['sum', 'mean'], 'C': 'max'})
+        if (func_name in ('agg', 'aggregate') and isinstance(func_mod, ir.Var)
+                and self._is_groupby_obj(func_mod)
+                and len(rhs.args) == 1 and not rhs.kws):
+            arg_def = guard(get_definition, self.func_ir, rhs.args[0])
+            if isinstance(arg_def, ir.Expr) and arg_def.op == 'build_map':
+                return self._handle_agg_dict(rhs, func_mod, func_name, arg_def)
+
         # rolling window
         # e.g. df.rolling(2).sum
         if isinstance(func_mod, ir.Var) and self._is_df_obj_call(func_mod, 'rolling'):
@@ -688,9 +698,10 @@ class HiFrames(object):
             raise ValueError(
                 "Invalid DataFrame() arguments (constant dict of columns expected)")
         nodes, items = self._fix_df_arrays(arg_def.items)
-        # HACK replace build_map to avoid inference errors
-        arg_def.op = 'build_list'
-        arg_def.items = [v[0] for v in arg_def.items]
+        # the dict isn't used after replacing agg() and its values can't be
+        # typed, so its definition is replaced with a constant if agg() is
+        # its only use
+        self._replace_unused_build_map(rhs.args[0], arg_def)
 
         n_cols = len(items)
         data_args = ", ".join('data{}'.format(i) for i in range(n_cols))
@@ -1348,6 +1359,77 @@ class HiFrames(object):
         nodes.append(agg_node)
         return nodes
 
+    def _handle_agg_dict(self, rhs, grp_var, func_name, arg_def):
+        """replace dict argument of groupby agg() with a constant list of
+        (output column, input column, function) triples for typing. Output
+        columns are named 'col_func' if a list of functions is given for any
+        column (instead of pandas MultiIndex columns).
+        """
+        col_funcs = []
+        is_multi_index = False
+        for c, v in arg_def.items:
+            cname = guard(find_const, self.func_ir, c)
+            if not isinstance(cname, str):
+                raise ValueError("dictionary argument to agg() should have constant keys")
+            if not isinstance(guard(find_const, self.func_ir, v), str):
+                is_multi_index = True
+            err_msg = "agg() function names should be constant strings"
+            for f_name in self._get_str_or_list(v, err_msg=err_msg):
+                if f_name not in supported_agg_funcs[:-2]:
+                    raise ValueError("only {} supported in groupby agg() with dict".format(
+                        ", ".join(supported_agg_funcs[:-2])))
+                col_funcs.append((cname, f_name))
+
+        # the dict isn't used after replacing agg() and its values can't be
+        # typed, so its definition is replaced with a constant if agg() is
+        # its only use
+        self._replace_unused_build_map(rhs.args[0], arg_def)
+
+        consts = []
+        for cname, f_name in col_funcs:
+            out_name = "{}_{}".format(cname, f_name) if is_multi_index else cname
+            consts += [out_name, cname, f_name]
+        func_text = "def _agg_f(grp):\n"
+        func_text += "  return grp.{}([{}])\n".format(
+            func_name, ", ".join("'{}'".format(c) for c in consts))
+        loc_vars = {}
+        exec(func_text, {}, loc_vars)
+        _agg_f = loc_vars['_agg_f']
+        return self._replace_func(_agg_f, [grp_var])
+
+    def _replace_unused_build_map(self, dict_var, map_def):
+        """replace build_map definition of dict_var with a new constant if its
+        only use is the call being replaced
+        """
+        uses = 0
+        def_assign = None
+        for block in self.func_ir.blocks.values():
+            for stmt in block.body:
+                if isinstance(stmt, ir.Del):
+                    continue
+                if is_assign(stmt) and stmt.value is map_def:
+                    def_assign = stmt
+                elif dict_var.name in {v.name for v in stmt.list_vars()}:
+                    uses += 1
+        if uses == 1 and def_assign is not None:
+            def_assign.value = ir.Const(None, map_def.loc)
+            var_defs = self.func_ir._definitions[def_assign.target.name]
+            if map_def in var_defs:
+                var_defs.remove(map_def)
+            var_defs.append(def_assign.value)
+
+    def _is_groupby_obj(self, var):
+        """determines whether variable is coming from groupby() or groupby()[]
+        on any object (dataframes may not be in df_vars)
+        """
+        var_def = guard(get_definition, self.func_ir, var)
+        if (isinstance(var_def, ir.Expr)
+                and var_def.op in ['getitem', 'static_getitem']):
+            return self._is_groupby_obj(var_def.value)
+        call_def = guard(find_callname, self.func_ir, var_def)
+        return (call_def is not None and call_def[0] == 'groupby'
+                and isinstance(call_def[1], ir.Var))
+
     def _handle_agg_func(self, in_vars, out_colnames, func_name, lhs, rhs):
         agg_func = get_agg_func(self.func_ir, func_name, rhs)
         out_tp_vars = {}
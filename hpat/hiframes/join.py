@@ -9,7 +9,7 @@ from numba import cgutils
 from numba.extending import (register_model, models, lower_builtin)
 from numba.typing.templates import (signature, AbstractTemplate, infer_global, infer)
 import operator
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import numpy as np
 
 import numba
@@ -29,7 +29,8 @@ from hpat.str_arr_ext import (string_array_type, to_string_list,
                               pre_alloc_string_array, num_total_chars,
                               getitem_str_offset, copy_str_arr_slice,
                               str_copy_ptr, get_utf8_size,
-                              setitem_str_offset, str_arr_set_na)
+                              setitem_str_offset, str_arr_set_na,
+                              copy_str_arr_chars, str_arr_is_na)
 from hpat.str_ext import string_type
 from hpat.timsort import copyElement_tup, getitem_arr_tup, setitem_arr_tup
 from hpat.shuffle_utils import (
@@ -41,13 +42,37 @@ from hpat.shuffle_utils import (
     update_shuffle_meta,
     alloc_pre_shuffle_metadata,
     _get_keys_tup,
-    _get_data_tup)
+    _get_data_tup,
+    get_dest_ranks,
+    shuffle_with_dest,
+    hash_key_arrs,
+    _str_len)
+from hpat.hash_table import (build_key_table, probe_key_table,
+                             bloom_filter_alloc, bloom_filter_add,
+                             bloom_filter_contains)
 from hpat.hiframes.pd_categorical_ext import CategoricalArray
 
 
+# sort-merge join is used if sampled keys of both tables have at least this
+# many rows per distinct key on average
+SORT_JOIN_DUP_FACTOR = 4.0
+# number of rows sampled on each rank for estimating key duplication
+SORT_JOIN_SAMPLES = 1000
+# maximum size of Bloom filter for semi-join (2^30 bits = 128MB)
+BLOOM_FILTER_MAX_LOG_BITS = 30
+
+# merge_asof options: first n_by keys are 'by' keys matched exactly and the
+# last key is the 'on' key, tolerance is None or maximum distance of 'on'
+# values (in nanoseconds for datetime keys)
+AsofParams = namedtuple(
+    'AsofParams', 'n_by,tolerance,allow_exact_matches,direction')
+_ASOF_DIRECTIONS = ('backward', 'forward', 'nearest')
+
+
 class Join(ir.Stmt):
     def __init__(self, df_out, left_df, right_df, left_keys, right_keys,
-                 out_vars, left_vars, right_vars, how, loc):
+                 out_vars, left_vars, right_vars, how, loc, method='auto',
+                 asof_params=None):
         self.df_out = df_out
         self.left_df = left_df
         self.right_df = right_df
@@ -58,6 +83,10 @@ class Join(ir.Stmt):
         self.right_vars = right_vars
         self.how = how
         self.loc = loc
+        # 'auto', 'hash', 'sort' or 'broadcast'
+        self.method = method
+        # AsofParams for merge_asof
+        self.asof_params = asof_params
 
     def __repr__(self):  # pragma: no cover
         out_cols = ""
@@ -74,9 +103,10 @@ class Join(ir.Stmt):
         for (c, v) in self.right_vars.items():
             in_cols += "'{}':{}, ".format(c, v.name)
         df_right_str = "{}{{{}}}".format(self.right_df, in_cols)
-        return "join [{}={}]: {} , {}, {}".format(
+        asof_str = "" if self.asof_params is None else ", {}".format(self.asof_params)
+        return "join [{}={}]: {} , {}, {}, method={}{}".format(
             self.left_keys, self.right_keys, df_out_str, df_left_str,
-            df_right_str)
+            df_right_str, self.method, asof_str)
 
 
 def join_array_analysis(join_node, equiv_set, typemap, array_analysis):
@@ -170,6 +200,45 @@ def join_distributed_analysis(join_node, array_dists):
 distributed_analysis.distributed_analysis_extensions[Join] = join_distributed_analysis
 
 
+def join_partitioning_analysis(join_node, array_dists, array_partitions):
+    left_parallel, right_parallel = _get_table_parallel_flags(
+        join_node, array_dists)
+    if not (left_parallel and right_parallel) or join_node.how == 'asof':
+        return
+    # output is hash partitioned on keys if tables are hash shuffled, other
+    # methods (broadcast or range shuffle) can be chosen at runtime for 'auto'
+    if not (join_node.method == 'hash'
+            or _is_co_partitioned(join_node, array_partitions)):
+        return
+    # key columns of one side can have NAs in output of outer joins
+    if join_node.how in ('inner', 'left') or join_node.left_keys == join_node.right_keys:
+        out_keys = join_node.left_keys
+    elif join_node.how == 'right':
+        out_keys = join_node.right_keys
+    else:
+        return
+    part = distributed_analysis.Partitioning(
+        'hash', tuple(join_node.df_out_vars[c].name for c in out_keys))
+    for col_var in join_node.df_out_vars.values():
+        array_partitions[col_var.name] = part
+
+
+distributed_analysis.partitioning_analysis_extensions[Join] = join_partitioning_analysis
+
+
+def _is_co_partitioned(join_node, array_partitions):
+    """both tables are hash partitioned on join keys, so rows with equal keys
+    are on the same rank already and can be joined locally
+    """
+    def is_hash_partitioned(key_vars):
+        part = distributed_analysis.Partitioning(
+            'hash', tuple(v.name for v in key_vars))
+        return all(array_partitions.get(v.name) == part for v in key_vars)
+
+    return (is_hash_partitioned([join_node.left_vars[c] for c in join_node.left_keys])
+            and is_hash_partitioned([join_node.right_vars[c] for c in join_node.right_keys]))
+
+
 def join_typeinfer(join_node, typeinferer):
     # TODO: consider keys with same name, cols with suffix
     for col_name, col_var in (list(join_node.left_vars.items())
@@ -309,9 +378,13 @@ def join_distributed_run(join_node, array_dists, typemap, calltypes, typingctx,
 
     left_parallel, right_parallel = _get_table_parallel_flags(
         join_node, array_dists)
+    # shuffle is not necessary if tables are hash partitioned on keys already
+    co_partitioned = (left_parallel and right_parallel and join_node.how != 'asof'
+                      and _is_co_partitioned(join_node, dist_pass._dist_analysis.array_partitions))
 
-    method = 'hash'
-    # method = 'sort'
+    # local join algorithm, chosen at runtime in parallel_join_auto() if
+    # both tables are distributed and method is 'auto'
+    method = 'sort' if join_node.method == 'sort' else 'hash'
     # TODO: rebalance if output distributions are 1D instead of 1D_Var
     loc = join_node.loc
     n_keys = len(join_node.left_keys)
@@ -349,22 +422,61 @@ def join_distributed_run(join_node, array_dists, typemap, calltypes, typingctx,
                                                     "," if len(right_other_names) != 0 else "")
 
     if join_node.how == 'asof':
+        asof_params = join_node.asof_params
+        if asof_params is None:
+            asof_params = AsofParams(0, None, True, 'backward')
+        n_by = asof_params.n_by
+        # 'by' keys come first and 'on' key is last
+        func_text += "    t1_by = ({}{})\n".format(",".join(left_key_names[:n_by]), "," if n_by == 1 else "")
+        func_text += "    t2_by = ({}{})\n".format(",".join(right_key_names[:n_by]), "," if n_by == 1 else "")
+        func_text += "    t1_on = ({},)\n".format(left_key_names[n_by])
+        func_text += "    t2_on = ({},)\n".format(right_key_names[n_by])
         if left_parallel or right_parallel:
             assert left_parallel and right_parallel
-            # only the right key needs to be aligned
-            func_text += "    t2_keys, data_right = parallel_asof_comm(t1_keys, t2_keys, data_right)\n"
+            if n_by == 0:
+                # only the right key needs to be aligned
+                func_text += "    t2_on, data_right = parallel_asof_comm(t1_on, t2_on, data_right)\n"
+            else:
+                # every group is matched on a single rank
+                func_text += ("    t1_by, t1_on, data_left, t2_by, t2_on, data_right = parallel_asof_by_shuffle("
+                              "t1_by, t1_on, data_left, t2_by, t2_on, data_right)\n")
     else:
-        if left_parallel:
-            func_text += "    t1_keys, data_left = parallel_join(t1_keys, data_left)\n"
-        if right_parallel:
-            func_text += "    t2_keys, data_right = parallel_join(t2_keys, data_right)\n"
+        # a replicated table can be joined with a distributed table locally if
+        # unmatched rows of the replicated table are not needed in output
+        bcast_left = join_node.how == 'inner'
+        bcast_right = join_node.how in ('inner', 'left')
+        if join_node.method == 'broadcast' and not (bcast_left or bcast_right):
+            raise ValueError("broadcast join method not supported for {} join".format(join_node.how))
+        if co_partitioned:
+            # rows with equal keys are on the same rank, join locally
+            pass
+        elif left_parallel and right_parallel and join_node.method in ('auto', 'broadcast'):
+            # broadcast a small table at runtime or always if requested, and
+            # choose between hash and sort-merge join
+            threshold = -1 if join_node.method == 'broadcast' else hpat.config.config_broadcast_join_threshold
+            method = 'auto'
+            func_text += ("    out_t1_keys, out_t2_keys, out_data_left, out_data_right = parallel_join_auto("
+                          "t1_keys, t2_keys, data_left, data_right, {}, {}, {}, {}, {})\n").format(
+                bcast_left, bcast_right, threshold,
+                join_node.how in ('left', 'outer'), join_node.how == 'outer')
+        elif left_parallel and right_parallel and method == 'sort':
+            func_text += ("    t1_keys, t2_keys, data_left, data_right = parallel_sort_join_shuffle("
+                          "t1_keys, t2_keys, data_left, data_right)\n")
+        elif left_parallel and right_parallel:
+            func_text += ("    t1_keys, t2_keys, data_left, data_right = parallel_hash_join_shuffle("
+                          "t1_keys, t2_keys, data_left, data_right, {}, {})\n").format(
+                join_node.how in ('left', 'outer'), join_node.how == 'outer')
+        else:
+            if left_parallel and not (bcast_right and not right_parallel):
+                func_text += "    t1_keys, data_left = parallel_join(t1_keys, data_left)\n"
+            if right_parallel and not (bcast_left and not left_parallel):
+                func_text += "    t2_keys, data_right = parallel_join(t2_keys, data_right)\n"
         #func_text += "    print(t2_key, data_right)\n"
 
-    if method == 'sort' and join_node.how != 'asof':
-        # asof key is already sorted, TODO: add error checking
-        # local sort
-        func_text += "    hpat.hiframes.sort.local_sort(t1_keys, data_left)\n"
-        func_text += "    hpat.hiframes.sort.local_sort(t2_keys, data_right)\n"
+    if method == 'sort' and (co_partitioned or not (left_parallel and right_parallel)):
+        # local sort, distributed tables are sorted in parallel_sort_join_shuffle()
+        func_text += "    t1_keys, data_left = sort_table_copy(t1_keys, data_left)\n"
+        func_text += "    t2_keys, data_right = sort_table_copy(t2_keys, data_right)\n"
 
     # align output variables for local merge
     # add keys first (TODO: remove dead keys)
@@ -372,11 +484,12 @@ def join_distributed_run(join_node, array_dists, typemap, calltypes, typingctx,
     out_r_key_vars = tuple(join_node.df_out_vars[c] for c in join_node.right_keys)
     # create dummy variable if right key is not actually returned
     # using the same output left key causes errors for asof case
-    if join_node.left_keys == join_node.right_keys:
-        out_r_key_vars = tuple(ir.Var(scope, mk_unique_var('dummy_k'), loc)
-                               for _ in range(n_keys))
-        for v, w in zip(out_r_key_vars, out_l_key_vars):
-            typemap[v.name] = typemap[w.name]
+    out_r_key_vars = list(out_r_key_vars)
+    for i, c in enumerate(join_node.right_keys):
+        if c in join_node.left_keys:
+            out_r_key_vars[i] = ir.Var(scope, mk_unique_var('dummy_k'), loc)
+            typemap[out_r_key_vars[i].name] = typemap[join_node.df_out_vars[c].name]
+    out_r_key_vars = tuple(out_r_key_vars)
 
     merge_out = out_l_key_vars + out_r_key_vars
     merge_out += tuple(join_node.df_out_vars[n]
@@ -387,7 +500,15 @@ def join_distributed_run(join_node, array_dists, typemap, calltypes, typingctx,
 
     if join_node.how == 'asof':
         func_text += ("    out_t1_keys, out_t2_keys, out_data_left, out_data_right"
-                      " = hpat.hiframes.join.local_merge_asof(t1_keys, t2_keys, data_left, data_right)\n")
+                      " = hpat.hiframes.join.local_merge_asof(t1_by, t1_on, t2_by, t2_on, data_left, data_right,"
+                      " {}, {}, {}, {})\n").format(
+            asof_params.tolerance is not None,
+            0 if asof_params.tolerance is None else repr(asof_params.tolerance),
+            asof_params.allow_exact_matches,
+            _ASOF_DIRECTIONS.index(asof_params.direction))
+    elif method == 'auto':
+        # local join is done in parallel_join_auto()
+        pass
     elif method == 'sort':
         func_text += (
             "    out_t1_keys, out_t2_keys, out_data_left, out_data_right"
@@ -437,7 +558,12 @@ def join_distributed_run(join_node, array_dists, typemap, calltypes, typingctx,
         'to_string_list': to_string_list,
         'cp_str_list_to_array': cp_str_list_to_array,
         'parallel_join': parallel_join,
-        'parallel_asof_comm': parallel_asof_comm}
+        'parallel_join_auto': parallel_join_auto,
+        'parallel_hash_join_shuffle': parallel_hash_join_shuffle,
+        'parallel_sort_join_shuffle': parallel_sort_join_shuffle,
+        'sort_table_copy': sort_table_copy,
+        'parallel_asof_comm': parallel_asof_comm,
+        'parallel_asof_by_shuffle': parallel_asof_by_shuffle}
 
     f_block = compile_to_numba_ir(join_impl,
                                   glbs,
@@ -474,37 +600,193 @@ def _get_table_parallel_flags(join_node, array_dists):
 
 # @numba.njit
 def parallel_join_impl(key_arrs, data):
-    # alloc shuffle meta
+    # keys are hashed once, destination ranks are reused for counting and
+    # writing send buffers
     n_pes = hpat.distributed_api.get_size()
-    pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, data, n_pes, False)
+    dest = get_dest_ranks(key_arrs, n_pes)
+    return shuffle_with_dest(key_arrs, data, dest, n_pes)
 
-    # calc send/recv counts
-    for i in range(len(key_arrs[0])):
-        val = getitem_arr_tup_single(key_arrs, i)
-        node_id = hash(val) % n_pes
-        update_shuffle_meta(pre_shuffle_meta, node_id, i, val_to_tup(val), getitem_arr_tup(data, i), False)
 
-    shuffle_meta = finalize_shuffle_meta(key_arrs, data, pre_shuffle_meta, n_pes, False)
+@generated_jit(nopython=True, cache=True)
+def parallel_join(key_arrs, data):
+    return parallel_join_impl
 
-    # write send buffers
-    for i in range(len(key_arrs[0])):
-        val = getitem_arr_tup_single(key_arrs, i)
-        node_id = hash(val) % n_pes
-        write_send_buff(shuffle_meta, node_id, i, val_to_tup(val), data)
-        # update last since it is reused in data
-        shuffle_meta.tmp_offset[node_id] += 1
 
-    # shuffle
-    recvs = alltoallv_tup(key_arrs + data, shuffle_meta)
-    out_keys = _get_keys_tup(recvs, key_arrs)
-    out_data = _get_data_tup(recvs, key_arrs)
+@numba.njit
+def parallel_join_auto(left_keys, right_keys, data_left, data_right,
+                       bcast_left, bcast_right, threshold, is_left, is_outer):
+    """join distributed tables choosing the algorithm at runtime. A table is
+    gathered on all ranks if its total number of rows is at most threshold
+    (any size if threshold is negative), sort-merge join is used if enabled
+    and keys are sorted or heavily duplicated on both sides, otherwise both
+    tables are shuffled by key hash.
+    """
+    sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+    n_left = hpat.distributed_api.dist_reduce(len(left_keys[0]), sum_op)
+    n_right = hpat.distributed_api.dist_reduce(len(right_keys[0]), sum_op)
+    # broadcast the smaller table if both are allowed
+    if bcast_right and (threshold < 0 or n_right <= threshold) and (not bcast_left or n_right <= n_left):
+        right_keys = hpat.distributed_api.allgatherv_tup(right_keys)
+        data_right = hpat.distributed_api.allgatherv_tup(data_right)
+        return local_hash_join(left_keys, right_keys, data_left, data_right, is_left, is_outer)
+    if bcast_left and (threshold < 0 or n_left <= threshold):
+        left_keys = hpat.distributed_api.allgatherv_tup(left_keys)
+        data_left = hpat.distributed_api.allgatherv_tup(data_left)
+        return local_hash_join(left_keys, right_keys, data_left, data_right, is_left, is_outer)
+    if hpat.config.config_join_auto_sort_merge and _prefer_sort_join(left_keys, right_keys):
+        left_keys, right_keys, data_left, data_right = parallel_sort_join_shuffle(
+            left_keys, right_keys, data_left, data_right)
+        return local_merge_new(left_keys, right_keys, data_left, data_right, is_left, is_outer)
+    left_keys, right_keys, data_left, data_right = parallel_hash_join_shuffle(
+        left_keys, right_keys, data_left, data_right, is_left, is_outer)
+    return local_hash_join(left_keys, right_keys, data_left, data_right, is_left, is_outer)
 
-    return out_keys, out_data
 
+@numba.njit
+def parallel_hash_join_shuffle(left_keys, right_keys, data_left, data_right, is_left, is_outer):
+    """shuffle both tables by key hash. If enabled, rows that cannot match are
+    removed before the shuffle with a Bloom filter of the other table's keys
+    (rows of the larger table in inner join, right rows in left join).
+    """
+    if hpat.config.config_join_bloom_filter and not is_outer:
+        sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+        n_left = hpat.distributed_api.dist_reduce(len(left_keys[0]), sum_op)
+        n_right = hpat.distributed_api.dist_reduce(len(right_keys[0]), sum_op)
+        if not is_left and n_left >= n_right:
+            left_keys, data_left = bloom_semi_join(left_keys, data_left, right_keys)
+        else:
+            right_keys, data_right = bloom_semi_join(right_keys, data_right, left_keys)
+    left_keys, data_left = parallel_join(left_keys, data_left)
+    right_keys, data_right = parallel_join(right_keys, data_right)
+    return left_keys, right_keys, data_left, data_right
+
+
+@numba.njit
+def bloom_semi_join(key_arrs, data, filter_keys):
+    """remove rows of distributed table with keys not in distributed
+    filter_keys using a Bloom filter OR-reduced across ranks (some rows with
+    keys not in filter_keys can remain)
+    """
+    sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+    or_op = np.int32(hpat.distributed_api.Reduce_Type.Or.value)
+    n_filter = hpat.distributed_api.dist_reduce(len(filter_keys[0]), sum_op)
+    bits, log_bits = bloom_filter_alloc(n_filter, BLOOM_FILTER_MAX_LOG_BITS)
+    f_hashes = hash_key_arrs(filter_keys)
+    for i in range(len(f_hashes)):
+        bloom_filter_add(bits, log_bits, f_hashes[i])
+    hpat.distributed_api.dist_reduce(bits, or_op)
+
+    hashes = hash_key_arrs(key_arrs)
+    n = len(hashes)
+    inds = np.empty(n, np.int64)
+    n_keep = 0
+    for i in range(n):
+        if bloom_filter_contains(bits, log_bits, hashes[i]):
+            inds[n_keep] = i
+            n_keep += 1
+    inds = inds[:n_keep]
+    return gather_arr_tup_na(key_arrs, inds), gather_arr_tup_na(data, inds)
 
-@generated_jit(nopython=True, cache=True)
-def parallel_join(key_arrs, data):
-    return parallel_join_impl
+
+@numba.njit
+def _prefer_sort_join(left_keys, right_keys):
+    """decide on all ranks if sort-merge join is better than hash join: keys
+    of both tables are already sorted in every rank, or sampled keys of both
+    tables have many duplicates (many-to-many join)
+    """
+    sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+    # number of ranks with unsorted keys and duplication factors are reduced
+    # together
+    vals = np.empty(3, np.float64)
+    vals[0] = 0.0
+    if not _is_sorted_tup(left_keys) or not _is_sorted_tup(right_keys):
+        vals[0] = 1.0
+    vals[1] = _sample_dup_factor(left_keys)
+    vals[2] = _sample_dup_factor(right_keys)
+    hpat.distributed_api.dist_reduce(vals, sum_op)
+    if vals[0] == 0.0:
+        return True
+    n_pes = hpat.distributed_api.get_size()
+    return vals[1] / n_pes >= SORT_JOIN_DUP_FACTOR and vals[2] / n_pes >= SORT_JOIN_DUP_FACTOR
+
+
+@numba.njit
+def _is_sorted_tup(key_arrs):
+    # same order as local_sort (NA last)
+    n = len(key_arrs[0])
+    for i in range(1, n):
+        if hpat.hiframes.sort.cmp_row_tup(key_arrs, i - 1, i, True) > 0:
+            return False
+    return True
+
+
+@numba.njit
+def _sample_dup_factor(key_arrs):
+    """average number of rows per distinct key in a random sample of rows
+    (underestimates the actual duplication)
+    """
+    n = len(key_arrs[0])
+    if n == 0:
+        return 1.0
+    n_samples = min(n, SORT_JOIN_SAMPLES)
+    inds = np.random.randint(0, n, n_samples)
+    samples = getitem_arr_tup(key_arrs, inds)
+    hpat.hiframes.sort.local_sort(samples, ())
+    n_distinct = 1
+    for i in range(1, n_samples):
+        if getitem_arr_tup(samples, i) != getitem_arr_tup(samples, i - 1):
+            n_distinct += 1
+    return n_samples / n_distinct
+
+
+@numba.njit
+def parallel_sort_join_shuffle(left_keys, right_keys, data_left, data_right):
+    """range-partition both tables with the same splitters (computed from
+    left keys) so that equal keys are on the same rank, and sort them locally
+    """
+    n_pes = hpat.distributed_api.get_size()
+    left_keys, data_left = sort_table_copy(left_keys, data_left)
+    right_keys, data_right = sort_table_copy(right_keys, data_right)
+    sum_op = np.int32(hpat.distributed_api.Reduce_Type.Sum.value)
+    n_total = hpat.distributed_api.dist_reduce(len(left_keys[0]), sum_op)
+    bounds = hpat.hiframes.sort.get_sort_bounds(left_keys, n_total, True)
+    left_keys, data_left = _range_shuffle(left_keys, data_left, bounds, n_pes)
+    right_keys, data_right = _range_shuffle(right_keys, data_right, bounds, n_pes)
+    return left_keys, right_keys, data_left, data_right
+
+
+@numba.njit
+def sort_table_copy(key_arrs, data):
+    """sort table by keys, input arrays are copied if not sorted already"""
+    if not _is_sorted_tup(key_arrs):
+        key_arrs = copy_arr_tup(key_arrs)
+        data = copy_arr_tup(data)
+        hpat.hiframes.sort.local_sort(key_arrs, data)
+    return key_arrs, data
+
+
+@numba.njit
+def _range_shuffle(key_arrs, data, bounds, n_pes):
+    """send rows of locally sorted table with keys in (bounds[i-1], bounds[i]]
+    to rank i, and merge received sorted runs
+    """
+    n = len(key_arrs[0])
+    dest = np.empty(n, np.int32)
+    send_counts = np.zeros(n_pes, np.int64)
+    lo = 0
+    for j in range(n_pes - 1):
+        hi = max(hpat.hiframes.sort._search_sorted_tup(
+            key_arrs, bounds, j, n, True, True), lo)
+        dest[lo:hi] = j
+        send_counts[j] = hi - lo
+        lo = hi
+    dest[lo:] = n_pes - 1
+    send_counts[n_pes - 1] = n - lo
+    recv_counts = np.empty(n_pes, np.int64)
+    hpat.distributed_api.alltoall(send_counts, recv_counts, 1)
+    # data from every rank is received in order
+    key_arrs, data = shuffle_with_dest(key_arrs, data, dest, n_pes)
+    return hpat.hiframes.sort.kway_merge(key_arrs, data, recv_counts, True)
 
 
 @numba.njit
@@ -527,8 +809,11 @@ def parallel_asof_comm(left_key_arrs, right_key_arrs, right_data):
 
     offset = -1
     i = 0
-    # ignore no overlap processors (end of their interval is before current)
+    # no overlap processors (end of their interval is before current) only
+    # need the first element in case it is a forward match
     while i < n_pes - 1 and bnd_ends[i] < my_start:
+        send_counts[i] = 1
+        send_disp[i] = 0
         i += 1
     while i < n_pes and bnd_starts[i] <= my_end:
         offset, count = _count_overlap(right_key_arrs[0], bnd_starts[i], bnd_ends[i])
@@ -536,6 +821,9 @@ def parallel_asof_comm(left_key_arrs, right_key_arrs, right_data):
         if offset != 0:
             offset -= 1
             count += 1
+        # one extra element in case next value is needed for end of boundary
+        if offset + count < len(right_key_arrs[0]):
+            count += 1
         send_counts[i] = count
         send_disp[i] = offset
         i += 1
@@ -559,6 +847,18 @@ def parallel_asof_comm(left_key_arrs, right_key_arrs, right_data):
     return (out_r_keys,), out_r_data
 
 
+@numba.njit
+def parallel_asof_by_shuffle(left_by, left_on, data_left, right_by, right_on, data_right):
+    """shuffle both tables by hash of 'by' keys so that every group is on a
+    single rank. Rows from every rank are received in order so right table
+    stays sorted by 'on' key.
+    """
+    left_by, left_other = parallel_join(left_by, left_on + data_left)
+    right_by, right_other = parallel_join(right_by, right_on + data_right)
+    return (left_by, (left_other[0],), left_other[1:],
+            right_by, (right_other[0],), right_other[1:])
+
+
 @numba.njit
 def _count_overlap(r_key_arr, start, end):
     # TODO: use binary search
@@ -881,74 +1181,58 @@ def setnan_elem_buff_tup_overload(data, ind):
 # @numba.njit
 def local_hash_join_impl(left_keys, right_keys, data_left, data_right, is_left=False, is_right=False):
     l_len = len(left_keys[0])
-    r_len = len(right_keys[0])
-    # TODO: approximate output size properly
-    curr_size = 101 + min(l_len, r_len) // 2
-    if is_left:
-        curr_size = int(1.1 * l_len)
-    if is_right:
-        curr_size = int(1.1 * r_len)
-    if is_left and is_right:
-        curr_size = int(1.1 * (l_len + r_len))
 
-    out_left_key = alloc_arr_tup(curr_size, left_keys)
-    out_data_left = alloc_arr_tup(curr_size, data_left)
-    out_data_right = alloc_arr_tup(curr_size, data_right)
+    # hash table of right keys with rows of every key in CSR format
+    table = build_key_table(right_keys)[0]
+    r_offsets = table[3]
+    r_rows = table[4]
+    n_groups = len(r_offsets) - 1
     # keep track of matched keys in case of right join
-    if is_right:
-        r_matched = np.full(r_len, False, np.bool_)
-
-    out_ind = 0
-    m = hpat.dict_ext.multimap_int64_init()
-    for i in range(r_len):
-        # store hash if keys are tuple or non-int
-        k = _hash_if_tup(getitem_arr_tup(right_keys, i))
-        hpat.dict_ext.multimap_int64_insert(m, k, i)
+    g_matched = np.full(n_groups, False, np.bool_)
 
-    r = hpat.dict_ext.multimap_int64_equal_range_alloc()
+    # count pass: number of output rows of every left row
+    l_hashes = hash_key_arrs(left_keys)
+    l_groups = np.empty(l_len, np.int64)
+    out_offsets = np.empty(l_len + 1, np.int64)
+    out_offsets[0] = 0
     for i in range(l_len):
-        l_key = getitem_arr_tup(left_keys, i)
-        l_data_val = getitem_arr_tup(data_left, i)
-        k = _hash_if_tup(l_key)
-        hpat.dict_ext.multimap_int64_equal_range_inplace(m, k, r)
+        g = probe_key_table(table, right_keys, left_keys, i, l_hashes[i])
+        l_groups[i] = g
         num_matched = 0
-        for j in r:
-            # if hash for stored, check left key against the actual right key
-            r_ind = _check_ind_if_hashed(right_keys, j, l_key)
-            if r_ind == -1:
-                continue
-            if is_right:
-                r_matched[r_ind] = True
-            out_left_key = copy_elem_buff_tup(out_left_key, out_ind, l_key)
-            r_data_val = getitem_arr_tup(data_right, r_ind)
-            out_data_right = copy_elem_buff_tup(out_data_right, out_ind, r_data_val)
-            out_data_left = copy_elem_buff_tup(out_data_left, out_ind, l_data_val)
-            out_ind += 1
-            num_matched += 1
+        if g != -1:
+            g_matched[g] = True
+            num_matched = r_offsets[g + 1] - r_offsets[g]
         if is_left and num_matched == 0:
-            out_left_key = copy_elem_buff_tup(out_left_key, out_ind, l_key)
-            out_data_left = copy_elem_buff_tup(out_data_left, out_ind, l_data_val)
-            out_data_right = setnan_elem_buff_tup(out_data_right, out_ind)
-            out_ind += 1
+            num_matched = 1
+        out_offsets[i + 1] = out_offsets[i] + num_matched
+
+    n_matched_out = out_offsets[l_len]
+    n_out = n_matched_out
+    if is_right:
+        for g in range(n_groups):
+            if not g_matched[g]:
+                n_out += r_offsets[g + 1] - r_offsets[g]
 
-    hpat.dict_ext.multimap_int64_equal_range_dealloc(r)
+    # fill pass: row indices of output rows in input tables, -1 for NA
+    left_inds = np.empty(n_out, np.int64)
+    right_inds = np.empty(n_out, np.int64)
+    _fill_join_inds(l_groups, out_offsets, r_offsets, r_rows, left_inds, right_inds)
 
     # produce NA rows for unmatched right keys
     if is_right:
-        for i in range(r_len):
-            if not r_matched[i]:
-                r_key = getitem_arr_tup(right_keys, i)
-                r_data_val = getitem_arr_tup(data_right, i)
-                out_left_key = copy_elem_buff_tup(out_left_key, out_ind, r_key)
-                out_data_right = copy_elem_buff_tup(out_data_right, out_ind, r_data_val)
-                out_data_left = setnan_elem_buff_tup(out_data_left, out_ind)
-                out_ind += 1
-
-    out_left_key = trim_arr_tup(out_left_key, out_ind)
+        out_ind = n_matched_out
+        for g in range(n_groups):
+            if not g_matched[g]:
+                for k in range(r_offsets[g], r_offsets[g + 1]):
+                    left_inds[out_ind] = -1
+                    right_inds[out_ind] = r_rows[k]
+                    out_ind += 1
 
+    # output arrays are allocated with exact size (and number of characters)
+    out_left_key = gather_key_tup(left_keys, right_keys, left_inds, right_inds)
     out_right_key = copy_arr_tup(out_left_key)
-    out_data_left = trim_arr_tup(out_data_left, out_ind)
-    out_data_right = trim_arr_tup(out_data_right, out_ind)
+    out_data_left = gather_arr_tup_na(data_left, left_inds)
+    out_data_right = gather_arr_tup_na(data_right, right_inds)
 
     return out_left_key, out_right_key, out_data_left, out_data_right
 
@@ -958,24 +1242,22 @@ def local_hash_join(left_keys, right_keys, data_left, data_right, is_left=False,
     return local_hash_join_impl
 
 
-@generated_jit(nopython=True, cache=True)
-def _hash_if_tup(val):
-    if val == types.Tuple((types.intp,)):
-        return lambda val: val[0]
-    return lambda val: hash(val)
-
-
-@generated_jit(nopython=True, cache=True)
-def _check_ind_if_hashed(right_keys, r_ind, l_key):
-    if right_keys == types.Tuple((types.intp[::1],)):
-        return lambda right_keys, r_ind, l_key: r_ind
-
-    def _impl(right_keys, r_ind, l_key):
-        r_key = getitem_arr_tup(right_keys, r_ind)
-        if r_key != l_key:
-            return -1
-        return r_ind
-    return _impl
+@numba.njit(no_cpython_wrapper=True, parallel=True)
+def _fill_join_inds(l_groups, out_offsets, r_offsets, r_rows, left_inds, right_inds):  # pragma: no cover
+    # output rows of every left row are independent
+    for i in numba.prange(len(l_groups)):
+        out_ind = out_offsets[i]
+        g = l_groups[i]
+        if g == -1:
+            # unmatched left row of left join
+            if out_ind < out_offsets[i + 1]:
+                left_inds[out_ind] = i
+                right_inds[out_ind] = -1
+        else:
+            for k in range(r_offsets[g], r_offsets[g + 1]):
+                left_inds[out_ind] = i
+                right_inds[out_ind] = r_rows[k]
+                out_ind += 1
 
 
 @numba.njit
@@ -1064,42 +1346,224 @@ def local_merge_new(left_keys, right_keys, data_left, data_right, is_left=False,
 
 
 @numba.njit
-def local_merge_asof(left_keys, right_keys, data_left, data_right):
-    # adapted from pandas/_libs/join_func_helper.pxi
-    l_size = len(left_keys[0])
-    r_size = len(right_keys[0])
+def local_merge_asof(left_by, left_on, right_by, right_on, data_left, data_right,
+                     has_tolerance, tolerance, allow_exact_matches, direction):
+    """match every left row with the right row of the same 'by' group with
+    nearest 'on' key in direction (0: backward, 1: forward, 2: nearest).
+    Right table should be sorted by 'on' key.
+    """
+    l_size = len(left_on[0])
+    l_groups, r_offsets, r_rows = asof_groups(
+        left_by, right_by, l_size, len(right_on[0]))
+    right_inds = np.empty(l_size, np.int64)
+    _fill_asof_inds(asof_values(left_on[0]), asof_values(right_on[0]),
+                    l_groups, r_offsets, r_rows, right_inds, has_tolerance,
+                    tolerance, allow_exact_matches, direction)
+
+    out_left_keys = copy_arr_tup(left_by + left_on)
+    out_right_keys = gather_arr_tup_na(right_by + right_on, right_inds)
+    out_data_left = copy_arr_tup(data_left)
+    out_data_right = gather_arr_tup_na(data_right, right_inds)
+    return out_left_keys, out_right_keys, out_data_left, out_data_right
 
-    out_left_keys = alloc_arr_tup(l_size, left_keys)
-    out_right_keys = alloc_arr_tup(l_size, right_keys)
-    out_data_left = alloc_arr_tup(l_size, data_left)
-    out_data_right = alloc_arr_tup(l_size, data_right)
 
-    left_ind = 0
-    right_ind = 0
+def asof_groups(left_by, right_by, l_size, r_size):  # pragma: no cover
+    return np.empty(l_size, np.int64), np.empty(2, np.int64), np.empty(r_size, np.int64)
 
-    for left_ind in range(l_size):
-        # restart right_ind if it went negative in a previous iteration
-        if right_ind < 0:
-            right_ind = 0
 
-        # find last position in right whose value is less than left's
-        while right_ind < r_size and getitem_arr_tup(right_keys, right_ind) <= getitem_arr_tup(left_keys, left_ind):
-            right_ind += 1
+@overload(asof_groups)
+def asof_groups_overload(left_by, right_by, l_size, r_size):
+    """group id of 'by' keys of every left row (-1 if not in right table) and
+    rows of every group of right table in CSR format
+    """
+    if left_by.count == 0:
+        # all rows are in a single group
+        def single_group_impl(left_by, right_by, l_size, r_size):
+            r_offsets = np.empty(2, np.int64)
+            r_offsets[0] = 0
+            r_offsets[1] = r_size
+            return np.zeros(l_size, np.int64), r_offsets, np.arange(r_size)
+        return single_group_impl
+
+    def groups_impl(left_by, right_by, l_size, r_size):
+        table = build_key_table(right_by)[0]
+        l_hashes = hash_key_arrs(left_by)
+        l_groups = np.empty(l_size, np.int64)
+        for i in range(l_size):
+            l_groups[i] = probe_key_table(table, right_by, left_by, i, l_hashes[i])
+        return l_groups, table[3], table[4]
 
-        right_ind -= 1
+    return groups_impl
 
-        setitem_arr_tup(out_left_keys, left_ind, getitem_arr_tup(left_keys, left_ind))
-        # TODO: copy_tup
-        setitem_arr_tup(out_data_left, left_ind, getitem_arr_tup(data_left, left_ind))
 
-        if right_ind >= 0:
-            setitem_arr_tup(out_right_keys, left_ind, getitem_arr_tup(right_keys, right_ind))
-            setitem_arr_tup(out_data_right, left_ind, getitem_arr_tup(data_right, right_ind))
+def asof_values(arr):  # pragma: no cover
+    return arr
+
+
+@overload(asof_values)
+def asof_values_overload(arr):
+    # datetime values are compared as integers to support tolerance
+    if isinstance(arr.dtype, types.NPDatetime):
+        return lambda arr: hpat.hiframes.rolling.cast_dt64_arr_to_int(arr)
+    return lambda arr: arr
+
+
+@numba.njit(no_cpython_wrapper=True, parallel=True)
+def _fill_asof_inds(l_vals, r_vals, l_groups, r_offsets, r_rows, right_inds,
+                    has_tolerance, tolerance, allow_exact_matches, direction):  # pragma: no cover
+    for i in numba.prange(len(l_vals)):
+        g = l_groups[i]
+        ind = -1
+        if g != -1:
+            ind = _asof_match(r_vals, r_rows, r_offsets[g], r_offsets[g + 1],
+                              l_vals[i], has_tolerance, tolerance,
+                              allow_exact_matches, direction)
+        right_inds[i] = ind
+
+
+@numba.njit(no_cpython_wrapper=True)
+def _asof_match(r_vals, r_rows, lo, hi, val, has_tolerance, tolerance,
+                allow_exact_matches, direction):  # pragma: no cover
+    # end of backward candidates and start of forward candidates
+    b_end = _asof_search(r_vals, r_rows, lo, hi, val, allow_exact_matches)
+    f_start = _asof_search(r_vals, r_rows, lo, hi, val, not allow_exact_matches)
+    ind = -1
+    diff = val - val
+    if direction != 1 and b_end > lo:
+        ind = r_rows[b_end - 1]
+        diff = val - r_vals[ind]
+    if direction != 0 and f_start < hi:
+        f_ind = r_rows[f_start]
+        f_diff = r_vals[f_ind] - val
+        # backward match is chosen for ties in nearest direction
+        if ind == -1 or f_diff < diff:
+            ind = f_ind
+            diff = f_diff
+    if ind != -1 and has_tolerance and diff > tolerance:
+        ind = -1
+    return ind
+
+
+@numba.njit(no_cpython_wrapper=True)
+def _asof_search(r_vals, r_rows, lo, hi, val, inclusive):  # pragma: no cover
+    """binary search in sorted rows r_rows[lo:hi], returns first position with
+    value after val (or not before val if inclusive is False)
+    """
+    while lo < hi:
+        mid = (lo + hi) >> 1
+        v = r_vals[r_rows[mid]]
+        if v < val or (inclusive and v == val):
+            lo = mid + 1
         else:
-            setitem_arr_tup_nan(out_right_keys, left_ind)
-            setitem_arr_tup_nan(out_data_right, left_ind)
+            hi = mid
+    return lo
 
-    return out_left_keys, out_right_keys, out_data_left, out_data_right
+
+def gather_key_tup(left_keys, right_keys, left_inds, right_inds):  # pragma: no cover
+    return left_keys
+
+
+@overload(gather_key_tup)
+def gather_key_tup_overload(left_keys, right_keys, left_inds, right_inds):
+    """gather output join keys, from left keys if left row index is valid and
+    from right keys otherwise
+    """
+    count = left_keys.count
+    func_text = "def f(left_keys, right_keys, left_inds, right_inds):\n"
+    func_text += "  return ({}{})\n".format(
+        ",".join("gather_arr_na(left_keys[{0}], left_inds, right_keys[{0}], right_inds)".format(i)
+                 for i in range(count)),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'gather_arr_na': gather_arr_na}, loc_vars)
+    gather_impl = loc_vars['f']
+    return gather_impl
+
+
+def gather_arr_tup_na(arr_tup, inds):  # pragma: no cover
+    return arr_tup
+
+
+@overload(gather_arr_tup_na)
+def gather_arr_tup_na_overload(arr_tup, inds):
+    count = arr_tup.count
+    func_text = "def f(arr_tup, inds):\n"
+    func_text += "  return ({}{})\n".format(
+        ",".join("gather_arr_na(arr_tup[{0}], inds, arr_tup[{0}], inds)".format(i)
+                 for i in range(count)),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'gather_arr_na': gather_arr_na}, loc_vars)
+    gather_impl = loc_vars['f']
+    return gather_impl
+
+
+def gather_arr_na(arr1, inds1, arr2, inds2):  # pragma: no cover
+    return arr1
+
+
+@overload(gather_arr_na)
+def gather_arr_na_overload(arr1, inds1, arr2, inds2):
+    """output row i is arr1[inds1[i]] if inds1[i] != -1, arr2[inds2[i]] if
+    inds2[i] != -1, and NA otherwise
+    """
+    if arr1 == string_array_type:
+        return gather_str_arr_na
+
+    def gather_impl(arr1, inds1, arr2, inds2):
+        out_arr = hpat.hiframes.pd_categorical_ext.fix_cat_array_type(
+            np.empty(len(inds1), arr1.dtype))
+        _fill_gather_na(out_arr, arr1, inds1, arr2, inds2)
+        return out_arr
+
+    return gather_impl
+
+
+@numba.njit(no_cpython_wrapper=True, parallel=True)
+def _fill_gather_na(out_arr, arr1, inds1, arr2, inds2):  # pragma: no cover
+    for i in numba.prange(len(inds1)):
+        if inds1[i] != -1:
+            out_arr[i] = arr1[inds1[i]]
+        elif inds2[i] != -1:
+            out_arr[i] = arr2[inds2[i]]
+        else:
+            setitem_arr_nan(out_arr, i)
+
+
+@numba.njit(no_cpython_wrapper=True)
+def gather_str_arr_na(arr1, inds1, arr2, inds2):  # pragma: no cover
+    n = len(inds1)
+    # exact number of characters
+    n_chars = 0
+    for i in range(n):
+        if inds1[i] != -1:
+            n_chars += _str_len(arr1, inds1[i])
+        elif inds2[i] != -1:
+            n_chars += _str_len(arr2, inds2[i])
+
+    out_arr = pre_alloc_string_array(n, n_chars)
+    curr = 0
+    for i in range(n):
+        setitem_str_offset(out_arr, i, np.uint32(curr))
+        if inds1[i] != -1:
+            arr = arr1
+            j = inds1[i]
+        elif inds2[i] != -1:
+            arr = arr2
+            j = inds2[i]
+        else:
+            str_arr_set_na(out_arr, i)
+            continue
+        start = np.int64(getitem_str_offset(arr, j))
+        l = _str_len(arr, j)
+        copy_str_arr_chars(out_arr, curr, arr, start, l)
+        if str_arr_is_na(arr, j):
+            str_arr_set_na(out_arr, i)
+        curr += l
+    setitem_str_offset(out_arr, n, np.uint32(curr))
+    return out_arr
 
 
 def setitem_arr_nan(arr, ind):
@@ -1171,7 +1635,8 @@ def copy_arr_tup(arrs):
 def copy_arr_tup_overload(arrs):
     count = arrs.count
     func_text = "def f(arrs):\n"
-    func_text += "  return ({},)\n".format(",".join("arrs[{}].copy()".format(i) for i in range(count)))
+    func_text += "  return ({}{})\n".format(",".join("arrs[{}].copy()".format(i) for i in range(count)),
+                                            "," if count == 1 else "")
 
     loc_vars = {}
     exec(func_text, {}, loc_vars)
@@ -633,7 +633,8 @@ class GetItemDataFrameILoc(AbstractTemplate):
 @overload(pd.merge)
 def merge_overload(left, right, how='inner', on=None, left_on=None,
                    right_on=None, left_index=False, right_index=False, sort=False,
-                   suffixes=('_x', '_y'), copy=True, indicator=False, validate=None):
+                   suffixes=('_x', '_y'), copy=True, indicator=False, validate=None,
+                   method='auto'):
 
     # check if on's inferred type is NoneType and store the result,
     # use it later to branch based on the value available at compile time
@@ -641,11 +642,12 @@ def merge_overload(left, right, how='inner', on=None, left_on=None,
 
     def _impl(left, right, how='inner', on=None, left_on=None,
               right_on=None, left_index=False, right_index=False, sort=False,
-              suffixes=('_x', '_y'), copy=True, indicator=False, validate=None):
+              suffixes=('_x', '_y'), copy=True, indicator=False, validate=None,
+              method='auto'):
         if not onHasNoneType:
             left_on = right_on = on
 
-        return hpat.hiframes.api.join_dummy(left, right, left_on, right_on, how)
+        return hpat.hiframes.api.join_dummy(left, right, left_on, right_on, how, method)
 
     return _impl
 
@@ -659,6 +661,7 @@ def merge_asof_overload(left, right, on=None, left_on=None, right_on=None,
     # check if on's inferred type is NoneType and store the result,
     # use it later to branch based on the value available at compile time
     onHasNoneType = isinstance(numba.typeof(on), types.NoneType)
+    byHasNoneType = isinstance(numba.typeof(by), types.NoneType)
 
     def _impl(left, right, on=None, left_on=None, right_on=None,
               left_index=False, right_index=False, by=None, left_by=None,
@@ -666,8 +669,12 @@ def merge_asof_overload(left, right, on=None, left_on=None, right_on=None,
               allow_exact_matches=True, direction='backward'):
         if not onHasNoneType:
             left_on = right_on = on
+        if not byHasNoneType:
+            left_by = right_by = by
 
-        return hpat.hiframes.api.join_dummy(left, right, left_on, right_on, 'asof')
+        return hpat.hiframes.api.join_dummy(
+            left, right, left_on, right_on, 'asof', 'auto', left_by, right_by,
+            tolerance, allow_exact_matches, direction)
 
     return _impl
 
@@ -858,6 +865,48 @@ def lower_sort_values_dummy(context, builder, sig, args):
     return out_obj._getvalue()
 
 
+@overload_method(DataFrameType, 'nlargest')
+def nlargest_overload(df, n, columns, keep='first'):
+
+    def _impl(df, n, columns, keep='first'):
+        return hpat.hiframes.pd_dataframe_ext.nlargest_dummy(
+            df, n, columns, False)
+
+    return _impl
+
+
+@overload_method(DataFrameType, 'nsmallest')
+def nsmallest_overload(df, n, columns, keep='first'):
+
+    def _impl(df, n, columns, keep='first'):
+        return hpat.hiframes.pd_dataframe_ext.nlargest_dummy(
+            df, n, columns, True)
+
+    return _impl
+
+
+# nlargest/nsmallest are sort with a limit (ascending=True for nsmallest)
+def nlargest_dummy(df, n, columns, ascending):
+    if ascending:
+        return df.nsmallest(n, columns)
+    return df.nlargest(n, columns)
+
+
+@infer_global(nlargest_dummy)
+class NlargestDummyTyper(AbstractTemplate):
+    def generic(self, args, kws):
+        assert not kws
+        df, n, columns, ascending = args
+        return signature(df.copy(), *args)
+
+
+@lower_builtin(nlargest_dummy, types.VarArg(types.Any))
+def lower_nlargest_dummy(context, builder, sig, args):
+    out_obj = cgutils.create_struct_proxy(
+        sig.return_type)(context, builder)
+    return out_obj._getvalue()
+
+
 # dummy function to change the df type to have set_parent=True
 # used in sort_values(inplace=True) hack
 def set_parent_dummy(df):
@@ -11,7 +11,7 @@ from numba.typing.templates import (infer_global, AbstractTemplate, signature,
 from numba.targets.imputils import impl_ret_new_ref, impl_ret_borrowed
 import hpat
 from hpat.hiframes.pd_series_ext import (SeriesType, _get_series_array_type,
-                                         arr_to_series_type)
+                                         arr_to_series_type, if_series_to_array_type)
 from hpat.str_ext import string_type
 from hpat.hiframes.pd_dataframe_ext import DataFrameType
 from hpat.hiframes.aggregate import get_agg_func
@@ -151,13 +151,45 @@ class DataframeGroupByAttribute(AttributeTemplate):
             out_res = arr_to_series_type(out_data[0])
         return signature(out_res, *args)
 
+    def _get_multi_agg_typ(self, grp, args):
+        # (output column, input column, function) triples, see
+        # _handle_agg_dict() in hiframes_untyped
+        consts = args[0].consts
+        out_data = []
+        out_columns = []
+        if not grp.as_index:
+            for k in grp.keys:
+                out_columns.append(k)
+                ind = grp.df_type.columns.index(k)
+                out_data.append(grp.df_type.data[ind])
+
+        for i in range(0, len(consts), 3):
+            out_col, in_col, func_name = consts[i:i + 3]
+            if in_col not in grp.selection:
+                raise ValueError("column {} not selected in groupby".format(in_col))
+            func = get_agg_func(None, func_name, None)
+            f_ir = numba.ir_utils.get_ir_of_code(
+                {'np': np, 'numba': numba, 'hpat': hpat}, func.__code__)
+            data = grp.df_type.data[grp.df_type.columns.index(in_col)]
+            _, out_dtype, _ = numba.compiler.type_inference_stage(
+                self.context, f_ir, (data,), None)
+            out_columns.append(out_col)
+            out_data.append(_get_series_array_type(out_dtype))
+
+        out_res = DataFrameType(tuple(out_data), None, tuple(out_columns))
+        return signature(out_res, *args)
+
     @bound_function("groupby.agg")
     def resolve_agg(self, grp, args, kws):
+        if hasattr(args[0], 'consts'):
+            return self._get_multi_agg_typ(grp, args)
         code = args[0].literal_value.code
         return self._get_agg_typ(grp, args, code)
 
     @bound_function("groupby.aggregate")
     def resolve_aggregate(self, grp, args, kws):
+        if hasattr(args[0], 'consts'):
+            return self._get_multi_agg_typ(grp, args)
         code = args[0].literal_value.code
         return self._get_agg_typ(grp, args, code)
 
@@ -201,6 +233,16 @@ class DataframeGroupByAttribute(AttributeTemplate):
         func = get_agg_func(None, 'std', None)
         return self._get_agg_typ(grp, args, func.__code__)
 
+    @bound_function("groupby.nunique")
+    def resolve_nunique(self, grp, args, kws):
+        func = get_agg_func(None, 'nunique', None)
+        return self._get_agg_typ(grp, args, func.__code__)
+
+    @bound_function("groupby.quantile")
+    def resolve_quantile(self, grp, args, kws):
+        func = get_agg_func(None, 'quantile', None)
+        return self._get_agg_typ(grp, args, func.__code__)
+
 
 # a dummy pivot_table function that will be replace in dataframe_pass
 def pivot_table_dummy(df, values, index, columns, aggfunc, _pivot_values):
@@ -223,6 +265,14 @@ class PivotTyper(AbstractTemplate):
         index = index.literal_value
         columns = columns.literal_value
 
+        # without pivot values annotation, output is a tuple of values matrix,
+        # row labels and column labels discovered at runtime
+        if _pivot_values == types.none:
+            out_typ = types.Tuple((types.Array(types.float64, 2, 'C'),
+                                   df.data[df.columns.index(index)],
+                                   df.data[df.columns.index(columns)]))
+            return signature(out_typ, *args)
+
         # get output data type
         data = df.data[df.columns.index(values)]
         func = get_agg_func(None, aggfunc.literal_value, None)
@@ -258,6 +308,12 @@ class CrossTabTyper(AbstractTemplate):
         index, columns, _pivot_values = args
 
         # TODO: support agg func other than frequency
+        if _pivot_values == types.none:
+            out_typ = types.Tuple((types.Array(types.int64, 2, 'C'),
+                                   if_series_to_array_type(index),
+                                   if_series_to_array_type(columns)))
+            return signature(out_typ, *args)
+
         out_arr_typ = types.Array(types.int64, 1, 'C')
 
         pivot_vals = _pivot_values.meta
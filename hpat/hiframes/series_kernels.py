@@ -305,9 +305,9 @@ def _column_describe_impl(S):  # pragma: no cover
     a_max = S.max()
     a_mean = S.mean()
     a_std = S.std()
-    q25 = S.quantile(.25)
-    q50 = S.quantile(.5)
-    q75 = S.quantile(.75)
+    # all quantiles are computed from one sketch
+    q25, q50, q75 = hpat.hiframes.api.quantiles_approx(
+        hpat.hiframes.api.get_series_data(S), (.25, .5, .75))
     # TODO: pandas returns dataframe, maybe return namedtuple instread of
     # string?
     # TODO: fix string formatting to match python/pandas
@@ -501,6 +501,7 @@ series_replace_funcs = {
     'var': _column_var_impl,
     'std': _column_std_impl,
     'nunique': lambda A: hpat.hiframes.api.nunique(A),
+    'nunique_approx': lambda A: hpat.hiframes.api.nunique_approx(A),
     'unique': lambda A: hpat.hiframes.api.unique(A),
     'describe': _column_describe_impl,
     'fillna_alloc': _column_fillna_alloc_impl,
@@ -2,21 +2,24 @@ import numpy as np
 import math
 from collections import defaultdict
 import numba
-from numba import typeinfer, ir, ir_utils, config, types
+from numba import typeinfer, ir, ir_utils, config, types, generated_jit
 from numba.ir_utils import (visit_vars_inner, replace_vars_inner,
                             compile_to_numba_ir, replace_arg_nodes,
                             mk_unique_var)
 from numba.typing import signature
 from numba.extending import overload
+import llvmlite.binding as ll
 import hpat
+import hpat.config
 import hpat.timsort
-from hpat.timsort import getitem_arr_tup
+from hpat import hio
+from hpat.timsort import getitem_arr_tup, setitem_arr_tup
 from hpat.utils import _numba_to_c_type_map
 from hpat import distributed, distributed_analysis
 from hpat.distributed_api import Reduce_Type
 from hpat.distributed_analysis import Distribution
 from hpat.utils import (debug_prints, empty_like_type, get_ctypes_ptr,
-                        gen_getitem)
+                        gen_getitem, alloc_arr_tup)
 
 from hpat.shuffle_utils import (alltoallv, alltoallv_tup,
                                 finalize_shuffle_meta, update_shuffle_meta, alloc_pre_shuffle_metadata,
@@ -25,19 +28,33 @@ from hpat.shuffle_utils import (alltoallv, alltoallv_tup,
 from hpat.str_arr_ext import (string_array_type, to_string_list,
                               cp_str_list_to_array, str_list_to_array,
                               get_offset_ptr, get_data_ptr, convert_len_arr_to_offset,
-                              pre_alloc_string_array, num_total_chars)
+                              pre_alloc_string_array, num_total_chars,
+                              copy_str_arr_slice, getitem_str_offset,
+                              setitem_str_offset, getitem_str_data,
+                              copy_str_arr_chars, str_arr_is_na,
+                              str_arr_set_na, set_null_bits, str_arr_from_ptrs,
+                              get_null_bitmap_ptr)
 from hpat.str_ext import string_type
 
 
 MIN_SAMPLES = 1000000
 #MIN_SAMPLES = 100
 samplePointsPerPartitionHint = 20
+# maximum ratio of a rank's output size to the average output size in
+# parallel sort before runs of equal keys are split across ranks
+IMBALANCE_FACTOR = 1.2
+# print per-rank output counts of parallel sort (diagnostic)
+REPORT_COUNTS = False
+# algorithm of local sort: 'auto' uses radix sort for fixed-width keys and
+# argsort otherwise, 'argsort' or 'timsort' force a specific algorithm.
+# Number of threads of local sort is set by hpat.config.config_sort_num_threads
+LOCAL_SORT_MODE = 'auto'
 MPI_ROOT = 0
 
 
 class Sort(ir.Stmt):
     def __init__(self, df_in, df_out, key_arrs, out_key_arrs, df_in_vars,
-                 df_out_vars, inplace, loc, ascending=True):
+                 df_out_vars, inplace, loc, ascending=True, limit=None):
         # for printing only
         self.df_in = df_in
         self.df_out = df_out
@@ -51,6 +68,9 @@ class Sort(ir.Stmt):
         if not isinstance(ascending, bool):
             ascending = True
         self.ascending = ascending
+        # only the first 'limit' rows of sorted output are needed (e.g.
+        # sort_values().head(n), nlargest), output is replicated
+        self.limit = limit
         self.loc = loc
 
     def __repr__(self):  # pragma: no cover
@@ -62,9 +82,11 @@ class Sort(ir.Stmt):
         for (c, v) in self.df_out_vars.items():
             out_cols += "'{}':{}, ".format(c, v.name)
         df_out_str = "{}{{{}}}".format(self.df_out, out_cols)
-        return "sort: [key: {}] {} [key: {}] {}".format(
+        limit_str = "" if self.limit is None else " [limit: {}]".format(self.limit)
+        return "sort: [key: {}] {} [key: {}] {}{}".format(
             ", ".join(v.name for v in self.key_arrs), df_in_str,
-            ", ".join(v.name for v in self.out_key_arrs), df_out_str)
+            ", ".join(v.name for v in self.out_key_arrs), df_out_str,
+            limit_str)
 
 
 def sort_array_analysis(sort_node, equiv_set, typemap, array_analysis):
@@ -85,6 +107,9 @@ def sort_array_analysis(sort_node, equiv_set, typemap, array_analysis):
 
     # arrays of output have the same shape (not necessarily the same as input
     # arrays in the parallel case, TODO: fix)
+    # output of top-k sort is smaller than input in all cases
+    if sort_node.limit is not None:
+        all_shapes = []
     out_arrs = sort_node.out_key_arrs + list(sort_node.df_out_vars.values())
     for col_var in out_arrs:
         typ = typemap[col_var.name]
@@ -107,6 +132,19 @@ def sort_distributed_analysis(sort_node, array_dists):
 
     in_arrs = sort_node.key_arrs + list(sort_node.df_in_vars.values())
     out_arrs = sort_node.out_key_arrs + list(sort_node.df_out_vars.values())
+
+    # top-k output is small and replicated, input can stay distributed
+    if sort_node.limit is not None:
+        in_dist = Distribution.OneD
+        for col_var in in_arrs:
+            in_dist = Distribution(
+                min(in_dist.value, array_dists[col_var.name].value))
+        for col_var in in_arrs:
+            array_dists[col_var.name] = in_dist
+        for col_var in out_arrs:
+            array_dists[col_var.name] = Distribution.REP
+        return
+
     # input columns have same distribution
     in_dist = Distribution.OneD
     for col_var in in_arrs:
@@ -140,6 +178,21 @@ def sort_distributed_analysis(sort_node, array_dists):
 distributed_analysis.distributed_analysis_extensions[Sort] = sort_distributed_analysis
 
 
+def sort_partitioning_analysis(sort_node, array_dists, array_partitions):
+    out_arrs = sort_node.out_key_arrs + list(sort_node.df_out_vars.values())
+    # parallel sort output is range partitioned on sort keys
+    if sort_node.limit is not None or any(array_dists[v.name] not in (
+            Distribution.OneD, Distribution.OneD_Var) for v in out_arrs):
+        return
+    part = distributed_analysis.Partitioning(
+        'range', tuple(v.name for v in sort_node.out_key_arrs))
+    for v in out_arrs:
+        array_partitions[v.name] = part
+
+
+distributed_analysis.partitioning_analysis_extensions[Sort] = sort_partitioning_analysis
+
+
 def sort_typeinfer(sort_node, typeinferer):
     # input and output arrays have the same type
     for in_key, out_key in zip(sort_node.key_arrs, sort_node.out_key_arrs):
@@ -279,6 +332,10 @@ ir_utils.apply_copy_propagate_extensions[Sort] = apply_copies_sort
 
 def sort_distributed_run(sort_node, array_dists, typemap, calltypes, typingctx,
                          targetctx, dist_pass):
+    if sort_node.limit is not None:
+        return _topk_distributed_run(
+            sort_node, array_dists, typemap, calltypes, typingctx)
+
     parallel = True
     in_vars = list(sort_node.df_in_vars.values())
     out_vars = list(sort_node.df_out_vars.values())
@@ -353,10 +410,11 @@ def sort_distributed_run(sort_node, array_dists, typemap, calltypes, typingctx,
 
     # parallel case
     def par_sort_impl(key_arrs, data, ascending):
-        out_key, out_data = parallel_sort(key_arrs, data, ascending)
-        # TODO: use k-way merge instead of sort
-        # sort output
-        hpat.hiframes.sort.local_sort(out_key, out_data, ascending)
+        out_key, out_data, recv_counts = parallel_sort(key_arrs, data, ascending)
+        # input is sorted locally before the shuffle so data received from
+        # every rank is a sorted run, merge the runs instead of sorting again
+        out_key, out_data = hpat.hiframes.sort.kway_merge(
+            out_key, out_data, recv_counts, ascending)
         return out_key, out_data
 
     f_block = compile_to_numba_ir(par_sort_impl,
@@ -393,6 +451,62 @@ def sort_distributed_run(sort_node, array_dists, typemap, calltypes, typingctx,
 distributed.distributed_run_extensions[Sort] = sort_distributed_run
 
 
+def _topk_distributed_run(sort_node, array_dists, typemap, calltypes,
+                          typingctx):
+    # input is not modified since top-k rows are gathered into new arrays
+    in_vars = list(sort_node.df_in_vars.values())
+    out_vars = list(sort_node.df_out_vars.values())
+    key_arrs = sort_node.key_arrs
+    parallel = all(array_dists[v.name] in (distributed.Distribution.OneD,
+                                           distributed.Distribution.OneD_Var)
+                   for v in key_arrs + in_vars)
+
+    loc = sort_node.loc
+    scope = key_arrs[0].scope
+    nodes = []
+
+    key_name_args = ', '.join("key" + str(i) for i in range(len(key_arrs)))
+    col_name_args = ', '.join(["c" + str(i) for i in range(len(in_vars))])
+    func_text = "def f({}, {}):\n".format(key_name_args, col_name_args)
+    func_text += "  key_arrs = ({},)\n".format(key_name_args)
+    func_text += "  data = ({}{})\n".format(col_name_args, "," if len(in_vars) == 1 else "")
+    func_text += "  return hpat.hiframes.sort.{}(key_arrs, data, {}, {})\n".format(
+        'parallel_topk' if parallel else 'local_topk', sort_node.limit,
+        sort_node.ascending)
+
+    loc_vars = {}
+    exec(func_text, {}, loc_vars)
+    topk_impl = loc_vars['f']
+
+    key_typ = types.Tuple([typemap[v.name] for v in key_arrs])
+    data_tup_typ = types.Tuple([typemap[v.name] for v in in_vars])
+
+    f_block = compile_to_numba_ir(topk_impl,
+                                  {'hpat': hpat},
+                                  typingctx,
+                                  tuple(list(key_typ.types) + list(data_tup_typ.types)),
+                                  typemap, calltypes).blocks.popitem()[1]
+    replace_arg_nodes(f_block, key_arrs + in_vars)
+    nodes += f_block.body[:-2]
+    ret_var = nodes[-1].target
+    # output types can be different from input (e.g. layout of numeric
+    # arrays after gather), use types of the returned tuple
+    out_key_typ, out_data_typ = typemap[ret_var.name].types
+    key_tup = ir.Var(scope, mk_unique_var('topk_keys'), loc)
+    typemap[key_tup.name] = out_key_typ
+    gen_getitem(key_tup, ret_var, 0, calltypes, nodes)
+    data_tup = ir.Var(scope, mk_unique_var('topk_data'), loc)
+    typemap[data_tup.name] = out_data_typ
+    gen_getitem(data_tup, ret_var, 1, calltypes, nodes)
+
+    for i, var in enumerate(sort_node.out_key_arrs):
+        gen_getitem(var, key_tup, i, calltypes, nodes)
+    for i, var in enumerate(out_vars):
+        gen_getitem(var, data_tup, i, calltypes, nodes)
+
+    return nodes
+
+
 def _copy_array_nodes(var, nodes, typingctx, typemap, calltypes):
     def _impl(arr):
         return arr.copy()
@@ -418,8 +532,47 @@ def to_string_list_typ(typ):
 
 
 # TODO: fix cache issue
-@numba.njit(no_cpython_wrapper=True, cache=False)
+@generated_jit(nopython=True, no_cpython_wrapper=True, cache=False)
 def local_sort(key_arrs, data, ascending=True):
+    budget = hpat.config.config_sort_memory_budget
+    if budget <= 0:
+        def impl(key_arrs, data, ascending=True):
+            local_sort_in_memory(key_arrs, data, ascending)
+        return impl
+
+    dir_arr = _get_scratch_dir_arr()
+
+    def spill_impl(key_arrs, data, ascending=True):
+        n = len(key_arrs[0])
+        n_bytes = arr_tup_nbytes(key_arrs) + arr_tup_nbytes(data)
+        if n_bytes * SORT_MEMORY_FACTOR > budget:
+            row_bytes = SORT_MEMORY_FACTOR * n_bytes // max(n, 1)
+            run_size = max(budget // max(row_bytes, 1), 1)
+            external_sort(key_arrs, data, ascending, run_size, dir_arr)
+        else:
+            local_sort_in_memory(key_arrs, data, ascending)
+
+    return spill_impl
+
+
+# TODO: fix cache issue
+@generated_jit(nopython=True, no_cpython_wrapper=True, cache=False)
+def local_sort_in_memory(key_arrs, data, ascending=True):
+    if LOCAL_SORT_MODE == 'timsort':
+        return _local_timsort
+    n_threads = min(hpat.config.config_sort_num_threads,
+                    config.NUMBA_NUM_THREADS)
+    if n_threads > 1:
+        def par_impl(key_arrs, data, ascending=True):
+            _local_parallel_sort(key_arrs, data, ascending, n_threads)
+        return par_impl
+    if (LOCAL_SORT_MODE == 'auto'
+            and all(_is_radix_sort_typ(t) for t in key_arrs.types)):
+        return _local_radix_sort
+    return _local_argsort
+
+
+def _local_timsort(key_arrs, data, ascending=True):  # pragma: no cover
     # convert StringArray to list(string) to enable swapping in sort
     l_key_arrs = to_string_list(key_arrs)
     l_data = to_string_list(data)
@@ -431,11 +584,765 @@ def local_sort(key_arrs, data, ascending=True):
     cp_str_list_to_array(data, l_data)
 
 
+# ***************** external sort *************
+# If data is larger than the memory budget of sort
+# (hpat.config.config_sort_memory_budget), sorted runs are spilled to
+# memory-mapped files in hpat.config.config_sort_scratch_dir and merged back
+# into input arrays. Spilled pages can be evicted by the OS, so only input
+# arrays and one run need to stay in memory. Input arrays themselves are not
+# spilled, and in parallel sort the received data of alltoallv (which becomes
+# the local input) is fully in memory as well, so the budget only bounds the
+# working memory of local sort.
+
+# estimated working memory of in-memory sort relative to input size
+SORT_MEMORY_FACTOR = 3
+
+ll.add_symbol('spill_file_map', hio.spill_file_map)
+ll.add_symbol('spill_file_unmap', hio.spill_file_unmap)
+_spill_file_map = types.ExternalFunction(
+    "spill_file_map", types.voidptr(types.voidptr, types.int64))
+_spill_file_unmap = types.ExternalFunction(
+    "spill_file_unmap", types.void(types.voidptr))
+
+
+def _get_scratch_dir_arr():
+    # null-terminated directory name to pass to C
+    dir_name = hpat.config.config_sort_scratch_dir.encode() + b'\0'
+    return np.array(bytearray(dir_name), np.uint8)
+
+
+@numba.njit(no_cpython_wrapper=True)
+def external_sort(key_arrs, data, ascending, run_size, dir_arr):  # pragma: no cover
+    n = len(key_arrs[0])
+    n_runs = max(-(-n // run_size), 1)
+    counts = np.empty(n_runs, np.int64)
+    spill_keys = alloc_spill_arr_tup(key_arrs, dir_arr)
+    spill_data = alloc_spill_arr_tup(data, dir_arr)
+
+    # sort runs and write them to spill files
+    for r in range(n_runs):
+        lo = min(r * run_size, n)
+        hi = min(lo + run_size, n)
+        counts[r] = hi - lo
+        run_keys = copy_arr_tup_range(key_arrs, lo, hi)
+        run_data = copy_arr_tup_range(data, lo, hi)
+        local_sort_in_memory(run_keys, run_data, ascending)
+        set_arr_tup_range(spill_keys, lo, run_keys)
+        set_arr_tup_range(spill_data, lo, run_data)
+
+    # merge runs back into input arrays
+    kway_merge_into(key_arrs, data, spill_keys, spill_data, counts, ascending)
+    free_spill_arr_tup(spill_keys)
+    free_spill_arr_tup(spill_data)
+
+
+def arr_tup_nbytes(arrs):  # pragma: no cover
+    return 0
+
+
+@overload(arr_tup_nbytes)
+def arr_tup_nbytes_overload(arrs):
+    func_text = "def f(arrs):\n"
+    func_text += "  n_bytes = 0\n"
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  n = len(arrs[{}])\n".format(i)
+            func_text += "  n_bytes += 4 * (n + 1) + (n + 7) // 8\n"
+            func_text += "  n_bytes += num_total_chars(arrs[{}])\n".format(i)
+        else:
+            func_text += "  n_bytes += arrs[{}].nbytes\n".format(i)
+    func_text += "  return n_bytes\n"
+
+    loc_vars = {}
+    exec(func_text, {'num_total_chars': num_total_chars}, loc_vars)
+    nbytes_impl = loc_vars['f']
+    return nbytes_impl
+
+
+def alloc_spill_arr_tup(arrs, dir_arr):  # pragma: no cover
+    return arrs
+
+
+@overload(alloc_spill_arr_tup)
+def alloc_spill_arr_tup_overload(arrs, dir_arr):
+    """allocate arrays with the same size as 'arrs' on memory-mapped files
+    """
+    count = arrs.count
+    glbs = {'np': np, 'numba': numba, '_spill_file_map': _spill_file_map,
+            'num_total_chars': num_total_chars, 'set_null_bits': set_null_bits,
+            'str_arr_from_ptrs': str_arr_from_ptrs}
+    func_text = "def f(arrs, dir_arr):\n"
+    for i, typ in enumerate(arrs.types):
+        func_text += "  n = len(arrs[{}])\n".format(i)
+        if typ == string_array_type:
+            func_text += "  n_chars = np.int64(num_total_chars(arrs[{}]))\n".format(i)
+            func_text += "  offsets = _spill_file_map(dir_arr.ctypes, 4 * (n + 1))\n"
+            func_text += "  chars = _spill_file_map(dir_arr.ctypes, n_chars)\n"
+            func_text += "  nulls = _spill_file_map(dir_arr.ctypes, (n + 7) // 8)\n"
+            func_text += "  out_{} = str_arr_from_ptrs(n, n_chars, offsets, chars, nulls)\n".format(i)
+            func_text += "  set_null_bits(out_{})\n".format(i)
+        else:
+            dtype = numba.numpy_support.as_dtype(typ.dtype)
+            glbs['dtype_{}'.format(i)] = dtype
+            func_text += "  ptr = _spill_file_map(dir_arr.ctypes, n * {})\n".format(dtype.itemsize)
+            func_text += "  out_{0} = numba.carray(ptr, n, dtype_{0})\n".format(i)
+    func_text += "  return ({}{})\n".format(
+        ','.join(["out_{}".format(i) for i in range(count)]),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, glbs, loc_vars)
+    alloc_impl = loc_vars['f']
+    return alloc_impl
+
+
+def spill_arr_tup(arrs, dir_arr):  # pragma: no cover
+    return arrs
+
+
+@overload(spill_arr_tup)
+def spill_arr_tup_overload(arrs, dir_arr):
+    func_text = "def f(arrs, dir_arr):\n"
+    func_text += "  out_arrs = alloc_spill_arr_tup(arrs, dir_arr)\n"
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  copy_str_arr_slice(out_arrs[{0}], arrs[{0}], len(arrs[{0}]))\n".format(i)
+        else:
+            func_text += "  out_arrs[{0}][:] = arrs[{0}]\n".format(i)
+    func_text += "  return out_arrs\n"
+
+    loc_vars = {}
+    exec(func_text, {'alloc_spill_arr_tup': alloc_spill_arr_tup,
+                     'copy_str_arr_slice': copy_str_arr_slice}, loc_vars)
+    spill_impl = loc_vars['f']
+    return spill_impl
+
+
+def free_spill_arr_tup(arrs):  # pragma: no cover
+    return
+
+
+@overload(free_spill_arr_tup)
+def free_spill_arr_tup_overload(arrs):
+    func_text = "def f(arrs):\n"
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  _spill_file_unmap(get_ctypes_ptr(get_offset_ptr(arrs[{}])))\n".format(i)
+            func_text += "  _spill_file_unmap(get_ctypes_ptr(get_data_ptr(arrs[{}])))\n".format(i)
+            func_text += "  _spill_file_unmap(get_null_bitmap_ptr(arrs[{}]))\n".format(i)
+        else:
+            func_text += "  _spill_file_unmap(get_ctypes_ptr(arrs[{}].ctypes))\n".format(i)
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'_spill_file_unmap': _spill_file_unmap,
+                     'get_ctypes_ptr': get_ctypes_ptr,
+                     'get_offset_ptr': get_offset_ptr,
+                     'get_data_ptr': get_data_ptr,
+                     'get_null_bitmap_ptr': get_null_bitmap_ptr}, loc_vars)
+    free_impl = loc_vars['f']
+    return free_impl
+
+
+def copy_arr_tup_range(arrs, lo, hi):  # pragma: no cover
+    return arrs
+
+
+@overload(copy_arr_tup_range)
+def copy_arr_tup_range_overload(arrs, lo, hi):
+    count = arrs.count
+    copies = []
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            # slice of string array is a new array
+            copies.append("arrs[{}][lo:hi]".format(i))
+        else:
+            copies.append("arrs[{}][lo:hi].copy()".format(i))
+
+    func_text = "def f(arrs, lo, hi):\n"
+    func_text += "  return ({}{})\n".format(",".join(copies),
+                                            "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {}, loc_vars)
+    copy_impl = loc_vars['f']
+    return copy_impl
+
+
+def set_arr_tup_range(arrs, lo, vals):  # pragma: no cover
+    return
+
+
+@overload(set_arr_tup_range)
+def set_arr_tup_range_overload(arrs, lo, vals):
+    # string values are written sequentially, arrs[k][:lo] should be set
+    func_text = "def f(arrs, lo, vals):\n"
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  _set_str_arr_range(arrs[{0}], lo, vals[{0}])\n".format(i)
+        else:
+            func_text += "  arrs[{0}][lo:lo + len(vals[{0}])] = vals[{0}]\n".format(i)
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'_set_str_arr_range': _set_str_arr_range}, loc_vars)
+    set_impl = loc_vars['f']
+    return set_impl
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _set_str_arr_range(arr, lo, vals):  # pragma: no cover
+    n = len(vals)
+    n_chars = np.int64(num_total_chars(vals))
+    start = np.int64(getitem_str_offset(arr, lo))
+    for i in range(n):
+        setitem_str_offset(arr, lo + i, np.uint32(start + getitem_str_offset(vals, i)))
+        if str_arr_is_na(vals, i):
+            str_arr_set_na(arr, lo + i)
+    setitem_str_offset(arr, lo + n, np.uint32(start + n_chars))
+    copy_str_arr_chars(arr, start, vals, 0, n_chars)
+
+
+# ***************** radix sort *************
+# fixed-width keys are sorted with a stable LSD radix sort of a row
+# permutation, which is then used to gather key and data columns once.
+# Keys are converted to uint64 values with the same ordering, NaN/NaT values
+# are mapped to the maximum value to be placed last similar to Pandas.
+
+RADIX_BITS = 8
+RADIX_SIZE = 1 << RADIX_BITS
+
+
+def _is_radix_sort_typ(typ):
+    return (isinstance(typ, types.Array) and typ.ndim == 1
+            and isinstance(typ.dtype, (types.Integer, types.Float,
+                                       types.NPDatetime, types.Boolean)))
+
+
+def _local_radix_sort(key_arrs, data, ascending=True):  # pragma: no cover
+    n = len(key_arrs[0])
+    perm = np.arange(n)
+    perm = radix_sort_perm_tup(key_arrs, perm, ascending)
+    gather_arr_tup_inplace(key_arrs, perm)
+    gather_arr_tup_inplace(data, perm)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _radix_sort_perm(keys, perm, n_bits):  # pragma: no cover
+    """stable LSD radix sort of row permutation 'perm' using 'keys' values
+    (indexed by row)
+    """
+    n = len(perm)
+    mask = np.uint64(RADIX_SIZE - 1)
+    cur_keys = keys[perm]
+    cur_perm = perm.copy()
+    tmp_keys = np.empty(n, np.uint64)
+    tmp_perm = np.empty(n, np.int64)
+    counts = np.empty(RADIX_SIZE, np.int64)
+    for shift in range(0, n_bits, RADIX_BITS):
+        u_shift = np.uint64(shift)
+        counts[:] = 0
+        for i in range(n):
+            counts[np.int64((cur_keys[i] >> u_shift) & mask)] += 1
+        # all keys have the same digit, nothing to do
+        if counts.max() == n:
+            continue
+        # start position of each digit
+        curr = 0
+        for d in range(RADIX_SIZE):
+            c = counts[d]
+            counts[d] = curr
+            curr += c
+        for i in range(n):
+            d = np.int64((cur_keys[i] >> u_shift) & mask)
+            w_ind = counts[d]
+            tmp_keys[w_ind] = cur_keys[i]
+            tmp_perm[w_ind] = cur_perm[i]
+            counts[d] = w_ind + 1
+        cur_keys, tmp_keys = tmp_keys, cur_keys
+        cur_perm, tmp_perm = tmp_perm, cur_perm
+
+    return cur_perm
+
+
+def radix_sort_perm_tup(key_arrs, perm, ascending):  # pragma: no cover
+    return perm
+
+
+@overload(radix_sort_perm_tup)
+def radix_sort_perm_tup_overload(key_arrs, perm, ascending):
+    # LSD order, sort by last key first
+    func_text = "def f(key_arrs, perm, ascending):\n"
+    for i in reversed(range(key_arrs.count)):
+        n_bits = 8 * np.dtype(_get_radix_np_dtype(key_arrs.types[i])).itemsize
+        func_text += "  keys = get_radix_keys(key_arrs[{}], ascending)\n".format(i)
+        func_text += "  perm = _radix_sort_perm(keys, perm, {})\n".format(n_bits)
+    func_text += "  return perm\n"
+
+    loc_vars = {}
+    exec(func_text, {'get_radix_keys': get_radix_keys,
+                     '_radix_sort_perm': _radix_sort_perm}, loc_vars)
+    sort_impl = loc_vars['f']
+    return sort_impl
+
+
+def _get_radix_np_dtype(arr_typ):
+    if isinstance(arr_typ.dtype, types.NPDatetime):
+        return np.int64
+    if isinstance(arr_typ.dtype, types.Boolean):
+        return np.uint8
+    return numba.numpy_support.as_dtype(arr_typ.dtype)
+
+
+def get_radix_keys(arr, ascending):  # pragma: no cover
+    return arr
+
+
+@overload(get_radix_keys)
+def get_radix_keys_overload(arr, ascending):
+    dtype = arr.dtype
+    n_bits = 8 * np.dtype(_get_radix_np_dtype(arr)).itemsize
+    all_ones = np.uint64((1 << n_bits) - 1)
+    sign_bit = np.uint64(1 << (n_bits - 1))
+
+    if isinstance(dtype, types.Float):
+        uint_typ = np.uint64 if n_bits == 64 else np.uint32
+
+        def float_impl(arr, ascending):
+            n = len(arr)
+            bits = np.ascontiguousarray(arr).view(uint_typ)
+            keys = np.empty(n, np.uint64)
+            for i in range(n):
+                if np.isnan(arr[i]):
+                    keys[i] = all_ones
+                    continue
+                v = np.uint64(bits[i])
+                # negative values are flipped, positive values get sign bit
+                if v & sign_bit:
+                    v = (~v) & all_ones
+                else:
+                    v = v | sign_bit
+                if not ascending:
+                    # reserve maximum value for NaN
+                    v = all_ones - np.uint64(1) - v
+                keys[i] = v
+            return keys
+
+        return float_impl
+
+    if isinstance(dtype, types.NPDatetime):
+        nat = np.iinfo(np.int64).min
+
+        def dt64_impl(arr, ascending):
+            n = len(arr)
+            vals = np.ascontiguousarray(arr).view(np.int64)
+            keys = np.empty(n, np.uint64)
+            for i in range(n):
+                # NaT is last
+                if vals[i] == nat:
+                    keys[i] = all_ones
+                    continue
+                v = np.uint64(vals[i]) ^ sign_bit
+                if not ascending:
+                    v = all_ones - np.uint64(1) - v
+                keys[i] = v
+            return keys
+
+        return dt64_impl
+
+    is_signed = isinstance(dtype, types.Integer) and dtype.signed
+
+    def int_impl(arr, ascending):
+        n = len(arr)
+        keys = np.empty(n, np.uint64)
+        for i in range(n):
+            if is_signed:
+                v = (np.uint64(np.int64(arr[i])) ^ sign_bit) & all_ones
+            else:
+                v = np.uint64(arr[i])
+            if not ascending:
+                v = all_ones - v
+            keys[i] = v
+        return keys
+
+    return int_impl
+
+
+# ***************** argsort *************
+# keys of other types are sorted by a stable merge sort of a row permutation.
+# String keys are compared directly on data buffers of StringArray to avoid
+# creating string objects.
+
+ARGSORT_MIN_RUN = 32
+
+
+def _local_argsort(key_arrs, data, ascending=True):  # pragma: no cover
+    perm = argsort_tup(key_arrs, ascending)
+    gather_arr_tup_inplace(key_arrs, perm)
+    gather_arr_tup_inplace(data, perm)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def argsort_tup(key_arrs, ascending):  # pragma: no cover
+    n = len(key_arrs[0])
+    perm = np.arange(n)
+    tmp = np.empty(n, np.int64)
+    _argsort_range(key_arrs, perm, tmp, 0, n, ascending)
+    return perm
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _argsort_range(key_arrs, perm, tmp, lo, hi, ascending):  # pragma: no cover
+    """sort row ids of perm[lo:hi] in place, tmp[lo:hi] is used as buffer
+    """
+    # insertion sort of small runs
+    for r_lo in range(lo, hi, ARGSORT_MIN_RUN):
+        r_hi = min(r_lo + ARGSORT_MIN_RUN, hi)
+        for i in range(r_lo + 1, r_hi):
+            v = perm[i]
+            j = i - 1
+            while j >= r_lo and cmp_row_tup(key_arrs, v, perm[j], ascending) < 0:
+                perm[j + 1] = perm[j]
+                j -= 1
+            perm[j + 1] = v
+
+    # bottom-up merge of runs
+    src = perm
+    dst = tmp
+    in_tmp = False
+    width = ARGSORT_MIN_RUN
+    while width < hi - lo:
+        for m_lo in range(lo, hi, 2 * width):
+            mid = min(m_lo + width, hi)
+            m_hi = min(m_lo + 2 * width, hi)
+            _merge_perm(key_arrs, src, dst, m_lo, mid, mid, m_hi, m_lo, ascending)
+        src, dst = dst, src
+        in_tmp = not in_tmp
+        width *= 2
+
+    if in_tmp:
+        perm[lo:hi] = tmp[lo:hi]
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _merge_perm(key_arrs, perm, out, a_lo, a_hi, b_lo, b_hi, k, ascending):  # pragma: no cover
+    # merge sorted row ids of perm[a_lo:a_hi] and perm[b_lo:b_hi] into out[k:]
+    i = a_lo
+    j = b_lo
+    while i < a_hi and j < b_hi:
+        # take from right run only if strictly smaller to keep stability
+        if cmp_row_tup(key_arrs, perm[j], perm[i], ascending) < 0:
+            out[k] = perm[j]
+            j += 1
+        else:
+            out[k] = perm[i]
+            i += 1
+        k += 1
+    while i < a_hi:
+        out[k] = perm[i]
+        i += 1
+        k += 1
+    while j < b_hi:
+        out[k] = perm[j]
+        j += 1
+        k += 1
+
+
+# ***************** multi-threaded sort *************
+# rows are split into one chunk per thread, chunks are sorted in parallel and
+# merged in rounds. Every merge is split between threads using co-ranks
+# (merge path) so the last rounds are parallel as well.
+
+
+def _local_parallel_sort(key_arrs, data, ascending=True, n_threads=1):  # pragma: no cover
+    perm = parallel_argsort_tup(key_arrs, ascending, n_threads)
+    gather_arr_tup_inplace(key_arrs, perm)
+    gather_arr_tup_inplace(data, perm)
+
+
+@numba.njit(no_cpython_wrapper=True, parallel=True)
+def parallel_argsort_tup(key_arrs, ascending, n_threads):  # pragma: no cover
+    n = len(key_arrs[0])
+    perm = np.arange(n)
+    tmp = np.empty(n, np.int64)
+    n_chunks = max(min(n_threads, n), 1)
+    chunk_size = -(-n // n_chunks)
+
+    for c in numba.prange(n_chunks):
+        lo = min(c * chunk_size, n)
+        hi = min(lo + chunk_size, n)
+        sort_perm_range(key_arrs, perm, tmp, lo, hi, ascending)
+
+    width = chunk_size
+    while width < n:
+        n_merges = -(-n // (2 * width))
+        # split each merge into parts to keep all threads busy
+        n_parts = max(n_threads // n_merges, 1)
+        for t in numba.prange(n_merges * n_parts):
+            m = t // n_parts
+            part = t % n_parts
+            lo = m * 2 * width
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            part_size = -(-(hi - lo) // n_parts)
+            k_start = min(part * part_size, hi - lo)
+            k_end = min(k_start + part_size, hi - lo)
+            i_start = _merge_co_rank(key_arrs, perm, lo, mid, hi, k_start, ascending)
+            i_end = _merge_co_rank(key_arrs, perm, lo, mid, hi, k_end, ascending)
+            _merge_perm(key_arrs, perm, tmp, lo + i_start, lo + i_end,
+                        mid + k_start - i_start, mid + k_end - i_end,
+                        lo + k_start, ascending)
+        perm, tmp = tmp, perm
+        width *= 2
+
+    return perm
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _merge_co_rank(key_arrs, perm, lo, mid, hi, k, ascending):  # pragma: no cover
+    """number of elements of left run perm[lo:mid] among the first k outputs
+    of merging it with right run perm[mid:hi]
+    """
+    i_lo = max(0, k - (hi - mid))
+    i_hi = min(k, mid - lo)
+    while i_lo < i_hi:
+        i = (i_lo + i_hi) // 2
+        j = k - i
+        # right element is taken before left only if strictly smaller
+        if cmp_row_tup(key_arrs, perm[mid + j - 1], perm[lo + i], ascending) < 0:
+            i_hi = i
+        else:
+            i_lo = i + 1
+    return i_lo
+
+
+def sort_perm_range(key_arrs, perm, tmp, lo, hi, ascending):  # pragma: no cover
+    return
+
+
+@overload(sort_perm_range)
+def sort_perm_range_overload(key_arrs, perm, tmp, lo, hi, ascending):
+    # perm[lo:hi] is assumed to be lo..hi-1 initially
+    if (LOCAL_SORT_MODE == 'auto'
+            and all(_is_radix_sort_typ(t) for t in key_arrs.types)):
+        func_text = "def f(key_arrs, perm, tmp, lo, hi, ascending):\n"
+        func_text += "  chunk_perm = np.arange(hi - lo)\n"
+        for i in reversed(range(key_arrs.count)):
+            n_bits = 8 * np.dtype(_get_radix_np_dtype(key_arrs.types[i])).itemsize
+            func_text += "  keys = get_radix_keys(key_arrs[{}][lo:hi], ascending)\n".format(i)
+            func_text += "  chunk_perm = _radix_sort_perm(keys, chunk_perm, {})\n".format(n_bits)
+        func_text += "  perm[lo:hi] = chunk_perm + lo\n"
+
+        loc_vars = {}
+        exec(func_text, {'np': np, 'get_radix_keys': get_radix_keys,
+                         '_radix_sort_perm': _radix_sort_perm}, loc_vars)
+        sort_impl = loc_vars['f']
+        return sort_impl
+
+    def argsort_impl(key_arrs, perm, tmp, lo, hi, ascending):
+        _argsort_range(key_arrs, perm, tmp, lo, hi, ascending)
+
+    return argsort_impl
+
+
+def cmp_row_tup(key_arrs, a, b, ascending):  # pragma: no cover
+    return 0
+
+
+@overload(cmp_row_tup)
+def cmp_row_tup_overload(key_arrs, a, b, ascending):
+    def cmp_impl(key_arrs, a, b, ascending):
+        return cmp_rows_tup(key_arrs, a, key_arrs, b, ascending)
+    return cmp_impl
+
+
+def cmp_rows_tup(arrs1, a, arrs2, b, ascending):  # pragma: no cover
+    return 0
+
+
+@overload(cmp_rows_tup)
+def cmp_rows_tup_overload(arrs1, a, arrs2, b, ascending):
+    """compare row 'a' of arrs1 and row 'b' of arrs2 in sort order"""
+    func_text = "def f(arrs1, a, arrs2, b, ascending):\n"
+    for i in range(arrs1.count):
+        func_text += "  c = cmp_arr_item(arrs1[{0}], a, arrs2[{0}], b, ascending)\n".format(i)
+        func_text += "  if c != 0:\n"
+        func_text += "    return c\n"
+    func_text += "  return 0\n"
+
+    loc_vars = {}
+    exec(func_text, {'cmp_arr_item': cmp_arr_item}, loc_vars)
+    cmp_impl = loc_vars['f']
+    return cmp_impl
+
+
+def cmp_arr_item(arr1, a, arr2, b, ascending):  # pragma: no cover
+    return 0
+
+
+@overload(cmp_arr_item)
+def cmp_arr_item_overload(arr1, a, arr2, b, ascending):
+    """compare arr1[a] and arr2[b], return negative if arr1[a] is placed first
+    in output. NA values are placed last.
+    """
+    if arr1 == string_array_type:
+        def str_cmp_impl(arr1, a, arr2, b, ascending):
+            a_na = str_arr_is_na(arr1, a)
+            b_na = str_arr_is_na(arr2, b)
+            if a_na or b_na:
+                return np.int64(a_na) - np.int64(b_na)
+            c = _cmp_str_arr_item(arr1, a, arr2, b)
+            return c if ascending else -c
+        return str_cmp_impl
+
+    # NaN and NaT values are last similar to radix sort keys
+    if isinstance(arr1, types.Array) and isinstance(
+            arr1.dtype, (types.Float, types.NPDatetime, types.NPTimedelta)):
+        def na_cmp_impl(arr1, a, arr2, b, ascending):
+            a_na = hpat.hiframes.api.isna(arr1, a)
+            b_na = hpat.hiframes.api.isna(arr2, b)
+            if a_na or b_na:
+                return np.int64(a_na) - np.int64(b_na)
+            c = 0
+            if arr1[a] < arr2[b]:
+                c = -1
+            elif arr1[a] > arr2[b]:
+                c = 1
+            return c if ascending else -c
+        return na_cmp_impl
+
+    def cmp_impl(arr1, a, arr2, b, ascending):
+        c = 0
+        if arr1[a] < arr2[b]:
+            c = -1
+        elif arr1[a] > arr2[b]:
+            c = 1
+        return c if ascending else -c
+
+    return cmp_impl
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _cmp_str_arr_item(arr1, a, arr2, b):  # pragma: no cover
+    # byte-wise comparison of UTF-8 data has the same order as code points
+    a_start = np.int64(getitem_str_offset(arr1, a))
+    a_len = np.int64(getitem_str_offset(arr1, a + 1)) - a_start
+    b_start = np.int64(getitem_str_offset(arr2, b))
+    b_len = np.int64(getitem_str_offset(arr2, b + 1)) - b_start
+    for k in range(min(a_len, b_len)):
+        c_a = getitem_str_data(arr1, a_start + k)
+        c_b = getitem_str_data(arr2, b_start + k)
+        if c_a < c_b:
+            return -1
+        if c_a > c_b:
+            return 1
+    if a_len < b_len:
+        return -1
+    if a_len > b_len:
+        return 1
+    return 0
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def gather_str_arr(arr, perm):  # pragma: no cover
+    """return arr[perm] for StringArray 'arr' with row indices 'perm' (subset
+    or repeated rows possible), copies characters directly into an exactly
+    sized output array
+    """
+    n = len(perm)
+    n_chars = 0
+    for i in range(n):
+        j = perm[i]
+        n_chars += np.int64(getitem_str_offset(arr, j + 1)) - np.int64(getitem_str_offset(arr, j))
+    out_arr = pre_alloc_string_array(n, n_chars)
+    curr = 0
+    for i in range(n):
+        j = perm[i]
+        start = np.int64(getitem_str_offset(arr, j))
+        n_chars = np.int64(getitem_str_offset(arr, j + 1)) - start
+        setitem_str_offset(out_arr, i, np.uint32(curr))
+        copy_str_arr_chars(out_arr, curr, arr, start, n_chars)
+        if str_arr_is_na(arr, j):
+            str_arr_set_na(out_arr, i)
+        curr += n_chars
+    setitem_str_offset(out_arr, n, np.uint32(curr))
+    return out_arr
+
+
+def gather_arr_tup_inplace(arr_tup, perm):  # pragma: no cover
+    for arr in arr_tup:
+        arr[:] = arr[perm]
+
+
+@overload(gather_arr_tup_inplace)
+def gather_arr_tup_inplace_overload(arr_tup, perm):
+    func_text = "def f(arr_tup, perm):\n"
+    func_text += "  n = len(perm)\n"
+    for i, typ in enumerate(arr_tup.types):
+        if typ == string_array_type:
+            # total number of characters doesn't change
+            func_text += "  copy_str_arr_slice(arr_tup[{0}], gather_str_arr(arr_tup[{0}], perm), n)\n".format(i)
+        else:
+            func_text += "  arr_tup[{0}][:] = arr_tup[{0}][perm]\n".format(i)
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'copy_str_arr_slice': copy_str_arr_slice,
+                     'gather_str_arr': gather_str_arr}, loc_vars)
+    gather_impl = loc_vars['f']
+    return gather_impl
+
+
 @numba.njit(no_cpython_wrapper=True, cache=True)
 def parallel_sort(key_arrs, data, ascending=True):
     n_local = len(key_arrs[0])
     n_total = hpat.distributed_api.dist_reduce(n_local, np.int32(Reduce_Type.Sum.value))
 
+    n_pes = hpat.distributed_api.get_size()
+    my_rank = hpat.distributed_api.get_rank()
+    bounds = get_sort_bounds(key_arrs, n_total, ascending)
+
+    # local data is sorted, find range of rows equal to each splitter
+    lo_inds = np.empty(n_pes - 1, np.int64)
+    hi_inds = np.empty(n_pes - 1, np.int64)
+    for j in range(n_pes - 1):
+        lo_inds[j] = _search_sorted_tup(key_arrs, bounds, j, n_local, ascending, False)
+        hi_inds[j] = _search_sorted_tup(key_arrs, bounds, j, n_local, ascending, True)
+
+    cuts = _get_split_cuts(lo_inds, hi_inds, n_total, n_pes)
+
+    # calc send/recv counts
+    pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, data, n_pes, True)
+    node_id = 0
+    for i in range(n_local):
+        while node_id < (n_pes - 1) and i >= cuts[node_id]:
+            node_id += 1
+        update_shuffle_meta(pre_shuffle_meta, node_id, i,
+                            getitem_arr_tup(key_arrs, i),
+                            getitem_arr_tup(data, i), True)
+
+    shuffle_meta = finalize_shuffle_meta(key_arrs, data, pre_shuffle_meta,
+                                         n_pes, True)
+
+    # shuffle
+    recvs = alltoallv_tup(key_arrs + data, shuffle_meta)
+    out_key = _get_keys_tup(recvs, key_arrs)
+    out_data = _get_data_tup(recvs, key_arrs)
+
+    if REPORT_COUNTS:
+        all_counts = hpat.distributed_api.gather_scalar(np.int64(len(out_key[0])))
+        if my_rank == MPI_ROOT:
+            print("parallel sort output counts:", all_counts)
+
+    return out_key, out_data, shuffle_meta.recv_counts
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def get_sort_bounds(key_arrs, n_total, ascending):  # pragma: no cover
+    """compute n_pes-1 splitters of distributed key arrays from a random
+    sample, rank i receives keys between splitters i-1 and i
+    """
+    n_local = len(key_arrs[0])
     n_pes = hpat.distributed_api.get_size()
     my_rank = hpat.distributed_api.get_rank()
 
@@ -445,45 +1352,434 @@ def parallel_sort(key_arrs, data, ascending=True):
     fraction = min(sampleSize / max(n_total, 1), 1.0)
     n_loc_samples = min(math.ceil(fraction * n_local), n_local)
     inds = np.random.randint(0, n_local, n_loc_samples)
-    samples = key_arrs[0][inds]
+    # sample all key columns to get splitters over the full composite key
+    samples = getitem_arr_tup(key_arrs, inds)
     # print(sampleSize, fraction, n_local, n_loc_samples, len(samples))
 
-    all_samples = hpat.distributed_api.gatherv(samples)
-    all_samples = to_string_list(all_samples)
-    bounds = empty_like_type(n_pes - 1, all_samples)
+    all_samples = gatherv_tup(samples)
+    bounds = alloc_arr_tup(n_pes - 1, key_arrs)
 
     if my_rank == MPI_ROOT:
-        all_samples.sort()
-        if not ascending:
-            all_samples = all_samples[::-1]
-        n_samples = len(all_samples)
+        hpat.hiframes.sort.local_sort(all_samples, (), ascending)
+        n_samples = len(all_samples[0])
         step = math.ceil(n_samples / n_pes)
+        bound_inds = np.empty(n_pes - 1, np.int64)
         for i in range(n_pes - 1):
-            bounds[i] = all_samples[min((i + 1) * step, n_samples - 1)]
+            bound_inds[i] = min((i + 1) * step, n_samples - 1)
+        bounds = getitem_arr_tup(all_samples, bound_inds)
         # print(bounds)
 
-    bounds = str_list_to_array(bounds)
-    bounds = hpat.distributed_api.prealloc_str_for_bcast(bounds)
-    hpat.distributed_api.bcast(bounds)
+    return bcast_tup(bounds)
 
-    # calc send/recv counts
-    pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, data, n_pes, True)
-    node_id = 0
-    for i in range(n_local):
-        val = key_arrs[0][i]
-        # TODO: refactor
-        if node_id < (n_pes - 1) and (ascending and val >= bounds[node_id]
-                                      or (not ascending) and val <= bounds[node_id]):
-            node_id += 1
-        update_shuffle_meta(pre_shuffle_meta, node_id, i, (val,),
-                            getitem_arr_tup(data, i), True)
 
-    shuffle_meta = finalize_shuffle_meta(key_arrs, data, pre_shuffle_meta,
-                                         n_pes, True)
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _search_sorted_tup(key_arrs, vals, j, n, ascending, right):  # pragma: no cover
+    """binary search for row 'j' of 'vals' in sorted key arrays. Returns first
+    index with key not before the value (left side), or first index with key
+    after the value (right side). Uses the same order as local_sort (NA last).
+    """
+    lo = 0
+    hi = n
+    while lo < hi:
+        mid = (lo + hi) // 2
+        c = cmp_rows_tup(key_arrs, mid, vals, j, ascending)
+        if c < 0 or (right and c == 0):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
 
-    # shuffle
-    recvs = alltoallv_tup(key_arrs + data, shuffle_meta)
-    out_key = _get_keys_tup(recvs, key_arrs)
-    out_data = _get_data_tup(recvs, key_arrs)
 
-    return out_key, out_data
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _get_split_cuts(lo_inds, hi_inds, n_total, n_pes):  # pragma: no cover
+    """compute local row index where data of each rank ends. Rows before a
+    splitter go to lower ranks, but runs of rows equal to the splitter can be
+    assigned to either side, or split between neighbouring ranks if keeping
+    the run together exceeds IMBALANCE_FACTOR.
+    """
+    n_bounds = n_pes - 1
+    n_eq = hi_inds - lo_inds
+    # global number of rows before each splitter and equal to it
+    all_lo = lo_inds.copy()
+    all_eq = n_eq.copy()
+    hpat.distributed_api.dist_reduce(all_lo, np.int32(Reduce_Type.Sum.value))
+    hpat.distributed_api.dist_reduce(all_eq, np.int32(Reduce_Type.Sum.value))
+
+    avg = n_total / n_pes
+    # allowed deviation of each cut, partition size is bounded by
+    # avg + 2 * slack
+    slack = max(IMBALANCE_FACTOR - 1.0, 0.0) * avg / 2
+    cuts = np.empty(n_bounds, np.int64)
+    last_cut = 0
+    for j in range(n_bounds):
+        target = np.int64(math.ceil((j + 1) * avg))
+        low = all_lo[j]
+        high = low + all_eq[j]
+        # try to keep equal keys on the same rank
+        cut = low
+        if high - target < target - low:
+            cut = high
+        if abs(cut - target) > slack:
+            cut = min(max(target, low), high)
+        cut = max(cut, last_cut)
+        last_cut = cut
+        # equal rows are assigned in rank order, find this rank's share
+        n_take = cut - low
+        local_take = 0
+        if n_take == all_eq[j]:
+            local_take = n_eq[j]
+        elif n_take > 0:
+            eq_start = hpat.distributed_api.dist_exscan(n_eq[j])
+            local_take = min(max(n_take - eq_start, 0), n_eq[j])
+        cuts[j] = lo_inds[j] + local_take
+
+    return cuts
+
+
+def gatherv_tup(arrs):  # pragma: no cover
+    return arrs
+
+
+@overload(gatherv_tup)
+def gatherv_tup_overload(arrs):
+    count = arrs.count
+    func_text = "def f(arrs):\n"
+    func_text += "  return ({}{})\n".format(
+        ','.join(["hpat.distributed_api.gatherv(arrs[{}])".format(i)
+                  for i in range(count)]),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'hpat': hpat}, loc_vars)
+    gatherv_impl = loc_vars['f']
+    return gatherv_impl
+
+
+def bcast_tup(arrs):  # pragma: no cover
+    return arrs
+
+
+@overload(bcast_tup)
+def bcast_tup_overload(arrs):
+    count = arrs.count
+    func_text = "def f(arrs):\n"
+    for i in range(count):
+        func_text += "  arr_{0} = hpat.distributed_api.prealloc_str_for_bcast(arrs[{0}])\n".format(i)
+        func_text += "  hpat.distributed_api.bcast(arr_{})\n".format(i)
+    func_text += "  return ({}{})\n".format(
+        ','.join(["arr_{}".format(i) for i in range(count)]),
+        "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'hpat': hpat}, loc_vars)
+    bcast_impl = loc_vars['f']
+    return bcast_impl
+
+
+# ***************** k-way merge *************
+# received data of parallel sort consists of n_pes sorted runs (one from each
+# rank, laid out according to recv displacements). A loser tree of the runs
+# is used to merge them in a single pass over keys and data.
+# tree[0] is the current winner (run index), tree[1:] keep the losers of
+# internal nodes. Leaf of run r is at position k + r.
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _run_before(key_arrs, heads, ends, a, b, ascending):  # pragma: no cover
+    """return True if head of run 'a' should be written before head of run
+    'b'. Exhausted runs are larger than everything, ties are broken by run
+    index to keep the merge stable.
+    """
+    if heads[a] >= ends[a]:
+        return False
+    if heads[b] >= ends[b]:
+        return True
+    # same order as local sort, NA values last
+    c = cmp_row_tup(key_arrs, heads[a], heads[b], ascending)
+    if c != 0:
+        return c < 0
+    return a < b
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _init_loser_tree(key_arrs, heads, ends, k, ascending):  # pragma: no cover
+    tree = np.zeros(k, np.int64)
+    winners = np.empty(2 * k, np.int64)
+    for r in range(k):
+        winners[k + r] = r
+    for node in range(k - 1, 0, -1):
+        a = winners[2 * node]
+        b = winners[2 * node + 1]
+        if _run_before(key_arrs, heads, ends, a, b, ascending):
+            winners[node] = a
+            tree[node] = b
+        else:
+            winners[node] = b
+            tree[node] = a
+    if k > 1:
+        tree[0] = winners[1]
+    return tree
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _replay_loser_tree(tree, key_arrs, heads, ends, k, ascending):  # pragma: no cover
+    # head of winner run has changed, replay the matches on its path to root
+    winner = tree[0]
+    node = (k + winner) // 2
+    while node > 0:
+        if _run_before(key_arrs, heads, ends, tree[node], winner, ascending):
+            loser = winner
+            winner = tree[node]
+            tree[node] = loser
+        node = node // 2
+    tree[0] = winner
+
+
+# TODO: fix cache issue
+@generated_jit(nopython=True, no_cpython_wrapper=True, cache=False)
+def kway_merge(key_arrs, data, counts, ascending=True):
+    budget = hpat.config.config_sort_memory_budget
+    if budget <= 0:
+        def impl(key_arrs, data, counts, ascending=True):
+            return _kway_merge_alloc(key_arrs, data, counts, ascending)
+        return impl
+
+    dir_arr = _get_scratch_dir_arr()
+
+    def spill_impl(key_arrs, data, counts, ascending=True):
+        if 2 * (arr_tup_nbytes(key_arrs) + arr_tup_nbytes(data)) > budget:
+            # merge output doubles memory, spill input runs and merge them
+            # back into input arrays instead
+            spill_keys = spill_arr_tup(key_arrs, dir_arr)
+            spill_data = spill_arr_tup(data, dir_arr)
+            kway_merge_into(key_arrs, data, spill_keys, spill_data, counts,
+                            ascending)
+            free_spill_arr_tup(spill_keys)
+            free_spill_arr_tup(spill_data)
+            return key_arrs, data
+        return _kway_merge_alloc(key_arrs, data, counts, ascending)
+
+    return spill_impl
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _kway_merge_alloc(key_arrs, data, counts, ascending):  # pragma: no cover
+    out_key_arrs = alloc_arr_tup_like(key_arrs)
+    out_data = alloc_arr_tup_like(data)
+    kway_merge_into(out_key_arrs, out_data, key_arrs, data, counts, ascending)
+    return out_key_arrs, out_data
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def kway_merge_into(out_key_arrs, out_data, key_arrs, data, counts, ascending):  # pragma: no cover
+    k = len(counts)
+    n = len(key_arrs[0])
+    heads = np.empty(k, np.int64)
+    ends = np.empty(k, np.int64)
+    curr = 0
+    for r in range(k):
+        heads[r] = curr
+        curr += counts[r]
+        ends[r] = curr
+
+    if k == 0:
+        return
+
+    reset_null_bits_tup(out_key_arrs)
+    reset_null_bits_tup(out_data)
+    tree = _init_loser_tree(key_arrs, heads, ends, k, ascending)
+    for i in range(n):
+        r = tree[0]
+        ind = heads[r]
+        copy_arr_item_tup(out_key_arrs, i, key_arrs, ind)
+        copy_arr_item_tup(out_data, i, data, ind)
+        heads[r] = ind + 1
+        _replay_loser_tree(tree, key_arrs, heads, ends, k, ascending)
+
+
+def copy_arr_item_tup(out_arrs, i, arrs, j):  # pragma: no cover
+    for out_arr, arr in zip(out_arrs, arrs):
+        out_arr[i] = arr[j]
+
+
+@overload(copy_arr_item_tup)
+def copy_arr_item_tup_overload(out_arrs, i, arrs, j):
+    # string items are written sequentially, out_arrs[k][:i] should be set
+    func_text = "def f(out_arrs, i, arrs, j):\n"
+    for k, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  _copy_str_arr_item(out_arrs[{0}], i, arrs[{0}], j)\n".format(k)
+        else:
+            func_text += "  out_arrs[{0}][i] = arrs[{0}][j]\n".format(k)
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'_copy_str_arr_item': _copy_str_arr_item}, loc_vars)
+    copy_impl = loc_vars['f']
+    return copy_impl
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _copy_str_arr_item(out_arr, i, arr, j):  # pragma: no cover
+    start = np.int64(getitem_str_offset(arr, j))
+    n_chars = np.int64(getitem_str_offset(arr, j + 1)) - start
+    out_start = np.int64(getitem_str_offset(out_arr, i))
+    copy_str_arr_chars(out_arr, out_start, arr, start, n_chars)
+    setitem_str_offset(out_arr, i + 1, np.uint32(out_start + n_chars))
+    if str_arr_is_na(arr, j):
+        str_arr_set_na(out_arr, i)
+
+
+def reset_null_bits_tup(arrs):  # pragma: no cover
+    return
+
+
+@overload(reset_null_bits_tup)
+def reset_null_bits_tup_overload(arrs):
+    func_text = "def f(arrs):\n"
+    for k, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  set_null_bits(arrs[{}])\n".format(k)
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'set_null_bits': set_null_bits}, loc_vars)
+    reset_impl = loc_vars['f']
+    return reset_impl
+
+
+# allocate arrays with the same size as input arrays, string arrays have the
+# same number of characters as well
+def alloc_arr_tup_like(arrs):  # pragma: no cover
+    return tuple(a.copy() for a in arrs)
+
+
+@overload(alloc_arr_tup_like)
+def alloc_arr_tup_like_overload(arrs):
+    count = arrs.count
+    allocs = []
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            allocs.append("pre_alloc_string_array(len(arrs[{0}]), "
+                          "np.int64(num_total_chars(arrs[{0}])))".format(i))
+        else:
+            allocs.append("empty_like_type(len(arrs[{0}]), arrs[{0}])".format(i))
+
+    func_text = "def f(arrs):\n"
+    func_text += "  return ({}{})\n".format(",".join(allocs),
+                                            "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'np': np, 'empty_like_type': empty_like_type,
+                     'pre_alloc_string_array': pre_alloc_string_array,
+                     'num_total_chars': num_total_chars}, loc_vars)
+    alloc_impl = loc_vars['f']
+    return alloc_impl
+
+
+# ***************** top-k *************
+# sort followed by head(k) (and nlargest/nsmallest) only needs the first k
+# rows of output. Each rank selects its top k rows with a heap of row ids
+# similar to hpat.hiframes.api.nlargest, the candidates are gathered on root
+# and the final rows are selected and broadcast (output is replicated).
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def parallel_topk(key_arrs, data, k, ascending):  # pragma: no cover
+    my_rank = hpat.distributed_api.get_rank()
+    local_keys, local_data = local_topk(key_arrs, data, k, ascending)
+    # candidates are gathered in rank order, which keeps ties stable
+    all_keys = gatherv_tup(local_keys)
+    all_data = gatherv_tup(local_data)
+    out_keys = alloc_arr_tup(0, local_keys)
+    out_data = alloc_arr_tup(0, local_data)
+    if my_rank == MPI_ROOT:
+        out_keys, out_data = local_topk(all_keys, all_data, k, ascending)
+    n_out = hpat.distributed_api.bcast_scalar(len(out_keys[0]))
+    if my_rank != MPI_ROOT:
+        out_keys = alloc_arr_tup(n_out, local_keys)
+        out_data = alloc_arr_tup(n_out, local_data)
+    out_keys = bcast_tup(out_keys)
+    out_data = bcast_tup(out_data)
+    return out_keys, out_data
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def local_topk(key_arrs, data, k, ascending):  # pragma: no cover
+    inds = topk_inds(key_arrs, k, ascending)
+    out_keys = gather_arr_tup(key_arrs, inds)
+    out_data = gather_arr_tup(data, inds)
+    hpat.hiframes.sort.local_sort(out_keys, out_data, ascending)
+    return out_keys, out_data
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def topk_inds(key_arrs, k, ascending):  # pragma: no cover
+    """return sorted indices of the first k rows in sort order, ties are
+    resolved in favor of earlier rows (same as a stable sort).
+    """
+    n = len(key_arrs[0])
+    k = max(min(k, n), 0)
+    # max-heap with the row placed last in output order at the root
+    heap = np.empty(k, np.int64)
+    if k == 0:
+        return heap
+    for i in range(k):
+        heap[i] = i
+    for i in range(k // 2 - 1, -1, -1):
+        _topk_sift_down(key_arrs, heap, i, k, ascending)
+
+    for i in range(k, n):
+        if _row_before(key_arrs, i, heap[0], ascending):
+            heap[0] = i
+            _topk_sift_down(key_arrs, heap, 0, k, ascending)
+
+    return np.sort(heap)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _row_before(key_arrs, a, b, ascending):  # pragma: no cover
+    c = cmp_row_tup(key_arrs, a, b, ascending)
+    return c < 0 or (c == 0 and a < b)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _topk_sift_down(key_arrs, heap, i, k, ascending):  # pragma: no cover
+    while True:
+        last = i
+        l = 2 * i + 1
+        r = l + 1
+        if l < k and _row_before(key_arrs, heap[last], heap[l], ascending):
+            last = l
+        if r < k and _row_before(key_arrs, heap[last], heap[r], ascending):
+            last = r
+        if last == i:
+            return
+        tmp = heap[i]
+        heap[i] = heap[last]
+        heap[last] = tmp
+        i = last
+
+
+def gather_arr_tup(arr_tup, inds):  # pragma: no cover
+    return tuple(arr[inds] for arr in arr_tup)
+
+
+@overload(gather_arr_tup)
+def gather_arr_tup_overload(arr_tup, inds):
+    count = arr_tup.count
+    gathers = []
+    for i, typ in enumerate(arr_tup.types):
+        if typ == string_array_type:
+            gathers.append("gather_str_arr(arr_tup[{}], inds)".format(i))
+        else:
+            gathers.append("arr_tup[{}][inds]".format(i))
+
+    func_text = "def f(arr_tup, inds):\n"
+    func_text += "  return ({}{})\n".format(",".join(gathers),
+                                            "," if count == 1 else "")
+
+    loc_vars = {}
+    exec(func_text, {'gather_str_arr': gather_str_arr}, loc_vars)
+    gather_impl = loc_vars['f']
+    return gather_impl
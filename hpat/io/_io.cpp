@@ -1,8 +1,17 @@
 #include <Python.h>
 #include <climits>
 #include <cstdio>
+#include <cstdlib>
 #include <iostream>
+#include <map>
+#include <mutex>
 #include <string>
+#include <vector>
+
+#ifndef _WIN32
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
 
 #include "_csv.h"
 
@@ -41,6 +50,72 @@ void file_write(char* file_name, void* buff, int64_t size)
     return;
 }
 
+// sizes of spill buffers, 0 size means buffer was allocated in memory
+static std::map<void*, int64_t> spill_buffers;
+// spill buffers can be created and freed from multiple threads
+static std::mutex spill_buffers_mutex;
+
+// create a temporary file of 'size' bytes in directory 'dir' and map it to
+// memory. The file is unlinked right away so it is removed when unmapped.
+// Falls back to memory allocation if file mapping is not possible.
+void* spill_file_map(char* dir, int64_t size)
+{
+    if (size < 1)
+    {
+        size = 1;
+    }
+#ifndef _WIN32
+    std::string path = std::string(dir) + "/hpat-spill-XXXXXX";
+    std::vector<char> path_buff(path.begin(), path.end());
+    path_buff.push_back('\0');
+    int fd = mkstemp(path_buff.data());
+    if (fd != -1)
+    {
+        unlink(path_buff.data());
+        void* ptr = MAP_FAILED;
+        if (ftruncate(fd, (off_t)size) == 0)
+        {
+            ptr = mmap(NULL, (size_t)size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        }
+        close(fd);
+        if (ptr != MAP_FAILED)
+        {
+            std::lock_guard<std::mutex> lock(spill_buffers_mutex);
+            spill_buffers[ptr] = size;
+            return ptr;
+        }
+    }
+    std::cerr << "spill file error in " << dir << ", using memory instead\n";
+#endif
+    void* ptr = malloc((size_t)size);
+    std::lock_guard<std::mutex> lock(spill_buffers_mutex);
+    spill_buffers[ptr] = 0;
+    return ptr;
+}
+
+void spill_file_unmap(void* ptr)
+{
+    int64_t size;
+    {
+        std::lock_guard<std::mutex> lock(spill_buffers_mutex);
+        std::map<void*, int64_t>::iterator it = spill_buffers.find(ptr);
+        if (it == spill_buffers.end())
+        {
+            return;
+        }
+        size = it->second;
+        spill_buffers.erase(it);
+    }
+#ifndef _WIN32
+    if (size != 0)
+    {
+        munmap(ptr, (size_t)size);
+        return;
+    }
+#endif
+    free(ptr);
+}
+
 PyMODINIT_FUNC PyInit_hio(void)
 {
     PyObject* m;
@@ -60,6 +135,9 @@ PyMODINIT_FUNC PyInit_hio(void)
     // numpy read
     PyObject_SetAttrString(m, "file_read", PyLong_FromVoidPtr((void*)(&file_read)));
     PyObject_SetAttrString(m, "file_write", PyLong_FromVoidPtr((void*)(&file_write)));
+    // spill files of external sort
+    PyObject_SetAttrString(m, "spill_file_map", PyLong_FromVoidPtr((void*)(&spill_file_map)));
+    PyObject_SetAttrString(m, "spill_file_unmap", PyLong_FromVoidPtr((void*)(&spill_file_unmap)));
 
     PyInit_csv(m);
 
@@ -1,6 +1,7 @@
 from collections import namedtuple
 import numpy as np
 
+import numba
 from numba import types
 from numba.extending import overload
 
@@ -10,7 +11,9 @@ from hpat.timsort import getitem_arr_tup
 from hpat.str_ext import string_type
 from hpat.str_arr_ext import (string_array_type, to_string_list,
                               get_offset_ptr, get_data_ptr, convert_len_arr_to_offset,
-                              pre_alloc_string_array, num_total_chars)
+                              pre_alloc_string_array, num_total_chars,
+                              get_data_ptr_ind, getitem_str_offset,
+                              setitem_str_offset, getitem_str_data, str_copy_ptr)
 
 
 # metadata required for shuffle
@@ -50,7 +53,7 @@ ShuffleMeta = namedtuple('ShuffleMeta',
 # before shuffle, 'send_counts' is needed as well as
 # 'send_counts_char' and 'send_arr_lens' for every string type
 def alloc_pre_shuffle_metadata(arr, data, n_pes, is_contig):
-    return PreShuffleMeta(np.zeros(n_pes, np.int32), ())
+    return PreShuffleMeta(np.zeros(n_pes, np.int64), ())
 
 
 @overload(alloc_pre_shuffle_metadata)
@@ -58,7 +61,7 @@ def alloc_pre_shuffle_metadata_overload(key_arrs, data, n_pes, is_contig):
 
     func_text = "def f(key_arrs, data, n_pes, is_contig):\n"
     # send_counts
-    func_text += "  send_counts = np.zeros(n_pes, np.int32)\n"
+    func_text += "  send_counts = np.zeros(n_pes, np.int64)\n"
 
     # send_counts_char, send_arr_lens for strings
     n_keys = len(key_arrs.types)
@@ -66,7 +69,7 @@ def alloc_pre_shuffle_metadata_overload(key_arrs, data, n_pes, is_contig):
     for i, typ in enumerate(key_arrs.types + data.types):
         if typ == string_array_type:
             func_text += ("  arr = key_arrs[{}]\n".format(i) if i < n_keys else "  arr = data[{}]\n".format(i - n_keys))
-            func_text += "  send_counts_char_{} = np.zeros(n_pes, np.int32)\n".format(n_str)
+            func_text += "  send_counts_char_{} = np.zeros(n_pes, np.int64)\n".format(n_str)
             func_text += "  send_arr_lens_{} = np.empty(1, np.uint32)\n".format(n_str)
             # needs allocation since written in update before finalize
             func_text += "  if is_contig:\n"
@@ -126,8 +129,8 @@ def finalize_shuffle_meta_overload(key_arrs, data, pre_shuffle_meta, n_pes, is_c
     func_text = "def f(key_arrs, data, pre_shuffle_meta, n_pes, is_contig, init_vals=()):\n"
     # common metas: send_counts, recv_counts, tmp_offset, n_out, n_send, send_disp, recv_disp
     func_text += "  send_counts = pre_shuffle_meta.send_counts\n"
-    func_text += "  recv_counts = np.empty(n_pes, np.int32)\n"
-    func_text += "  tmp_offset = np.zeros(n_pes, np.int32)\n"  # for non-contig
+    func_text += "  recv_counts = np.empty(n_pes, np.int64)\n"
+    func_text += "  tmp_offset = np.zeros(n_pes, np.int64)\n"  # for non-contig
     func_text += "  hpat.distributed_api.alltoall(send_counts, recv_counts, 1)\n"
     func_text += "  n_out = recv_counts.sum()\n"
     func_text += "  n_send = send_counts.sum()\n"
@@ -157,11 +160,12 @@ def finalize_shuffle_meta_overload(key_arrs, data, pre_shuffle_meta, n_pes, is_c
             func_text += "  send_buff_{} = None\n".format(i)
             # send/recv counts
             func_text += "  send_counts_char_{} = pre_shuffle_meta.send_counts_char_tup[{}]\n".format(n_str, n_str)
-            func_text += "  recv_counts_char_{} = np.empty(n_pes, np.int32)\n".format(n_str)
+            func_text += "  recv_counts_char_{} = np.empty(n_pes, np.int64)\n".format(n_str)
             func_text += ("  hpat.distributed_api.alltoall("
                           "send_counts_char_{}, recv_counts_char_{}, 1)\n").format(n_str, n_str)
             # alloc output
             func_text += "  n_all_chars = recv_counts_char_{}.sum()\n".format(n_str)
+            func_text += "  hpat.distributed_api.check_str_arr_chars(n_all_chars)\n"
             func_text += "  out_arr_{} = pre_alloc_string_array(n_out, n_all_chars)\n".format(i)
             # send/recv disp
             func_text += ("  send_disp_char_{} = hpat.hiframes.join."
@@ -170,7 +174,7 @@ def finalize_shuffle_meta_overload(key_arrs, data, pre_shuffle_meta, n_pes, is_c
                           "calc_disp(recv_counts_char_{})\n").format(n_str, n_str)
 
             # tmp_offset_char, send_arr_lens
-            func_text += "  tmp_offset_char_{} = np.zeros(n_pes, np.int32)\n".format(n_str)
+            func_text += "  tmp_offset_char_{} = np.zeros(n_pes, np.int64)\n".format(n_str)
             func_text += "  send_arr_lens_{} = pre_shuffle_meta.send_arr_lens_tup[{}]\n".format(n_str, n_str)
             # send char arr
             # TODO: arr refcount if arr is not stored somewhere?
@@ -250,22 +254,22 @@ def alltoallv_impl(arr, metadata):
     def a2av_str_impl(arr, metadata):
         # TODO: increate refcount?
         offset_ptr = get_offset_ptr(metadata.out_arr)
-        hpat.distributed_api.c_alltoallv(
+        hpat.distributed_api.alltoallv_buff(
             metadata.send_arr_lens.ctypes,
             offset_ptr,
-            metadata.send_counts.ctypes,
-            metadata.recv_counts.ctypes,
-            metadata.send_disp.ctypes,
-            metadata.recv_disp.ctypes,
+            metadata.send_counts,
+            metadata.recv_counts,
+            metadata.send_disp,
+            metadata.recv_disp,
             int32_typ_enum)
-        hpat.distributed_api.c_alltoallv(
+        hpat.distributed_api.alltoallv_buff(
             metadata.send_arr_chars,
             get_data_ptr(
                 metadata.out_arr),
-            metadata.send_counts_char.ctypes,
-            metadata.recv_counts_char.ctypes,
-            metadata.send_disp_char.ctypes,
-            metadata.recv_disp_char.ctypes,
+            metadata.send_counts_char,
+            metadata.recv_counts_char,
+            metadata.send_disp_char,
+            metadata.recv_disp_char,
             char_typ_enum)
         convert_len_arr_to_offset(offset_ptr, metadata.n_out)
     return a2av_str_impl
@@ -288,15 +292,15 @@ def alltoallv_tup_overload(arrs, meta):
             assert typ == string_array_type
             func_text += "  offset_ptr_{} = get_offset_ptr(meta.out_arr_tup[{}])\n".format(i, i)
 
-            func_text += ("  hpat.distributed_api.c_alltoallv("
-                          "meta.send_arr_lens_tup[{}].ctypes, offset_ptr_{}, meta.send_counts.ctypes, "
-                          "meta.recv_counts.ctypes, meta.send_disp.ctypes, "
-                          "meta.recv_disp.ctypes, int32_typ_enum)\n").format(n_str, i)
+            func_text += ("  hpat.distributed_api.alltoallv_buff("
+                          "meta.send_arr_lens_tup[{}].ctypes, offset_ptr_{}, meta.send_counts, "
+                          "meta.recv_counts, meta.send_disp, "
+                          "meta.recv_disp, int32_typ_enum)\n").format(n_str, i)
 
-            func_text += ("  hpat.distributed_api.c_alltoallv("
+            func_text += ("  hpat.distributed_api.alltoallv_buff("
                           "meta.send_arr_chars_tup[{}], get_data_ptr(meta.out_arr_tup[{}]),"
-                          "meta.send_counts_char_tup[{}].ctypes, meta.recv_counts_char_tup[{}].ctypes,"
-                          "meta.send_disp_char_tup[{}].ctypes, meta.recv_disp_char_tup[{}].ctypes,"
+                          "meta.send_counts_char_tup[{}], meta.recv_counts_char_tup[{}],"
+                          "meta.send_disp_char_tup[{}], meta.recv_disp_char_tup[{}],"
                           "char_typ_enum)\n").format(n_str, i, n_str, n_str, n_str, n_str)
 
             func_text += "  convert_len_arr_to_offset(offset_ptr_{}, meta.n_out)\n".format(i)
@@ -317,6 +321,384 @@ def alltoallv_tup_overload(arrs, meta):
     return a2a_impl
 
 
+# shuffle based on destination ranks: keys are hashed once into an int32
+# array of destination ranks, which is used for computing the send counts
+# (histogram pass) and for writing all columns to send buffers (scatter pass)
+
+
+@numba.njit(no_cpython_wrapper=True)
+def shuffle_with_dest(key_arrs, data, dest, n_pes):  # pragma: no cover
+    budget = hpat.distributed_api.get_shuffle_memory_budget()
+    if budget > 0:
+        recvs = shuffle_rounds(key_arrs + data, dest, n_pes, budget)
+        return _get_keys_tup(recvs, key_arrs), _get_data_tup(recvs, key_arrs)
+    pre_shuffle_meta = alloc_pre_shuffle_metadata(key_arrs, data, n_pes, False)
+    update_shuffle_meta_dest(pre_shuffle_meta, key_arrs + data, dest)
+    shuffle_meta = finalize_shuffle_meta(key_arrs, data, pre_shuffle_meta, n_pes, False)
+    write_send_buffs_dest(shuffle_meta, key_arrs + data, dest)
+    recvs = alltoallv_tup(key_arrs + data, shuffle_meta)
+    out_keys = _get_keys_tup(recvs, key_arrs)
+    out_data = _get_data_tup(recvs, key_arrs)
+    return out_keys, out_data
+
+
+# memory-bounded shuffle: instead of allocating send and receive buffers for
+# all data, rows are exchanged in rounds with at most 'c' rows sent to each
+# rank per round, where 'c' is chosen such that buffers of two rounds fit in
+# the budget. Packing of round k+1 overlaps with non-blocking transfer of
+# round k, and buffers are freed after each round. The budget only bounds
+# send/receive buffers: output arrays (all received rows) and the row
+# permutation of input (8 bytes per row) are allocated up front.
+
+
+def shuffle_rounds(arrs, dest, n_pes, budget):  # pragma: no cover
+    return arrs
+
+
+@overload(shuffle_rounds)
+def shuffle_rounds_overload(arrs, dest, n_pes, budget):
+    n_all = arrs.count
+    str_inds = [i for i, t in enumerate(arrs.types) if t == string_array_type]
+
+    func_text = "def f(arrs, dest, n_pes, budget):\n"
+    func_text += "  n = len(dest)\n"
+    func_text += "  send_counts = np.zeros(n_pes, np.int64)\n"
+    func_text += "  for i in range(n):\n"
+    func_text += "    send_counts[dest[i]] += 1\n"
+    func_text += "  recv_counts = np.empty(n_pes, np.int64)\n"
+    func_text += "  hpat.distributed_api.alltoall(send_counts, recv_counts, 1)\n"
+    func_text += "  send_disp = hpat.hiframes.join.calc_disp(send_counts)\n"
+    func_text += "  recv_disp = hpat.hiframes.join.calc_disp(recv_counts)\n"
+    func_text += "  n_out = recv_counts.sum()\n"
+    # rows sorted by destination (stable)
+    func_text += "  perm = np.empty(n, np.int64)\n"
+    func_text += "  tmp_offset = send_disp.copy()\n"
+    func_text += "  for i in range(n):\n"
+    func_text += "    node_id = dest[i]\n"
+    func_text += "    perm[tmp_offset[node_id]] = i\n"
+    func_text += "    tmp_offset[node_id] += 1\n"
+    # rows per rank in each round, needs to be the same on all ranks
+    func_text += "  row_bytes = max(hpat.hiframes.sort.arr_tup_nbytes(arrs) // max(n, 1), 1)\n"
+    func_text += "  row_bytes = hpat.distributed_api.dist_reduce(row_bytes, max_op)\n"
+    func_text += "  c = max(budget // (4 * row_bytes * n_pes), 1)\n"
+    func_text += "  n_rounds = (max(send_counts.max(), recv_counts.max()) + c - 1) // c\n"
+    func_text += "  n_rounds = hpat.distributed_api.dist_reduce(n_rounds, max_op)\n"
+
+    for i, typ in enumerate(arrs.types):
+        func_text += "  arr_{} = arrs[{}]\n".format(i, i)
+        if i in str_inds:
+            func_text += "  send_counts_char_{} = np.zeros(n_pes, np.int64)\n".format(i)
+            func_text += "  for i in range(n):\n"
+            func_text += "    send_counts_char_{}[dest[i]] += _str_len(arr_{}, i)\n".format(i, i)
+            func_text += "  recv_counts_char_{} = np.empty(n_pes, np.int64)\n".format(i)
+            func_text += "  hpat.distributed_api.alltoall(send_counts_char_{0}, recv_counts_char_{0}, 1)\n".format(i)
+            func_text += "  hpat.distributed_api.check_str_arr_chars(recv_counts_char_{}.sum())\n".format(i)
+            func_text += "  out_{0} = pre_alloc_string_array(n_out, recv_counts_char_{0}.sum())\n".format(i)
+            # next output character position of data from every rank
+            func_text += "  recv_pos_char_{0} = hpat.hiframes.join.calc_disp(recv_counts_char_{0})\n".format(i)
+        else:
+            func_text += "  out_{0} = fix_cat_array_type(np.empty(n_out, arr_{0}.dtype))\n".format(i)
+
+    # round 0 is always run (possibly empty) so that buffers of the previous
+    # round are always defined inside the loop
+    func_text += "  lo = 0\n"
+    func_text += _gen_shuffle_round_start(arrs, str_inds, "  ")
+    func_text += "  for r in range(1, n_rounds):\n"
+    func_text += "    lo = r * c\n"
+    func_text += _gen_shuffle_round_start(arrs, str_inds, "    ", save=False)
+    # finish previous round while this round is in flight
+    func_text += _gen_shuffle_round_unpack(arrs, str_inds, "    ")
+    func_text += _gen_shuffle_round_start(arrs, str_inds, "    ", pack=False)
+    func_text += _gen_shuffle_round_unpack(arrs, str_inds, "  ")
+    for i in str_inds:
+        func_text += "  convert_len_arr_to_offset(get_offset_ptr(out_{0}), n_out)\n".format(i)
+    func_text += "  return ({}{})\n".format(
+        ", ".join("out_{}".format(i) for i in range(n_all)),
+        "," if n_all == 1 else "")
+
+    loc_vars = {}
+    max_op = np.int32(hpat.distributed_api.Reduce_Type.Max.value)
+    exec(func_text, {'np': np, 'hpat': hpat, 'max_op': max_op,
+                     'pre_alloc_string_array': pre_alloc_string_array,
+                     'fix_cat_array_type':
+                     hpat.hiframes.pd_categorical_ext.fix_cat_array_type,
+                     '_str_len': _str_len,
+                     'keep_alive': keep_alive,
+                     'getitem_str_offset': getitem_str_offset,
+                     'setitem_str_offset': setitem_str_offset,
+                     'str_copy_ptr': str_copy_ptr,
+                     'get_ctypes_ptr': get_ctypes_ptr,
+                     'get_data_ptr': get_data_ptr,
+                     'get_data_ptr_ind': get_data_ptr_ind,
+                     'get_offset_ptr': get_offset_ptr,
+                     'convert_len_arr_to_offset': convert_len_arr_to_offset},
+         loc_vars)
+    rounds_impl = loc_vars['f']
+    return rounds_impl
+
+
+def _gen_shuffle_round_start(arrs, str_inds, indent, pack=True, save=True):
+    """generate code that packs send buffers of the round starting at row 'lo'
+    of every destination and starts its non-blocking transfer. Buffers are
+    saved in 'prev_' variables, which are used after the transfer is done to
+    keep them alive.
+    """
+    func_text = ""
+    if pack:
+        func_text += "sc = np.empty(n_pes, np.int32)\n"
+        func_text += "rc = np.empty(n_pes, np.int32)\n"
+        func_text += "for p in range(n_pes):\n"
+        func_text += "  sc[p] = max(min(send_counts[p] - lo, c), 0)\n"
+        func_text += "  rc[p] = max(min(recv_counts[p] - lo, c), 0)\n"
+        func_text += "sd = hpat.hiframes.join.calc_disp(sc)\n"
+        func_text += "rd = hpat.hiframes.join.calc_disp(rc)\n"
+        for i, typ in enumerate(arrs.types):
+            if i in str_inds:
+                func_text += "send_{} = np.empty(sc.sum(), np.uint32)\n".format(i)
+                func_text += "sc_char_{} = np.zeros(n_pes, np.int32)\n".format(i)
+                func_text += "for p in range(n_pes):\n"
+                func_text += "  for j in range(sc[p]):\n"
+                func_text += "    l = _str_len(arr_{0}, perm[send_disp[p] + lo + j])\n".format(i)
+                func_text += "    send_{0}[sd[p] + j] = l\n".format(i)
+                func_text += "    sc_char_{0}[p] += l\n".format(i)
+                func_text += "sd_char_{0} = hpat.hiframes.join.calc_disp(sc_char_{0})\n".format(i)
+                func_text += "send_char_{0} = np.empty(sc_char_{0}.sum(), np.uint8)\n".format(i)
+                func_text += "send_char_ptr_{0} = get_ctypes_ptr(send_char_{0}.ctypes)\n".format(i)
+                func_text += "for p in range(n_pes):\n"
+                func_text += "  pos = sd_char_{}[p]\n".format(i)
+                func_text += "  for j in range(sc[p]):\n"
+                func_text += "    row = perm[send_disp[p] + lo + j]\n"
+                func_text += "    start = getitem_str_offset(arr_{}, row)\n".format(i)
+                func_text += "    l = send_{}[sd[p] + j]\n".format(i)
+                func_text += ("    str_copy_ptr(send_char_ptr_{0}, pos, "
+                              "get_ctypes_ptr(get_data_ptr_ind(arr_{0}, start)), l)\n").format(i)
+                func_text += "    pos += l\n"
+                func_text += "rc_char_{} = np.empty(n_pes, np.int32)\n".format(i)
+                func_text += "hpat.distributed_api.alltoall(sc_char_{0}, rc_char_{0}, 1)\n".format(i)
+                func_text += "rd_char_{0} = hpat.hiframes.join.calc_disp(rc_char_{0})\n".format(i)
+                func_text += "recv_{} = np.empty(rc.sum(), np.uint32)\n".format(i)
+                func_text += "recv_char_{0} = np.empty(rc_char_{0}.sum(), np.uint8)\n".format(i)
+                func_text += "req_{0} = hpat.distributed_api.ialltoallv(send_{0}, recv_{0}, sc, rc, sd, rd)\n".format(i)
+                func_text += ("req_char_{0} = hpat.distributed_api.ialltoallv(send_char_{0}, recv_char_{0}, "
+                              "sc_char_{0}, rc_char_{0}, sd_char_{0}, rd_char_{0})\n").format(i)
+            else:
+                func_text += "send_{0} = fix_cat_array_type(np.empty(sc.sum(), arr_{0}.dtype))\n".format(i)
+                func_text += "for p in range(n_pes):\n"
+                func_text += "  for j in range(sc[p]):\n"
+                func_text += "    send_{0}[sd[p] + j] = arr_{0}[perm[send_disp[p] + lo + j]]\n".format(i)
+                func_text += "recv_{0} = fix_cat_array_type(np.empty(rc.sum(), arr_{0}.dtype))\n".format(i)
+                func_text += "req_{0} = hpat.distributed_api.ialltoallv(send_{0}, recv_{0}, sc, rc, sd, rd)\n".format(i)
+    if save:
+        func_text += "prev_lo = lo\n"
+        func_text += "prev_rc = rc\n"
+        func_text += "prev_rd = rd\n"
+        func_text += "prev_sc = sc\n"
+        func_text += "prev_sd = sd\n"
+        for i in range(len(arrs.types)):
+            func_text += "prev_req_{0} = req_{0}\n".format(i)
+            func_text += "prev_send_{0} = send_{0}\n".format(i)
+            func_text += "prev_recv_{0} = recv_{0}\n".format(i)
+            if i in str_inds:
+                func_text += "prev_req_char_{0} = req_char_{0}\n".format(i)
+                func_text += "prev_send_char_{0} = send_char_{0}\n".format(i)
+                func_text += "prev_recv_char_{0} = recv_char_{0}\n".format(i)
+                func_text += "prev_sc_char_{0} = sc_char_{0}\n".format(i)
+                func_text += "prev_sd_char_{0} = sd_char_{0}\n".format(i)
+                func_text += "prev_rc_char_{0} = rc_char_{0}\n".format(i)
+                func_text += "prev_rd_char_{0} = rd_char_{0}\n".format(i)
+    return "".join(indent + line + "\n" for line in func_text.splitlines())
+
+
+def _gen_shuffle_round_unpack(arrs, str_inds, indent):
+    """generate code that waits for transfer of previous round and copies
+    received data to output arrays
+    """
+    func_text = ""
+    for i, typ in enumerate(arrs.types):
+        func_text += "hpat.distributed_api.wait(prev_req_{}, True)\n".format(i)
+        func_text += "keep_alive((prev_send_{}, prev_sc, prev_sd))\n".format(i)
+        func_text += "for p in range(n_pes):\n"
+        func_text += "  out_start = recv_disp[p] + prev_lo\n"
+        func_text += "  for j in range(prev_rc[p]):\n"
+        if i in str_inds:
+            # string lengths are stored in offsets and converted at the end
+            func_text += "    setitem_str_offset(out_{0}, out_start + j, prev_recv_{0}[prev_rd[p] + j])\n".format(i)
+            func_text += "hpat.distributed_api.wait(prev_req_char_{}, True)\n".format(i)
+            func_text += "keep_alive((prev_send_char_{0}, prev_sc_char_{0}, prev_sd_char_{0}))\n".format(i)
+            func_text += "out_data_ptr_{0} = get_ctypes_ptr(get_data_ptr(out_{0}))\n".format(i)
+            func_text += "for p in range(n_pes):\n"
+            func_text += "  n_chars = prev_rc_char_{}[p]\n".format(i)
+            func_text += ("  str_copy_ptr(out_data_ptr_{0}, recv_pos_char_{0}[p], "
+                          "get_ctypes_ptr(prev_recv_char_{0}[prev_rd_char_{0}[p]:].ctypes), n_chars)\n").format(i)
+            func_text += "  recv_pos_char_{}[p] += n_chars\n".format(i)
+        else:
+            func_text += "    out_{0}[out_start + j] = prev_recv_{0}[prev_rd[p] + j]\n".format(i)
+    return "".join(indent + line + "\n" for line in func_text.splitlines())
+
+
+@numba.njit(no_cpython_wrapper=True)
+def keep_alive(arrs):  # pragma: no cover
+    """dummy use of arrays to keep them alive up to this point (e.g. buffers
+    of non-blocking communication)
+    """
+    return
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _str_len(arr, i):  # pragma: no cover
+    return getitem_str_offset(arr, i + 1) - getitem_str_offset(arr, i)
+
+
+def get_dest_ranks(key_arrs, n_pes):
+    return np.zeros(len(key_arrs[0]), np.int32)
+
+
+@overload(get_dest_ranks)
+def get_dest_ranks_overload(key_arrs, n_pes):
+    """hash keys column by column and return destination rank of every row
+    """
+    def dest_impl(key_arrs, n_pes):
+        hashes = hash_key_arrs(key_arrs)
+        return get_dest_ranks_from_hashes(hashes, n_pes)
+
+    return dest_impl
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def get_dest_ranks_from_hashes(hashes, n_pes):  # pragma: no cover
+    n = len(hashes)
+    dest = np.empty(n, np.int32)
+    u_n_pes = np.uint64(n_pes)
+    for j in range(n):
+        dest[j] = np.int32(hashes[j] % u_n_pes)
+    return dest
+
+
+def hash_key_arrs(key_arrs):  # pragma: no cover
+    return np.zeros(len(key_arrs[0]), np.uint64)
+
+
+@overload(hash_key_arrs)
+def hash_key_arrs_overload(key_arrs):
+    """hash keys column by column into a uint64 array"""
+    func_text = "def f(key_arrs):\n"
+    func_text += "  n = len(key_arrs[0])\n"
+    func_text += "  hashes = np.empty(n, np.uint64)\n"
+    for i in range(key_arrs.count):
+        func_text += "  arr = key_arrs[{}]\n".format(i)
+        func_text += "  for j in range(n):\n"
+        if i == 0:
+            func_text += "    hashes[j] = hash_arr_item(arr, j)\n"
+        else:
+            func_text += "    hashes[j] = (hashes[j] * _HASH_MULT) ^ hash_arr_item(arr, j)\n"
+    func_text += "  return hashes\n"
+
+    loc_vars = {}
+    exec(func_text, {'np': np, 'hash_arr_item': hash_arr_item,
+                     '_HASH_MULT': _HASH_MULT}, loc_vars)
+    hash_impl = loc_vars['f']
+    return hash_impl
+
+
+_HASH_MULT = np.uint64(1000003)
+_FNV_OFFSET = np.uint64(14695981039346656037)
+_FNV_PRIME = np.uint64(1099511628211)
+
+
+def hash_arr_item(arr, i):
+    return np.uint64(hash(arr[i]))
+
+
+@overload(hash_arr_item)
+def hash_arr_item_overload(arr, i):
+    if arr == string_array_type:
+        # FNV-1a hash of string bytes, avoids creating string objects
+        def str_hash_impl(arr, i):
+            start = np.int64(getitem_str_offset(arr, i))
+            end = np.int64(getitem_str_offset(arr, i + 1))
+            h = _FNV_OFFSET
+            for j in range(start, end):
+                h = (h ^ np.uint64(getitem_str_data(arr, j))) * _FNV_PRIME
+            return h
+        return str_hash_impl
+
+    return lambda arr, i: np.uint64(hash(arr[i]))
+
+
+def update_shuffle_meta_dest(pre_shuffle_meta, arrs, dest):
+    for i in range(len(dest)):
+        pre_shuffle_meta.send_counts[dest[i]] += 1
+
+
+@overload(update_shuffle_meta_dest)
+def update_shuffle_meta_dest_overload(pre_shuffle_meta, arrs, dest):
+    func_text = "def f(pre_shuffle_meta, arrs, dest):\n"
+    func_text += "  n = len(dest)\n"
+    func_text += "  send_counts = pre_shuffle_meta.send_counts\n"
+    func_text += "  for i in range(n):\n"
+    func_text += "    send_counts[dest[i]] += 1\n"
+    n_str = 0
+    for i, typ in enumerate(arrs.types):
+        if typ == string_array_type:
+            func_text += "  arr = arrs[{}]\n".format(i)
+            func_text += "  send_counts_char = pre_shuffle_meta.send_counts_char_tup[{}]\n".format(n_str)
+            func_text += "  for i in range(n):\n"
+            func_text += "    n_chars = getitem_str_offset(arr, i + 1) - getitem_str_offset(arr, i)\n"
+            func_text += "    send_counts_char[dest[i]] += n_chars\n"
+            n_str += 1
+
+    loc_vars = {}
+    exec(func_text, {'getitem_str_offset': getitem_str_offset}, loc_vars)
+    update_impl = loc_vars['f']
+    return update_impl
+
+
+def write_send_buffs_dest(meta, arrs, dest):
+    return
+
+
+@overload(write_send_buffs_dest)
+def write_send_buffs_dest_overload(meta, arrs, dest):
+    func_text = "def f(meta, arrs, dest):\n"
+    func_text += "  n = len(dest)\n"
+    # write index of every row is computed once for all columns
+    func_text += "  w_inds = np.empty(n, np.int64)\n"
+    func_text += "  for i in range(n):\n"
+    func_text += "    node_id = dest[i]\n"
+    func_text += "    w_inds[i] = meta.send_disp[node_id] + meta.tmp_offset[node_id]\n"
+    func_text += "    meta.tmp_offset[node_id] += 1\n"
+    n_str = 0
+    for i, typ in enumerate(arrs.types):
+        func_text += "  arr = arrs[{}]\n".format(i)
+        if isinstance(typ, types.Array):
+            func_text += "  send_buff = meta.send_buff_tup[{}]\n".format(i)
+            func_text += "  for i in range(n):\n"
+            func_text += "    send_buff[w_inds[i]] = arr[i]\n"
+        else:
+            assert typ == string_array_type
+            func_text += "  send_arr_lens = meta.send_arr_lens_tup[{}]\n".format(n_str)
+            func_text += "  send_disp_char = meta.send_disp_char_tup[{}]\n".format(n_str)
+            func_text += "  tmp_offset_char = meta.tmp_offset_char_tup[{}]\n".format(n_str)
+            func_text += "  for i in range(n):\n"
+            func_text += "    node_id = dest[i]\n"
+            func_text += "    start = getitem_str_offset(arr, i)\n"
+            func_text += "    n_chars = getitem_str_offset(arr, i + 1) - start\n"
+            func_text += "    send_arr_lens[w_inds[i]] = n_chars\n"
+            func_text += "    indc = send_disp_char[node_id] + tmp_offset_char[node_id]\n"
+            func_text += ("    str_copy_ptr(meta.send_arr_chars_tup[{}], indc, "
+                          "get_ctypes_ptr(get_data_ptr_ind(arr, start)), n_chars)\n").format(n_str)
+            func_text += "    tmp_offset_char[node_id] += n_chars\n"
+            n_str += 1
+    func_text += "  return\n"
+
+    loc_vars = {}
+    exec(func_text, {'np': np, 'getitem_str_offset': getitem_str_offset,
+                     'str_copy_ptr': str_copy_ptr, 'get_ctypes_ptr': get_ctypes_ptr,
+                     'get_data_ptr_ind': get_data_ptr_ind}, loc_vars)
+    write_impl = loc_vars['f']
+    return write_impl
+
+
 def _get_keys_tup(recvs, key_arrs):
     return recvs[:len(key_arrs)]
 
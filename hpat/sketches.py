@@ -0,0 +1,239 @@
+import numpy as np
+import numba
+
+import hpat
+from hpat.hash_table import get_group_ids
+from hpat.shuffle_utils import hash_key_arrs
+
+
+# HyperLogLog sketch for approximate number of distinct values. A sketch has
+# 2^p uint8 registers, the first p bits of the (mixed) hash of a value select
+# a register which keeps the maximum position of the first 1 bit in the rest
+# of the hash. Sketches are merged with elementwise maximum.
+# Sparse sketches of many sets (e.g. groups) are arrays of register codes
+# (set << p | register) and register values, with zero registers omitted.
+
+_MIX_MULT1 = np.uint64(0xff51afd7ed558ccd)
+_MIX_MULT2 = np.uint64(0xc4ceb9fe1a85ec53)
+_TOP_BIT = np.uint64(1 << 63)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _mix_hash(h):  # pragma: no cover
+    # MurmurHash3 finalizer, hashes of integers are not random
+    h ^= h >> np.uint64(33)
+    h *= _MIX_MULT1
+    h ^= h >> np.uint64(33)
+    h *= _MIX_MULT2
+    h ^= h >> np.uint64(33)
+    return h
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def hll_register(h, p):  # pragma: no cover
+    """return register index and value for hash value 'h'"""
+    h = _mix_hash(h)
+    j = np.int64(h >> np.uint64(64 - p))
+    # guard bit makes sure the loop terminates
+    w = (h << np.uint64(p)) | (np.uint64(1) << np.uint64(p - 1))
+    r = 1
+    while w & _TOP_BIT == np.uint64(0):
+        w <<= np.uint64(1)
+        r += 1
+    return j, np.uint8(r)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def hll_add(regs, p, h):  # pragma: no cover
+    j, r = hll_register(h, p)
+    if r > regs[j]:
+        regs[j] = r
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _hll_alpha(m):  # pragma: no cover
+    return 0.7213 / (1.0 + 1.079 / m)
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def _hll_estimate(m, inv_sum, n_zeros):  # pragma: no cover
+    e = _hll_alpha(m) * m * m / inv_sum
+    # linear counting is more accurate for small cardinalities
+    if e <= 2.5 * m and n_zeros != 0:
+        e = m * np.log(m / n_zeros)
+    return np.int64(np.round(e))
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def hll_estimate(regs):  # pragma: no cover
+    m = len(regs)
+    inv_sum = 0.0
+    n_zeros = 0
+    for j in range(m):
+        inv_sum += 2.0 ** (-np.float64(regs[j]))
+        if regs[j] == 0:
+            n_zeros += 1
+    return _hll_estimate(m, inv_sum, n_zeros)
+
+
+@numba.njit(no_cpython_wrapper=True)
+def hll_sparse_merge(codes, vals):  # pragma: no cover
+    """merge sparse register values with the same code, returns unique
+    codes and their maximum values
+    """
+    code_arrs = (codes,)
+    row_group, group_first = get_group_ids(code_arrs, hash_key_arrs(code_arrs))
+    out_vals = np.zeros(len(group_first), np.uint8)
+    for i in range(len(codes)):
+        g = row_group[i]
+        out_vals[g] = max(out_vals[g], vals[i])
+    return codes[group_first], out_vals
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def hll_sparse_estimate(codes, vals, n_sets, p):  # pragma: no cover
+    """estimate number of distinct values of sets 0..n_sets-1 from merged
+    sparse registers (zero registers are ignored)
+    """
+    m = 1 << p
+    inv_sums = np.zeros(n_sets, np.float64)
+    n_nonzero = np.zeros(n_sets, np.int64)
+    for i in range(len(codes)):
+        if vals[i] == 0:
+            continue
+        s = codes[i] >> p
+        inv_sums[s] += 2.0 ** (-np.float64(vals[i]))
+        n_nonzero[s] += 1
+    out = np.empty(n_sets, np.int64)
+    for s in range(n_sets):
+        n_zeros = m - n_nonzero[s]
+        # empty set
+        if n_zeros == m:
+            out[s] = 0
+            continue
+        out[s] = _hll_estimate(m, inv_sums[s] + n_zeros, n_zeros)
+    return out
+
+
+# Quantile summaries are arrays of values and weights. A summary of sorted
+# values keeps the minimum and maximum exactly and represents the rest with
+# k blocks of consecutive values, each block by its middle value and size.
+# Rank error of a summary is at most n/(2k) and summaries of different ranks
+# are merged by concatenation, so the error of the merged summary is at most
+# (total number of values)/(2k) as well.
+
+
+@numba.njit(no_cpython_wrapper=True)
+def quantile_summary_size():  # pragma: no cover
+    """number of blocks of summaries for the configured error bound, 0 means
+    all values are kept
+    """
+    eps = hpat.config.config_quantile_sketch_error
+    if eps <= 0.0:
+        return 0
+    return np.int64(np.ceil(1.0 / (2.0 * eps)))
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def quantile_summary(A, k):  # pragma: no cover
+    """summary of sorted array A with k blocks"""
+    n = len(A)
+    if k == 0 or n <= k + 2:
+        return A.astype(np.float64), np.ones(n, np.float64)
+    vals = np.empty(k + 2, np.float64)
+    weights = np.empty(k + 2, np.float64)
+    vals[0] = A[0]
+    weights[0] = 1.0
+    m = n - 2
+    for t in range(k):
+        start = 1 + (t * m) // k
+        size = 1 + ((t + 1) * m) // k - start
+        vals[t + 1] = (A[start + (size - 1) // 2] + A[start + size // 2]) / 2
+        weights[t + 1] = size
+    vals[k + 1] = A[n - 1]
+    weights[k + 1] = 1.0
+    return vals, weights
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def summary_quantile(vals, weights, q):  # pragma: no cover
+    """quantile 'q' of summary sorted by value, interpolates linearly between
+    centers of blocks (same as pandas if all weights are 1)
+    """
+    n = len(vals)
+    if n == 0:
+        return np.nan
+    h = q * (weights.sum() - 1.0)
+    start = 0.0
+    prev_center = 0.0
+    prev_val = vals[0]
+    for i in range(n):
+        center = start + (weights[i] - 1.0) / 2.0
+        if center >= h:
+            if i == 0:
+                return vals[0]
+            return prev_val + (h - prev_center) / (center - prev_center) * (vals[i] - prev_val)
+        prev_center = center
+        prev_val = vals[i]
+        start += weights[i]
+    return vals[n - 1]
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def sort_sets(set_ids, vals, weights, n_sets):  # pragma: no cover
+    """sort weighted values by set id and value, returns offsets of sets and
+    sorted values and weights
+    """
+    n = len(set_ids)
+    offsets = np.zeros(n_sets + 1, np.int64)
+    for i in range(n):
+        offsets[set_ids[i] + 1] += 1
+    for s in range(n_sets):
+        offsets[s + 1] += offsets[s]
+    pos = offsets[:-1].copy()
+    out_vals = np.empty(n, np.float64)
+    out_weights = np.empty(n, np.float64)
+    for i in range(n):
+        s = set_ids[i]
+        out_vals[pos[s]] = vals[i]
+        out_weights[pos[s]] = weights[i]
+        pos[s] += 1
+    for s in range(n_sets):
+        start = offsets[s]
+        end = offsets[s + 1]
+        perm = np.argsort(out_vals[start:end])
+        out_vals[start:end] = out_vals[start:end][perm]
+        out_weights[start:end] = out_weights[start:end][perm]
+    return offsets, out_vals, out_weights
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def summarize_sets(offsets, vals, k):  # pragma: no cover
+    """summaries of sets of sorted values (with unit weights), returns set
+    ids, values and weights of summaries
+    """
+    n_sets = len(offsets) - 1
+    n = len(vals)
+    out_sets = np.empty(n, np.int64)
+    out_vals = np.empty(n, np.float64)
+    out_weights = np.empty(n, np.float64)
+    w = 0
+    for s in range(n_sets):
+        s_vals, s_weights = quantile_summary(vals[offsets[s]:offsets[s + 1]], k)
+        m = len(s_vals)
+        out_sets[w:w + m] = s
+        out_vals[w:w + m] = s_vals
+        out_weights[w:w + m] = s_weights
+        w += m
+    return out_sets[:w], out_vals[:w], out_weights[:w]
+
+
+@numba.njit(no_cpython_wrapper=True, cache=True)
+def sets_quantile(offsets, vals, weights, q):  # pragma: no cover
+    """quantile 'q' of every set of sorted summaries (NaN for empty sets)"""
+    n_sets = len(offsets) - 1
+    out = np.empty(n_sets, np.float64)
+    for s in range(n_sets):
+        out[s] = summary_quantile(vals[offsets[s]:offsets[s + 1]],
+                                  weights[offsets[s]:offsets[s + 1]], q)
+    return out
@@ -300,6 +300,63 @@ def copy_str_arr_slice(typingctx, str_arr_typ, out_str_arr_typ, ind_t=None):
     return types.void(string_array_type, string_array_type, ind_t), codegen
 
 
+@intrinsic
+def getitem_str_data(typingctx, str_arr_typ, ind_t=None):
+    # return character byte at index 'ind' of data buffer
+    def codegen(context, builder, sig, args):
+        in_str_arr, ind = args
+
+        string_array = context.make_helper(builder, string_array_type, in_str_arr)
+        return builder.load(builder.gep(string_array.data, [ind]))
+
+    return types.uint8(string_array_type, ind_t), codegen
+
+
+@intrinsic
+def copy_str_arr_chars(typingctx, out_str_arr_typ, out_ind_t, str_arr_typ, ind_t, n_t=None):
+    # copy 'n' characters of data buffer starting at 'ind' to output's data
+    # buffer starting at 'out_ind'
+    def codegen(context, builder, sig, args):
+        out_str_arr, out_ind, in_str_arr, ind, n = args
+
+        in_string_array = context.make_helper(builder, string_array_type, in_str_arr)
+        out_string_array = context.make_helper(builder, string_array_type, out_str_arr)
+        cgutils.raw_memcpy(builder, builder.gep(out_string_array.data, [out_ind]),
+                           builder.gep(in_string_array.data, [ind]), n, 1)
+        return context.get_dummy_value()
+
+    return types.void(string_array_type, out_ind_t, string_array_type, ind_t, n_t), codegen
+
+
+@intrinsic
+def str_arr_from_ptrs(typingctx, n_t, n_chars_t, offsets_t, data_t, null_bitmap_t=None):
+    # create StringArray on top of existing buffers, which are not owned by
+    # the array (meminfo is null) and should outlive it
+    def codegen(context, builder, sig, args):
+        n, n_chars, offsets, data, null_bitmap = args
+        string_array = context.make_helper(builder, string_array_type)
+        string_array.num_items = n
+        string_array.num_total_chars = n_chars
+        string_array.offsets = builder.bitcast(offsets, string_array.offsets.type)
+        string_array.data = builder.bitcast(data, string_array.data.type)
+        string_array.null_bitmap = builder.bitcast(null_bitmap, string_array.null_bitmap.type)
+        string_array.meminfo = cgutils.get_null_value(string_array.meminfo.type)
+        return string_array._getvalue()
+
+    return string_array_type(types.intp, types.intp, types.voidptr,
+                             types.voidptr, types.voidptr), codegen
+
+
+@intrinsic
+def get_null_bitmap_ptr(typingctx, str_arr_typ=None):
+    def codegen(context, builder, sig, args):
+        in_str_arr, = args
+        string_array = context.make_helper(builder, string_array_type, in_str_arr)
+        return builder.bitcast(string_array.null_bitmap, lir.IntType(8).as_pointer())
+
+    return types.voidptr(string_array_type), codegen
+
+
 @intrinsic
 def copy_data(typingctx, str_arr_typ, out_str_arr_typ=None):
     # precondition: output is allocated with data the same size as input's data
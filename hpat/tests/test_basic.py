@@ -373,6 +373,104 @@ class TestBasic(BaseTest):
         finally:
             hpat.distributed_analysis.auto_rebalance = False
 
+    def test_alltoallv_big(self):
+        # 64-bit alltoallv split into chunks of 3 elements
+        @numba.njit
+        def test_impl(n, chunk_bytes):
+            n_pes = hpat.distributed_api.get_size()
+            rank = hpat.distributed_api.get_rank()
+            counts = np.full(n_pes, n, np.int64)
+            disp = np.arange(n_pes) * n
+            send = np.arange(n * n_pes) + rank * 1000
+            recv = np.empty(n * n_pes, np.int64)
+            typ_enum = hpat.distributed_api.get_type_enum(send)
+            hpat.distributed_api.c_alltoallv_big(
+                send.ctypes, recv.ctypes, counts.ctypes, counts.ctypes,
+                disp.ctypes, disp.ctypes, typ_enum, chunk_bytes)
+            return recv
+
+        n = 10
+        expected = np.concatenate(
+            [p * 1000 + np.arange(self.rank * n, (self.rank + 1) * n)
+             for p in range(self.num_ranks)])
+        np.testing.assert_array_equal(test_impl(n, 24), expected)
+
+    def test_gatherv_big(self):
+        # 64-bit gatherv split into chunks of 3 elements
+        @numba.njit
+        def test_impl(n, chunk_bytes):
+            n_pes = hpat.distributed_api.get_size()
+            rank = hpat.distributed_api.get_rank()
+            counts = np.full(n_pes, n, np.int64)
+            disp = np.arange(n_pes) * n
+            send = np.arange(n) + rank * 1000
+            recv = np.empty(n * n_pes, np.int64)
+            typ_enum = hpat.distributed_api.get_type_enum(send)
+            hpat.distributed_api.c_gatherv_big(
+                send.ctypes, n, recv.ctypes, counts.ctypes, disp.ctypes,
+                typ_enum, chunk_bytes)
+            return recv
+
+        n = 10
+        res = test_impl(n, 24)
+        if self.rank == 0:
+            expected = np.concatenate(
+                [p * 1000 + np.arange(n) for p in range(self.num_ranks)])
+            np.testing.assert_array_equal(res, expected)
+
+    def test_alltoallv_buff_dispatch(self):
+        # counts larger than max_count use the 64-bit alltoallv
+        @numba.njit
+        def test_impl(n, max_count):
+            n_pes = hpat.distributed_api.get_size()
+            rank = hpat.distributed_api.get_rank()
+            counts = np.full(n_pes, n, np.int32)
+            disp = (np.arange(n_pes) * n).astype(np.int32)
+            send = np.arange(n * n_pes) + rank * 1000
+            recv = np.empty(n * n_pes, np.int64)
+            typ_enum = hpat.distributed_api.get_type_enum(send)
+            hpat.distributed_api.alltoallv_buff(
+                send.ctypes, recv.ctypes, counts, counts, disp, disp,
+                typ_enum, max_count)
+            return recv
+
+        n = 10
+        expected = np.concatenate(
+            [p * 1000 + np.arange(self.rank * n, (self.rank + 1) * n)
+             for p in range(self.num_ranks)])
+        for max_count in (np.iinfo(np.int32).max, 5):
+            np.testing.assert_array_equal(test_impl(n, max_count), expected)
+
+    def test_gatherv_buff_dispatch(self):
+        # total size larger than max_count uses the 64-bit gatherv
+        @numba.njit
+        def test_impl(n, max_count):
+            n_pes = hpat.distributed_api.get_size()
+            rank = hpat.distributed_api.get_rank()
+            counts = np.full(n_pes, n, np.int32)
+            disp = (np.arange(n_pes) * n).astype(np.int32)
+            send = np.arange(n) + rank * 1000
+            recv = np.empty(n * n_pes, np.int64)
+            typ_enum = hpat.distributed_api.get_type_enum(send)
+            hpat.distributed_api.gatherv_buff(
+                send.ctypes, n, recv.ctypes, counts, disp, typ_enum, max_count)
+            return recv
+
+        n = 10
+        expected = np.concatenate(
+            [p * 1000 + np.arange(n) for p in range(self.num_ranks)])
+        for max_count in (np.iinfo(np.int32).max, 5):
+            res = test_impl(n, max_count)
+            if self.rank == 0:
+                np.testing.assert_array_equal(res, expected)
+
+    def test_str_arr_chars_limit(self):
+        # string array offsets are 32-bit
+        hpat.distributed_api.check_str_arr_chars(np.iinfo(np.uint32).max)
+        with self.assertRaises(ValueError):
+            hpat.distributed_api.check_str_arr_chars(
+                np.int64(np.iinfo(np.uint32).max) + 1)
+
     def test_transpose(self):
         def test_impl(n):
             A = np.ones((30, 40, 50))
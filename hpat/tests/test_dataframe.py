@@ -525,6 +525,87 @@ class TestDataFrame(unittest.TestCase):
         hpat_func = hpat.jit(test_impl)
         np.testing.assert_almost_equal(hpat_func(df.copy()), test_impl(df))
 
+    def test_sort_values_int_multi_key(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B'], ascending=False)
+            return df2.C.values
+
+        n = 1211
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.randint(-10, 10, n),
+                           'B': np.random.randint(0, 1000, n).astype(np.uint32),
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df.copy()), test_impl(df))
+
+    def test_sort_values_nan(self):
+        def test_impl(df):
+            df2 = df.sort_values('A')
+            return df2.B.values
+
+        df = pd.DataFrame({'A': [2.1, np.nan, -1.5, 0.0, np.nan, -3.0],
+                           'B': np.arange(6)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df.copy()), test_impl(df))
+
+    def test_sort_values_str_multi_key(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B'], ascending=False)
+            return df2.C.values
+
+        n = 1211
+        random.seed(2)
+        str_vals = [''.join(random.choices('ABCé', k=random.randint(0, 3)))
+                    for _ in range(n)]
+        df = pd.DataFrame({'A': str_vals, 'B': np.arange(n) % 7,
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df.copy()), test_impl(df))
+
+    def test_sort_values_threads(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B'])
+            return df2.C.values
+
+        n = 1211
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.randint(0, 10, n).astype(np.int16),
+                           'B': np.random.ranf(n).astype(np.float32),
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+
+        save_num_threads = hpat.config.config_sort_num_threads
+        try:
+            hpat.config.config_sort_num_threads = 4
+            np.testing.assert_array_equal(hpat_func(df.copy()), test_impl(df))
+        finally:
+            # restore global val
+            hpat.config.config_sort_num_threads = save_num_threads
+
+    def test_sort_values_spill(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B'])
+            return df2.C.values
+
+        n = 1211
+        random.seed(2)
+        np.random.seed(2)
+        str_vals = [''.join(random.choices('ABC', k=random.randint(0, 3)))
+                    for _ in range(n)]
+        df = pd.DataFrame({'A': str_vals,
+                           'B': np.random.randint(0, 10, n).astype(np.int8),
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+
+        save_budget = hpat.config.config_sort_memory_budget
+        try:
+            # data is spilled to disk in multiple runs
+            hpat.config.config_sort_memory_budget = 5000
+            np.testing.assert_array_equal(hpat_func(df.copy()), test_impl(df))
+        finally:
+            # restore global val
+            hpat.config.config_sort_memory_budget = save_budget
+
     def test_sort_values_single_col(self):
         def test_impl(df):
             df.sort_values('A', inplace=True)
@@ -623,6 +704,153 @@ class TestDataFrame(unittest.TestCase):
             # restore global val
             hpat.hiframes.sort.MIN_SAMPLES = save_min_samples
 
+    def test_sort_parallel_multi_key_skew(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B'])
+            A = df2.A.values
+            B = df2.B.values
+            return A, B
+
+        hpat_func = hpat.jit(distributed={'df', 'A', 'B'})(test_impl)
+        n = 111
+        # few heavy values in first key
+        df = pd.DataFrame({'A': np.arange(n) % 3, 'B': np.arange(n)[::-1]})
+        start, end = get_start_end(n)
+        A, B = hpat_func(df.iloc[start:end])
+        self.assertTrue(all((A[i], B[i]) <= (A[i + 1], B[i + 1])
+                            for i in range(len(A) - 1)))
+        dist_sum = hpat.jit(
+            lambda a: hpat.distributed_api.dist_reduce(
+                a, np.int32(hpat.distributed_api.Reduce_Type.Sum.value)))
+        self.assertEqual(dist_sum(len(A)), n)
+
+    def test_sort_parallel_nan(self):
+        def test_impl(df):
+            df2 = df.sort_values('A')
+            A = df2.A.values
+            return A
+
+        hpat_func = hpat.jit(distributed={'df', 'A'})(test_impl)
+        n = 113
+        # many NaN keys, splitters can be NaN
+        np.random.seed(3)
+        A = np.random.ranf(n)
+        A[np.random.ranf(n) < .6] = np.nan
+        df = pd.DataFrame({'A': A})
+        start, end = get_start_end(n)
+        res = hpat_func(df.iloc[start:end])
+        all_res = hpat.jit(lambda a: hpat.distributed_api.allgatherv(a))(res)
+        np.testing.assert_array_equal(all_res, np.sort(A))
+
+    def test_sort_parallel_nat(self):
+        def test_impl(df):
+            df2 = df.sort_values('A')
+            B = df2.B.values
+            return B
+
+        hpat_func = hpat.jit(distributed={'df', 'B'})(test_impl)
+        n = 113
+        # distinct dates and many NaT keys, splitters can be NaT
+        np.random.seed(3)
+        A = np.datetime64('2019-01-01') + np.random.permutation(n).astype('timedelta64[D]')
+        nat = np.random.ranf(n) < .6
+        A[nat] = np.datetime64('NaT')
+        df = pd.DataFrame({'A': A, 'B': np.arange(n)})
+        start, end = get_start_end(n)
+        res = hpat_func(df.iloc[start:end])
+        all_res = hpat.jit(lambda a: hpat.distributed_api.allgatherv(a))(res)
+        expected = test_impl(df)
+        n_valid = n - nat.sum()
+        # NaT keys are last
+        np.testing.assert_array_equal(all_res[:n_valid], expected[:n_valid])
+        self.assertEqual(set(all_res[n_valid:]), set(np.arange(n)[nat]))
+
+    def test_sort_values_head(self):
+        def test_impl(df):
+            df2 = df.sort_values(['A', 'B']).head(7)
+            return df2.C.values
+
+        n = 1211
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.randint(0, 10, n),
+                           'B': np.random.permutation(n),
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df), test_impl(df))
+
+    def test_sort_values_head_parallel(self):
+        def test_impl(df):
+            df2 = df.sort_values('A', ascending=False).head(5)
+            return df2.B.values
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 111
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.permutation(n),
+                           'B': np.arange(n, dtype=np.float64)})
+        start, end = get_start_end(n)
+        # output is replicated on all ranks
+        np.testing.assert_array_equal(
+            hpat_func(df.iloc[start:end]), test_impl(df))
+
+    def test_sort_values_head_str_parallel(self):
+        def test_impl(df):
+            df2 = df.sort_values('A', ascending=False).head(5)
+            return df2.B.values
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 111
+        np.random.seed(2)
+        random.seed(2)
+        str_vals = [''.join(random.choices('ABCD', k=random.randint(1, 5)))
+                    for _ in range(n)]
+        df = pd.DataFrame({'A': np.random.permutation(n), 'B': str_vals})
+        start, end = get_start_end(n)
+        # output is replicated on all ranks
+        self.assertEqual(
+            list(hpat_func(df.iloc[start:end])), list(test_impl(df)))
+
+    def test_df_nlargest(self):
+        def test_impl(df):
+            return df.nlargest(4, 'A').B.values
+
+        n = 111
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.permutation(n),
+                           'B': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df), test_impl(df))
+
+    def test_df_nsmallest_multi_key(self):
+        def test_impl(df):
+            return df.nsmallest(6, ['A', 'B']).C.values
+
+        n = 111
+        np.random.seed(2)
+        df = pd.DataFrame({'A': np.random.randint(0, 5, n),
+                           'B': np.random.permutation(n),
+                           'C': np.arange(n)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df), test_impl(df))
+
+    def test_df_nlargest_nan(self):
+        def test_impl(df):
+            return df.nlargest(4, 'A').B.values
+
+        df = pd.DataFrame({'A': [2.1, np.nan, -1.5, 0.0, np.nan],
+                           'B': np.arange(5)})
+        hpat_func = hpat.jit(test_impl)
+        np.testing.assert_array_equal(hpat_func(df), test_impl(df))
+
+    def test_df_nlargest_keep_last(self):
+        def test_impl(df):
+            return df.nlargest(4, 'A', keep='last').B.values
+
+        df = pd.DataFrame({'A': np.arange(5), 'B': np.arange(5)})
+        hpat_func = hpat.jit(test_impl)
+        with self.assertRaises(ValueError):
+            hpat_func(df)
+
     def test_itertuples(self):
         def test_impl(df):
             res = 0.0
@@ -1,5 +1,7 @@
 import unittest
+import platform
 import pandas as pd
+from pandas.api.types import CategoricalDtype
 import numpy as np
 import pyarrow.parquet as pq
 import numba
@@ -150,6 +152,17 @@ class TestGroupBy(unittest.TestCase):
                            'C': [3, 5, 6, 5, 4, 4, 3]})
         self.assertEqual(set(hpat_func(df)), set(test_impl(df)))
 
+    def test_agg_multikey_str_seq(self):
+        def test_impl(df):
+            df2 = df.groupby(['A', 'C'], as_index=False)['B'].sum()
+            return df2.B.values
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': ['aa', 'b', 'b', 'b', 'aa', 'aa', 'b'],
+                           'B': [-8, 2, 3, 1, 5, 6, 7],
+                           'C': ['c', 'd', 'c', 'd', 'c', 'c', 'd']})
+        self.assertEqual(set(hpat_func(df)), set(test_impl(df)))
+
     def test_agg_multikey_parallel(self):
         def test_impl(in_A, in_B, in_C):
             df = pd.DataFrame({'A': in_A, 'B': in_B, 'C': in_C})
@@ -293,6 +306,299 @@ class TestGroupBy(unittest.TestCase):
         self.assertEqual(count_array_REPs(), 0)
         self.assertEqual(count_parfor_REPs(), 0)
 
+    def test_agg_parallel_shuffle_budget(self):
+        # float keys to avoid dense aggregation
+        def test_impl(n):
+            df = pd.DataFrame({'A': (np.arange(n) % 7).astype(np.float64),
+                               'B': np.arange(n, dtype=np.float32)})
+            df2 = df.groupby('A').sum()
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 121
+        saved_budget = hpat.distributed_api.get_shuffle_memory_budget()
+        # same compiled function with and without shuffle rounds
+        try:
+            for budget in (0, 64):
+                hpat.distributed_api.set_shuffle_memory_budget(budget)
+                self.assertEqual(hpat_func(n), test_impl(n))
+        finally:
+            hpat.distributed_api.set_shuffle_memory_budget(saved_budget)
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_parallel_unique_keys(self):
+        # keys are unique so raw rows are shuffled without pre-aggregation
+        # (unsorted and with range larger than dense aggregation limit)
+        def test_impl(n):
+            df = pd.DataFrame({'A': (np.arange(n) * 104729) % 1000003,
+                               'B': np.arange(n) + 1.5,
+                               'C': np.arange(n) % 3})
+            df2 = df.groupby('A').mean()
+            return df2.B.sum(), df2.C.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 121
+        self.assertEqual(hpat_func(n), test_impl(n))
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_parallel_sorted_keys(self):
+        # keys are sorted so groups spanning ranks are combined without shuffle
+        # (float keys to avoid dense aggregation)
+        def test_impl(n):
+            df = pd.DataFrame({'A': (np.arange(n) // 7).astype(np.float64),
+                               'B': np.arange(n) + 1.5})
+            df2 = df.groupby('A').mean()
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 121
+        self.assertEqual(hpat_func(n), test_impl(n))
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_parallel_str_keys_gather(self):
+        # output keys are gathered from first rows of groups
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False)['B'].sum()
+            A = df2.A.values
+            return A
+
+        hpat_func = hpat.jit(distributed={'df', 'A'})(test_impl)
+        n = 121
+        np.random.seed(2)
+        keys = ['k' * (i % 5 + 1) + str(i) for i in range(17)]
+        df = pd.DataFrame({'A': [keys[i] for i in np.random.randint(0, 17, n)],
+                           'B': np.arange(n)})
+        start, end = get_start_end(n)
+        res = hpat_func(df.iloc[start:end])
+        all_res = hpat.jit(
+            lambda S: hpat.distributed_api.allgatherv(S.values))(pd.Series(res))
+        self.assertEqual(sorted(all_res), sorted(test_impl(df)))
+
+    def test_agg_parallel_sorted_str_keys(self):
+        # sorted string keys of groups spanning ranks are exchanged between
+        # ranks
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False)['B'].sum()
+            return df2.B.sum(), len(df2)
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 121
+        df = pd.DataFrame({'A': ['key{:03d}'.format(i // 7) for i in range(n)],
+                           'B': np.arange(n)})
+        start, end = get_start_end(n)
+        self.assertEqual(hpat_func(df.iloc[start:end]), test_impl(df))
+
+    def test_agg_sorted_keys_merge_parallel(self):
+        # output of sorted aggregation isn't hash partitioned, so merge has
+        # to shuffle
+        def test_impl(df1, df2):
+            df3 = df1.groupby('A', as_index=False).sum()
+            df4 = df2.groupby('A', as_index=False).sum()
+            df5 = df3.merge(df4, on='A')
+            return df5.B.sum(), df5.C.sum(), len(df5)
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 121
+        df1 = pd.DataFrame({'A': (np.arange(n) // 7).astype(np.float64),
+                            'B': np.arange(n)})
+        df2 = pd.DataFrame({'A': (np.arange(n) % 13).astype(np.float64),
+                            'C': np.arange(n) + 1})
+        start, end = get_start_end(n)
+        self.assertEqual(hpat_func(df1.iloc[start:end], df2.iloc[start:end]),
+                         test_impl(df1, df2))
+
+    def test_agg_parallel_sort_values(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 5, 'B': np.arange(n)})
+            df2 = df.sort_values('A').groupby('A').max()
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 121
+        self.assertEqual(hpat_func(n), test_impl(n))
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_nunique_approx_seq(self):
+        def test_impl(df):
+            A = df.groupby('A')['B'].nunique(approx=True)
+            return A.values
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': [2, 1, 1, 1, 2, 2, 1],
+                           'B': [-8, 2, 3, 2, np.nan, -8, 7]})
+        self.assertEqual(set(hpat_func(df)), set(df.groupby('A')['B'].nunique()))
+
+    def test_agg_nunique_approx_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 4, 'B': np.arange(n) % 2003})
+            df2 = df.groupby('A', as_index=False)['B'].nunique(approx=True)
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 20001
+        # every group has 2003 distinct values
+        self.assertLess(abs(hpat_func(n) - 4 * 2003), 4 * 2003 * 0.03)
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_nunique_approx_str_key_parallel(self):
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False)['B'].nunique(approx=True)
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 20001
+        keys = ['aa', 'bbbb', 'c', 'ddddddd']
+        df = pd.DataFrame({'A': [keys[i % 4] for i in range(n)],
+                           'B': np.arange(n) % 2003})
+        start, end = get_start_end(n)
+        # many registers of every group are shuffled with the same key
+        self.assertLess(abs(hpat_func(df.iloc[start:end]) - 4 * 2003),
+                        4 * 2003 * 0.03)
+
+    def test_agg_quantile_seq(self):
+        def test_impl(df):
+            A = df.groupby('A')['B'].quantile(.25)
+            return A.values
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': [2, 1, 1, 1, 2, 2, 1, 3],
+                           'B': [-8, 2, 3, 1, np.nan, 5, 7, 4]})
+        np.testing.assert_almost_equal(sorted(hpat_func(df)),
+                                       sorted(df.groupby('A')['B'].quantile(.25)))
+
+    def test_agg_quantile_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 4, 'B': np.arange(n)})
+            df2 = df.groupby('A', as_index=False)['B'].quantile(q=.5)
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 100001
+        # rank error is bounded by HPAT_QUANTILE_SKETCH_ERROR
+        self.assertLess(abs(hpat_func(n) - test_impl(n)), 4 * 0.002 * n)
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_quantile_str_key_parallel(self):
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False)['B'].quantile(q=.5)
+            return df2.B.sum()
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 100001
+        keys = ['aa', 'bbbb', 'c', 'ddddddd']
+        df = pd.DataFrame({'A': [keys[i % 4] for i in range(n)],
+                           'B': np.arange(n)})
+        start, end = get_start_end(n)
+        self.assertLess(abs(hpat_func(df.iloc[start:end]) - test_impl(df)),
+                        4 * 0.002 * n)
+
+    def test_agg_multi_funcs_seq(self):
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False).agg(
+                {'B': ['sum', 'mean', 'std'], 'C': ['min', 'max']})
+            return df2
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': [2, 1, 1, 1, 2, 2, 1], 'B': [-8, 2, 3, 1, 5, 6, 7],
+                           'C': [3, 5, 6, 5, 4, 4, 3]})
+        res = hpat_func(df).sort_values('A').reset_index(drop=True)
+        df2 = df.groupby('A').agg({'B': ['sum', 'mean', 'std'], 'C': ['min', 'max']})
+        # output columns are flattened instead of MultiIndex
+        df2.columns = ['_'.join(c) for c in df2.columns]
+        pd.testing.assert_frame_equal(res, df2.reset_index(), check_dtype=False)
+
+    def test_agg_multi_funcs_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 5, 'B': np.arange(n, dtype=np.float64)})
+            df2 = df.groupby('A').agg({'B': ['mean', 'count']})
+            return df2.B_mean.sum(), df2.B_count.sum()
+
+        def test_impl2(n):
+            df = pd.DataFrame({'A': np.arange(n) % 5, 'B': np.arange(n, dtype=np.float64)})
+            df2 = df.groupby('A')['B'].agg(['mean', 'count'])
+            return df2['mean'].sum(), df2['count'].sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 121
+        np.testing.assert_almost_equal(hpat_func(n), test_impl2(n))
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_dense_int_key_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 7 + 3, 'B': np.arange(n) ** 2})
+            df2 = df.groupby('A', as_index=False)['B'].sum()
+            return (df2.A * df2.B).sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 111
+        self.assertEqual(hpat_func(n), test_impl(n))
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
+    def test_agg_dense_int_key_wide_range(self):
+        # key range doesn't fit in int64, hash aggregation is used
+        def test_impl(df):
+            A = df.groupby('A')['B'].sum()
+            return A.values
+
+        hpat_func = hpat.jit(test_impl)
+        info = np.iinfo(np.int64)
+        df = pd.DataFrame({'A': np.array([info.min, 3, info.max, 3, info.min], np.int64),
+                           'B': np.arange(5)})
+        self.assertEqual(set(hpat_func(df)), set(test_impl(df)))
+
+    def test_agg_dense_uint64_key_parallel(self):
+        # uint64 keys larger than int64 max are not dense keys
+        def test_impl(df):
+            df2 = df.groupby('A', as_index=False)['B'].sum()
+            return df2.B.sum(), len(df2)
+
+        hpat_func = hpat.jit(distributed={'df'})(test_impl)
+        n = 111
+        keys = np.array([1, 2, np.iinfo(np.uint64).max], np.uint64)
+        df = pd.DataFrame({'A': keys[np.arange(n) % 3], 'B': np.arange(n)})
+        start, end = get_start_end(n)
+        self.assertEqual(hpat_func(df.iloc[start:end]), test_impl(df))
+
+    def test_agg_dense_int_key_merge_parallel(self):
+        # output of dense aggregation is partitioned by key blocks, so merge
+        # has to shuffle
+        def test_impl(df1, df2):
+            df3 = df1.groupby('A', as_index=False).sum()
+            df4 = df2.groupby('A', as_index=False).sum()
+            df5 = df3.merge(df4, on='A')
+            return df5.B.sum(), df5.C.sum(), len(df5)
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 111
+        df1 = pd.DataFrame({'A': np.arange(n) % 17, 'B': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n) % 11 + 5, 'C': np.arange(n) + 1})
+        start, end = get_start_end(n)
+        self.assertEqual(hpat_func(df1.iloc[start:end], df2.iloc[start:end]),
+                         test_impl(df1, df2))
+
+    @unittest.skipIf(platform.system() == 'Windows', "error on windows")
+    def test_agg_cat_key(self):
+        def test_impl():
+            ct_dtype = CategoricalDtype(['A', 'B', 'C'])
+            dtypes = {'C1': np.int, 'C2': ct_dtype, 'C3': str}
+            df = pd.read_csv("csv_data_cat1.csv",
+                             names=['C1', 'C2', 'C3'],
+                             dtype=dtypes,
+                             )
+            A = df.groupby('C2')['C1'].sum()
+            return A.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        self.assertEqual(hpat_func(), test_impl())
+
     def test_agg_parallel_as_index(self):
         def test_impl(n):
             df = pd.DataFrame({'A': np.ones(n, np.int64), 'B': np.arange(n)})
@@ -332,6 +638,16 @@ class TestGroupBy(unittest.TestCase):
         # np.testing.assert_array_equal(hpat_func(df), test_impl(df))
         self.assertEqual(set(hpat_func(df)), set(test_impl(df)))
 
+    def test_agg_seq_sorted_str(self):
+        def test_impl(df):
+            A = df.groupby('A')['B'].sum()
+            return A.values
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': ['aa', 'aa', 'b', 'b', 'b', 'c', 'c'],
+                           'B': [-8, 2, 3, 1, 5, 6, 7]})
+        np.testing.assert_array_equal(hpat_func(df), test_impl(df))
+
     def test_agg_seq_count_str(self):
         def test_impl(df):
             A = df.groupby('A')['B'].count()
@@ -393,6 +709,67 @@ class TestGroupBy(unittest.TestCase):
             pivots={'pt': ['small', 'large']})(test_impl)
         self.assertEqual(hpat_func(), test_impl())
 
+    def test_pivot_dynamic(self):
+        def test_impl(df):
+            return df.pivot_table(index='A', columns='C', values='D', aggfunc='mean')
+
+        hpat_func = hpat.jit(test_impl)
+        vals, rows, cols = hpat_func(_pivot_df1)
+        pt = test_impl(_pivot_df1)
+        np.testing.assert_array_equal(vals, pt.values)
+        self.assertEqual(list(rows), list(pt.index))
+        self.assertEqual(list(cols), list(pt.columns))
+
+    def test_pivot_dynamic_nan_keys(self):
+        # NA index and column values are dropped similar to Pandas
+        def test_impl(df):
+            return df.pivot_table(index='A', columns='C', values='D', aggfunc='sum')
+
+        hpat_func = hpat.jit(test_impl)
+        df = pd.DataFrame({'A': [1.0, np.nan, 2.0, 1.0, np.nan, 2.0],
+                           'C': [3.0, 3.0, np.nan, 4.0, 4.0, 3.0],
+                           'D': [1, 2, 3, 4, 5, 6]})
+        vals, rows, cols = hpat_func(df)
+        pt = test_impl(df)
+        np.testing.assert_array_equal(vals, pt.values)
+        self.assertEqual(list(rows), list(pt.index))
+        self.assertEqual(list(cols), list(pt.columns))
+
+    def test_pivot_dynamic_parallel(self):
+        def test_impl():
+            df = pd.read_parquet("pivot2.pq")
+            pt = df.pivot_table(index='A', columns='C', values='D', aggfunc='sum')
+            return pt
+
+        hpat_func = hpat.jit(test_impl)
+        vals, rows, cols = hpat_func()
+        pt = test_impl()
+        np.testing.assert_array_equal(vals, pt.values)
+        self.assertEqual(list(cols), list(pt.columns))
+        self.assertTrue(count_array_OneDs() > 0)
+
+    def test_crosstab_dynamic(self):
+        def test_impl(df):
+            pt = pd.crosstab(df.A, df.C)
+            return pt
+
+        hpat_func = hpat.jit(test_impl)
+        vals, rows, cols = hpat_func(_pivot_df1)
+        pt = test_impl(_pivot_df1)
+        np.testing.assert_array_equal(vals, pt.values)
+        self.assertEqual(list(rows), list(pt.index))
+        self.assertEqual(list(cols), list(pt.columns))
+
+    def test_crosstab_dynamic_parallel(self):
+        def test_impl():
+            df = pd.read_parquet("pivot2.pq")
+            pt = pd.crosstab(df.A, df.C)
+            return pt
+
+        hpat_func = hpat.jit(test_impl)
+        vals, rows, cols = hpat_func()
+        np.testing.assert_array_equal(vals, test_impl().values)
+
 
 if __name__ == "__main__":
     unittest.main()
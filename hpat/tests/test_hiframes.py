@@ -173,6 +173,18 @@ class TestHiFrames(unittest.TestCase):
         self.assertEqual(count_array_REPs(), 0)
         self.assertEqual(count_parfor_REPs(), 0)
 
+    def test_quantile_approx_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(0, n, 1, np.float64)})
+            return df.A.quantile(.25, approx=True)
+
+        hpat_func = hpat.jit(test_impl)
+        n = 100001
+        # rank error is bounded by HPAT_QUANTILE_SKETCH_ERROR
+        self.assertLess(abs(hpat_func(n) - pd.Series(np.arange(n)).quantile(.25)), 0.002 * n)
+        self.assertEqual(count_array_REPs(), 0)
+        self.assertEqual(count_parfor_REPs(), 0)
+
     @unittest.skip('Error - fix needed\n'
                    'NUMA_PES=3 build')
     def test_quantile_parallel_float_nan(self):
@@ -252,6 +264,24 @@ class TestHiFrames(unittest.TestCase):
         hpat_func = hpat.jit(test_impl)
         np.testing.assert_almost_equal(hpat_func(n), test_impl(n))
 
+    def test_nunique_approx_parallel(self):
+        def test_impl(n):
+            df = pd.DataFrame({'A': np.arange(n) % 3001})
+            return df.A.nunique(approx=True)
+
+        hpat_func = hpat.jit(test_impl)
+        n = 10001
+        self.assertLess(abs(hpat_func(n) - 3001), 3001 * 0.03)
+        self.assertEqual(count_array_REPs(), 0)
+
+    def test_nunique_approx_str(self):
+        def test_impl():
+            df = pd.DataFrame({'A': ['aa', 'bb', 'aa', 'cc', 'cc']})
+            return df.A.nunique(approx=True)
+
+        hpat_func = hpat.jit(test_impl)
+        self.assertEqual(hpat_func(), 3)
+
     @unittest.skip('AssertionError - fix needed\n'
                    '5 != 3\n')
     def test_nunique_str_parallel(self):
@@ -170,6 +170,226 @@ class TestJoin(unittest.TestCase):
         self.assertEqual(h_res, p_res)
         self.assertEqual(count_array_OneDs(), 3)
 
+    def test_join_str_mutil_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on=['A', 'B'])
+            return df3.C.sum() + df3.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        random.seed(2)
+        np.random.seed(2)
+        str_vals = [''.join(random.choices('ABC', k=random.randint(0, 3)))
+                    for _ in range(n)]
+        df1 = pd.DataFrame({'A': str_vals,
+                            'B': np.random.randint(0, 4, n),
+                            'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': str_vals[::-1],
+                            'B': np.random.randint(0, 4, n),
+                            'D': np.arange(n) + 7})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        self.assertEqual(h_res, test_impl(df1, df2))
+
+    def test_join_str_parallel_shuffle_budget(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A', method='hash')
+            return df3.C.sum() + df3.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        random.seed(3)
+        str_vals = [''.join(random.choices('ABCD', k=random.randint(0, 4)))
+                    for _ in range(n)]
+        df1 = pd.DataFrame({'A': str_vals, 'C': np.arange(n, dtype=np.int16)})
+        df2 = pd.DataFrame({'A': str_vals[::-1],
+                            'D': np.arange(n, dtype=np.int16) + 7})
+        start, end = get_start_end(n)
+        saved_budget = hpat.distributed_api.get_shuffle_memory_budget()
+        hpat.distributed_api.set_shuffle_memory_budget(256)
+        try:
+            h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        finally:
+            hpat.distributed_api.set_shuffle_memory_budget(saved_budget)
+        df3 = df1.merge(df2, on='A')
+        self.assertEqual(h_res, df3.C.sum() + df3.D.sum())
+
+    def test_join_str_parallel_shuffle_rounds(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A', method='hash')
+            return df3.B.str.len().sum() + df3.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        random.seed(5)
+        str_vals = [''.join(random.choices('ABCD', k=random.randint(0, 4)))
+                    for _ in range(n)]
+        df1 = pd.DataFrame({'A': str_vals, 'B': str_vals[::-1]})
+        df2 = pd.DataFrame({'A': str_vals[::-1],
+                            'D': np.arange(n, dtype=np.int16) + 7})
+        start, end = get_start_end(n)
+        saved_budget = hpat.distributed_api.get_shuffle_memory_budget()
+        # minimal budget, one row per destination in every round
+        hpat.distributed_api.set_shuffle_memory_budget(1)
+        try:
+            h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        finally:
+            hpat.distributed_api.set_shuffle_memory_budget(saved_budget)
+        self.assertEqual(h_res, test_impl(df1, df2))
+
+    def test_join_broadcast_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on=['A', 'B'], method='broadcast')
+            return df3.C.sum() + df3.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        random.seed(4)
+        np.random.seed(4)
+        str_vals = [''.join(random.choices('ABC', k=random.randint(0, 3)))
+                    for _ in range(n)]
+        df1 = pd.DataFrame({'A': str_vals,
+                            'B': np.random.randint(0, 4, n),
+                            'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': str_vals[:20],
+                            'B': np.random.randint(0, 4, 20),
+                            'D': np.arange(20) + 7})
+        start, end = get_start_end(n)
+        start2, end2 = get_start_end(20)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start2:end2])
+        df3 = df1.merge(df2, on=['A', 'B'])
+        self.assertEqual(h_res, df3.C.sum() + df3.D.sum())
+
+    def test_join_right_broadcast_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A', how='right', method='broadcast')
+            return df3.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 31
+        df1 = pd.DataFrame({'A': np.arange(n) % 5, 'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n) % 7, 'D': np.arange(n) + 3})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        self.assertEqual(h_res, df1.merge(df2, on='A', how='right').D.sum())
+
+    def test_join_sort_seq(self):
+        def test_impl(df1, df2):
+            return df1.merge(df2, on='A', method='sort')
+
+        hpat_func = hpat.jit(test_impl)
+        n = 11
+        df1 = pd.DataFrame({'A': np.arange(n) % 4, 'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n)[::-1], 'D': np.arange(n) + 5})
+        h_res = hpat_func(df1, df2)
+        # sort-merge join output is sorted by key
+        p_res = df1.merge(df2, on='A').sort_values('A', kind='mergesort').reset_index(drop=True)
+        pd.testing.assert_frame_equal(h_res, p_res)
+        # inputs are not modified
+        np.testing.assert_array_equal(df1.A.values, np.arange(n) % 4)
+
+    def test_join_sort_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on=['A', 'B'], how='left', method='sort')
+            return df3.C.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        random.seed(5)
+        np.random.seed(5)
+        str_vals = [''.join(random.choices('ABC', k=random.randint(0, 3)))
+                    for _ in range(n)]
+        df1 = pd.DataFrame({'A': str_vals,
+                            'B': np.random.randint(0, 4, n),
+                            'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': str_vals[::-1],
+                            'B': np.random.randint(0, 4, n),
+                            'D': np.arange(n) + 7})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        self.assertEqual(h_res, df1.merge(df2, on=['A', 'B'], how='left').C.sum())
+
+    def test_join_auto_sort_merge_nan_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A')
+            return df3.C.sum() + df3.D.sum()
+
+        n = 101
+        np.random.seed(5)
+        # unsorted keys with NaN shouldn't be considered sorted
+        A = np.random.randint(0, 20, n).astype(np.float64)
+        A[::3] = np.nan
+        df1 = pd.DataFrame({'A': A, 'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n) % 20 * 1.0, 'D': np.arange(n) + 7})
+        start, end = get_start_end(n)
+        saved_flag = hpat.config.config_join_auto_sort_merge
+        hpat.config.config_join_auto_sort_merge = True
+        try:
+            hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+            h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        finally:
+            hpat.config.config_join_auto_sort_merge = saved_flag
+        self.assertEqual(h_res, test_impl(df1, df2))
+
+    def test_join_bloom_filter_parallel(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A', method='hash')
+            return df3.C.sum() + df3.D.sum()
+
+        saved_flag = hpat.config.config_join_bloom_filter
+        hpat.config.config_join_bloom_filter = True
+        try:
+            hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+            n = 211
+            df1 = pd.DataFrame({'A': [str(i) for i in range(n)],
+                                'C': np.arange(n, dtype=np.int32)})
+            # right table matches only a few left rows
+            df2 = pd.DataFrame({'A': [str(i * 17) for i in range(20)],
+                                'D': np.arange(20, dtype=np.int32)})
+            start, end = get_start_end(n)
+            start2, end2 = get_start_end(20)
+            h_res = hpat_func(df1.iloc[start:end], df2.iloc[start2:end2])
+        finally:
+            hpat.config.config_join_bloom_filter = saved_flag
+        df3 = df1.merge(df2, on='A')
+        self.assertEqual(h_res, df3.C.sum() + df3.D.sum())
+
+    def test_join_groupby_co_partitioned(self):
+        # groupby on join key reuses hash partitioning of join output
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on='A', method='hash')
+            df4 = df3.groupby('A', as_index=False).sum()
+            return df4.C.sum() + df4.D.sum(), len(df4)
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 111
+        df1 = pd.DataFrame({'A': np.arange(n) % 7, 'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n) % 11, 'D': np.arange(n) + 1.0})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        df3 = df1.merge(df2, on='A')
+        df4 = df3.groupby('A', as_index=False).sum()
+        self.assertEqual(h_res[0], df4.C.sum() + df4.D.sum())
+        self.assertEqual(h_res[1], len(df4))
+
+    def test_join_chain_co_partitioned(self):
+        # second join is local since both inputs are partitioned on key
+        def test_impl(df1, df2, df3):
+            df4 = df1.merge(df2, on='A', method='hash')
+            df5 = df3.merge(df3, on='A', method='hash')
+            df6 = df4.merge(df5, on='A', method='hash')
+            return df6.C.sum() + df6.D.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2', 'df3'})(test_impl)
+        n = 51
+        df1 = pd.DataFrame({'A': np.arange(n) % 5, 'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': np.arange(n) % 7, 'D': np.arange(n) + 1})
+        df3 = pd.DataFrame({'A': np.arange(n) % 3, 'E': np.arange(n)})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end], df3.iloc[start:end])
+        df6 = df1.merge(df2, on='A').merge(df3.merge(df3, on='A'), on='A')
+        self.assertEqual(h_res, df6.C.sum() + df6.D.sum())
+
     def test_join_datetime_seq1(self):
         def test_impl(df1, df2):
             return pd.merge(df1, df2, on='time')
@@ -221,6 +441,72 @@ class TestJoin(unittest.TestCase):
                  '2017-02-25']), 'A': [2, 3, 7, 8, 9]})
         pd.testing.assert_frame_equal(hpat_func(df1, df2), test_impl(df1, df2))
 
+    def test_merge_asof_by_seq(self):
+        def test_impl(df1, df2):
+            return pd.merge_asof(df1, df2, on='time', by='sym', tolerance=3,
+                                 direction='nearest')
+
+        hpat_func = hpat.jit(test_impl)
+        df1 = pd.DataFrame({'time': [1, 3, 5, 10, 12, 20],
+                            'sym': ['a', 'b', 'a', 'c', 'b', 'a'],
+                            'B': np.arange(6)})
+        df2 = pd.DataFrame({'time': [0, 2, 4, 9, 11, 13],
+                            'sym': ['a', 'a', 'b', 'c', 'b', 'a'],
+                            'A': np.arange(6.0)})
+        pd.testing.assert_frame_equal(hpat_func(df1, df2), test_impl(df1, df2))
+
+    def test_merge_asof_forward_seq(self):
+        def test_impl(df1, df2):
+            return pd.merge_asof(df1, df2, on='time', direction='forward',
+                                 allow_exact_matches=False)
+
+        hpat_func = hpat.jit(test_impl)
+        df1 = pd.DataFrame({'time': [1, 3, 4, 10, 13], 'B': np.arange(5)})
+        df2 = pd.DataFrame({'time': [0, 3, 4, 9, 11], 'A': np.arange(5.0)})
+        pd.testing.assert_frame_equal(hpat_func(df1, df2), test_impl(df1, df2))
+
+    def test_merge_asof_by_parallel(self):
+        def test_impl(df1, df2):
+            df3 = pd.merge_asof(df1, df2, on='time', by='sym', direction='backward')
+            return df3.A.sum(), df3.B.sum()
+
+        hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+        n = 101
+        df1 = pd.DataFrame({'time': np.arange(n) * 2,
+                            'sym': np.arange(n) % 5,
+                            'B': np.arange(n)})
+        df2 = pd.DataFrame({'time': np.arange(n) * 3,
+                            'sym': np.arange(n) % 7,
+                            'A': np.arange(n) + 1.0})
+        start, end = get_start_end(n)
+        h_res = hpat_func(df1.iloc[start:end], df2.iloc[start:end])
+        res = test_impl(df1, df2)
+        self.assertEqual(h_res[0], res[0])
+        self.assertEqual(h_res[1], res[1])
+
+    def test_merge_asof_forward_nearest_parallel(self):
+        # matches can be on other ranks in both directions
+        def test_impl1(df1, df2):
+            df3 = pd.merge_asof(df1, df2, on='time', direction='forward')
+            return df3.A.sum(), df3.B.sum(), len(df3)
+
+        def test_impl2(df1, df2):
+            df3 = pd.merge_asof(df1, df2, on='time', direction='nearest')
+            return df3.A.sum(), df3.B.sum(), len(df3)
+
+        n = 101
+        df1 = pd.DataFrame({'time': np.arange(n) * 2,
+                            'B': np.arange(n)})
+        df2 = pd.DataFrame({'time': np.arange(n // 3) * 7 + 1,
+                            'A': np.arange(n // 3) + 1.0})
+        start1, end1 = get_start_end(len(df1))
+        start2, end2 = get_start_end(len(df2))
+        for test_impl in (test_impl1, test_impl2):
+            hpat_func = hpat.jit(distributed={'df1', 'df2'})(test_impl)
+            self.assertEqual(
+                hpat_func(df1.iloc[start1:end1], df2.iloc[start2:end2]),
+                test_impl(df1, df2))
+
     @unittest.skip('AssertionError - fix needed\n'
                    'Tuples differ: (-9223372036854775790, Timestamp(\'2017-02-21 00:00:00\'), 24) !=\n'
                    '(18, Timestamp(\'2017-02-21 00:00:00\'), 24)\n'
@@ -270,6 +556,38 @@ class TestJoin(unittest.TestCase):
         self.assertEqual(
             set(h_res.B.dropna().values), set(res.B.dropna().values))
 
+    def test_join_outer_str_many_seq(self):
+        def test_impl(df1, df2):
+            return df1.merge(df2, on='A', how='outer')
+
+        hpat_func = hpat.jit(test_impl)
+        # many-to-many join with unmatched keys on both sides
+        df1 = pd.DataFrame({'A': ['aa', 'b', 'aa', 'ccc', 'b', 'dd'],
+                            'C': np.arange(6, dtype=np.float64)})
+        df2 = pd.DataFrame({'A': ['b', 'aa', 'e', 'b', 'aa', 'aa'],
+                            'D': np.arange(6, dtype=np.float64) + 10})
+        h_res = hpat_func(df1, df2)
+        res = test_impl(df1, df2)
+        self.assertEqual(len(h_res), len(res))
+        self.assertEqual(sorted(h_res.A), sorted(res.A))
+        self.assertEqual(h_res.C.sum(), res.C.sum())
+        self.assertEqual(h_res.D.sum(), res.D.sum())
+
+    def test_join_mutil_str_many_keys_seq(self):
+        def test_impl(df1, df2):
+            df3 = df1.merge(df2, on=['A', 'B'])
+            return df3.C.sum() + df3.D.sum()
+
+        hpat_func = hpat.jit(test_impl)
+        n = 1003
+        df1 = pd.DataFrame({'A': [str(i % 37) for i in range(n)],
+                            'B': np.arange(n) % 11,
+                            'C': np.arange(n)})
+        df2 = pd.DataFrame({'A': [str(i % 41) for i in range(n)],
+                            'B': np.arange(n) % 13,
+                            'D': np.arange(n) * 2})
+        self.assertEqual(hpat_func(df1, df2), test_impl(df1, df2))
+
     def test_join_right_seq1(self):
         def test_impl(df1, df2):
             return pd.merge(df1, df2, how='right', on='key')
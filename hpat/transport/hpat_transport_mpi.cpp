@@ -26,6 +26,7 @@
 
 #include <Python.h>
 #include <boost/filesystem.hpp>
+#include <climits>
 #include <mpi.h>
 
 #include "../_distributed.h"
@@ -699,6 +700,126 @@ static void c_alltoallv(
         send_data, send_counts, send_disp, mpi_typ, recv_data, recv_counts, recv_disp, mpi_typ, MPI_COMM_WORLD);
 }
 
+// non-blocking alltoallv, buffers and count arrays have to stay alive until
+// the returned request is completed
+static MPI_Request c_ialltoallv(
+    void* send_data, void* recv_data, int* send_counts, int* recv_counts, int* send_disp, int* recv_disp, int typ_enum)
+{
+    MPI_Request req(MPI_REQUEST_NULL);
+    MPI_Datatype mpi_typ = get_MPI_typ(typ_enum);
+    MPI_Ialltoallv(
+        send_data, send_counts, send_disp, mpi_typ, recv_data, recv_counts, recv_disp, mpi_typ, MPI_COMM_WORLD, &req);
+    return req;
+}
+
+// alltoallv with 64-bit counts and displacements for messages that don't fit
+// in int: data is sent with point-to-point messages of at most 'chunk_bytes'
+// bytes per peer in each round so that MPI counts never overflow
+static void c_alltoallv_big(void* send_data,
+                            void* recv_data,
+                            int64_t* send_counts,
+                            int64_t* recv_counts,
+                            int64_t* send_disp,
+                            int64_t* recv_disp,
+                            int typ_enum,
+                            int64_t chunk_bytes)
+{
+    MPI_Datatype mpi_typ = get_MPI_typ(typ_enum);
+    int type_size;
+    MPI_Type_size(mpi_typ, &type_size);
+    int64_t chunk_size = std::max((int64_t)1, std::min(chunk_bytes / type_size, (int64_t)INT_MAX));
+    int n_pes;
+    MPI_Comm_size(MPI_COMM_WORLD, &n_pes);
+
+    int64_t max_count = 0;
+    for (int i = 0; i < n_pes; i++)
+    {
+        max_count = std::max(max_count, std::max(send_counts[i], recv_counts[i]));
+    }
+    int64_t n_rounds = (max_count + chunk_size - 1) / chunk_size;
+    MPI_Allreduce(MPI_IN_PLACE, &n_rounds, 1, MPI_LONG_LONG_INT, MPI_MAX, MPI_COMM_WORLD);
+
+    std::vector<MPI_Request> reqs;
+    reqs.reserve(2 * n_pes);
+    for (int64_t r = 0; r < n_rounds; r++)
+    {
+        int64_t start = r * chunk_size;
+        reqs.clear();
+        for (int i = 0; i < n_pes; i++)
+        {
+            int64_t count = std::min(recv_counts[i] - start, chunk_size);
+            if (count > 0)
+            {
+                MPI_Request req;
+                char* ptr = (char*)recv_data + (recv_disp[i] + start) * type_size;
+                MPI_Irecv(ptr, (int)count, mpi_typ, i, (int)(r % 32767), MPI_COMM_WORLD, &req);
+                reqs.push_back(req);
+            }
+        }
+        for (int i = 0; i < n_pes; i++)
+        {
+            int64_t count = std::min(send_counts[i] - start, chunk_size);
+            if (count > 0)
+            {
+                MPI_Request req;
+                char* ptr = (char*)send_data + (send_disp[i] + start) * type_size;
+                MPI_Isend(ptr, (int)count, mpi_typ, i, (int)(r % 32767), MPI_COMM_WORLD, &req);
+                reqs.push_back(req);
+            }
+        }
+        if (reqs.size() > 0)
+        {
+            MPI_Waitall((int)reqs.size(), reqs.data(), MPI_STATUSES_IGNORE);
+        }
+    }
+}
+
+// gatherv with 64-bit counts and displacements, see c_alltoallv_big
+static void c_gatherv_big(void* send_data,
+                          int64_t sendcount,
+                          void* recv_data,
+                          int64_t* recv_counts,
+                          int64_t* displs,
+                          int typ_enum,
+                          int64_t chunk_bytes)
+{
+    MPI_Datatype mpi_typ = get_MPI_typ(typ_enum);
+    int type_size;
+    MPI_Type_size(mpi_typ, &type_size);
+    int64_t chunk_size = std::max((int64_t)1, std::min(chunk_bytes / type_size, (int64_t)INT_MAX));
+    int n_pes, rank;
+    MPI_Comm_size(MPI_COMM_WORLD, &n_pes);
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+
+    std::vector<MPI_Request> reqs;
+    if (rank == ROOT)
+    {
+        for (int i = 0; i < n_pes; i++)
+        {
+            for (int64_t start = 0; start < recv_counts[i]; start += chunk_size)
+            {
+                int64_t count = std::min(recv_counts[i] - start, chunk_size);
+                MPI_Request req;
+                char* ptr = (char*)recv_data + (displs[i] + start) * type_size;
+                MPI_Irecv(ptr, (int)count, mpi_typ, i, (int)((start / chunk_size) % 32767), MPI_COMM_WORLD, &req);
+                reqs.push_back(req);
+            }
+        }
+    }
+    for (int64_t start = 0; start < sendcount; start += chunk_size)
+    {
+        int64_t count = std::min(sendcount - start, chunk_size);
+        MPI_Request req;
+        char* ptr = (char*)send_data + start * type_size;
+        MPI_Isend(ptr, (int)count, mpi_typ, ROOT, (int)((start / chunk_size) % 32767), MPI_COMM_WORLD, &req);
+        reqs.push_back(req);
+    }
+    if (reqs.size() > 0)
+    {
+        MPI_Waitall((int)reqs.size(), reqs.data(), MPI_STATUSES_IGNORE);
+    }
+}
+
 static int hpat_finalize()
 {
     int is_initialized;
@@ -1368,9 +1489,12 @@ PyMODINIT_FUNC PyInit_transport_mpi(void)
     PyObject_SetAttrString(m, "allgather", PyLong_FromVoidPtr((void*)(&allgather)));
     PyObject_SetAttrString(m, "c_alltoall", PyLong_FromVoidPtr((void*)(&c_alltoall)));
     PyObject_SetAttrString(m, "c_alltoallv", PyLong_FromVoidPtr((void*)(&c_alltoallv)));
+    PyObject_SetAttrString(m, "c_alltoallv_big", PyLong_FromVoidPtr((void*)(&c_alltoallv_big)));
+    PyObject_SetAttrString(m, "c_ialltoallv", PyLong_FromVoidPtr((void*)(&c_ialltoallv)));
     PyObject_SetAttrString(m, "c_bcast", PyLong_FromVoidPtr((void*)(&c_bcast)));
     PyObject_SetAttrString(m, "c_gather_scalar", PyLong_FromVoidPtr((void*)(&c_gather_scalar)));
     PyObject_SetAttrString(m, "c_gatherv", PyLong_FromVoidPtr((void*)(&c_gatherv)));
+    PyObject_SetAttrString(m, "c_gatherv_big", PyLong_FromVoidPtr((void*)(&c_gatherv_big)));
     PyObject_SetAttrString(m, "comm_req_alloc", PyLong_FromVoidPtr((void*)(&comm_req_alloc)));
     PyObject_SetAttrString(m, "comm_req_dealloc", PyLong_FromVoidPtr((void*)(&comm_req_dealloc)));
     PyObject_SetAttrString(m, "file_read_parallel", PyLong_FromVoidPtr((void*)(&file_read_parallel)));
@@ -118,6 +118,28 @@ static void c_alltoallv(
            type_size_bytes * min(send_counts[0], recv_counts[0]));
 }
 
+static MPI_Request c_ialltoallv(
+    void* send_data, void* recv_data, int* send_counts, int* recv_counts, int* send_disp, int* recv_disp, int typ_enum)
+{
+    c_alltoallv(send_data, recv_data, send_counts, recv_counts, send_disp, recv_disp, typ_enum);
+    return MPI_REQUEST_NULL;
+}
+
+static void c_alltoallv_big(void* send_data,
+                            void* recv_data,
+                            int64_t* send_counts,
+                            int64_t* recv_counts,
+                            int64_t* send_disp,
+                            int64_t* recv_disp,
+                            int typ_enum,
+                            int64_t chunk_bytes)
+{
+    size_t type_size_bytes = get_type_size_bytes(typ_enum);
+    memcpy((char*)recv_data + recv_disp[0] * type_size_bytes,
+           (char*)send_data + send_disp[0] * type_size_bytes,
+           type_size_bytes * min(send_counts[0], recv_counts[0]));
+}
+
 static void c_bcast(void* send_data, int sendcount, int typ_enum)
 {
     // no work needed
@@ -135,6 +157,20 @@ static void c_gatherv(void* send_data, int sendcount, void* recv_data, int* recv
     memcpy((char*)recv_data + displs[0], send_data, type_size_bytes * min(sendcount, recv_counts[0]));
 }
 
+static void c_gatherv_big(void* send_data,
+                          int64_t sendcount,
+                          void* recv_data,
+                          int64_t* recv_counts,
+                          int64_t* displs,
+                          int typ_enum,
+                          int64_t chunk_bytes)
+{
+    size_t type_size_bytes = get_type_size_bytes(typ_enum);
+    memcpy((char*)recv_data + displs[0] * type_size_bytes,
+           send_data,
+           type_size_bytes * min(sendcount, recv_counts[0]));
+}
+
 static MPI_Request* comm_req_alloc(int size)
 {
     return new MPI_Request[size];
@@ -464,9 +500,12 @@ PyMODINIT_FUNC PyInit_transport_seq(void)
     PyObject_SetAttrString(m, "allgather", PyLong_FromVoidPtr((void*)(&allgather)));
     PyObject_SetAttrString(m, "c_alltoall", PyLong_FromVoidPtr((void*)(&c_alltoall)));
     PyObject_SetAttrString(m, "c_alltoallv", PyLong_FromVoidPtr((void*)(&c_alltoallv)));
+    PyObject_SetAttrString(m, "c_alltoallv_big", PyLong_FromVoidPtr((void*)(&c_alltoallv_big)));
+    PyObject_SetAttrString(m, "c_ialltoallv", PyLong_FromVoidPtr((void*)(&c_ialltoallv)));
     PyObject_SetAttrString(m, "c_bcast", PyLong_FromVoidPtr((void*)(&c_bcast)));
     PyObject_SetAttrString(m, "c_gather_scalar", PyLong_FromVoidPtr((void*)(&c_gather_scalar)));
     PyObject_SetAttrString(m, "c_gatherv", PyLong_FromVoidPtr((void*)(&c_gatherv)));
+    PyObject_SetAttrString(m, "c_gatherv_big", PyLong_FromVoidPtr((void*)(&c_gatherv_big)));
     PyObject_SetAttrString(m, "comm_req_alloc", PyLong_FromVoidPtr((void*)(&comm_req_alloc)));
     PyObject_SetAttrString(m, "comm_req_dealloc", PyLong_FromVoidPtr((void*)(&comm_req_dealloc)));
     PyObject_SetAttrString(m, "file_read_parallel", PyLong_FromVoidPtr((void*)(&file_read_parallel)));